@@ -1,29 +1,41 @@
-import chalk
+from importlib import import_module
+from typing import Any
 
 from Tasker.__version__ import __version__
-from Tasker.cli import get_args, get_logger
-from Tasker.inspector import inspect
-from Tasker.operations import Command, Copy, Delete, Echo, Input, Move, Request
-from Tasker.parser import Parser
 
-__all__ = [
+# Exported names and the module they live in. They are only imported when first used,
+# keeping `tasker list` and small executions from paying for every dependency
+LAZY_EXPORTS = {
     # Colorizer
-    "chalk",
+    "chalk": "chalk",
     # Parser
-    "Parser",
+    "Parser": "Tasker.parser",
+    "TaskerError": "Tasker.errors",
+    "InstructionSetError": "Tasker.errors",
     # Operations
-    "Command",
-    "Echo",
-    "Input",
-    "Copy",
-    "Delete",
-    "Request",
-    "Move",
+    "Command": "Tasker.operations",
+    "Echo": "Tasker.operations",
+    "Input": "Tasker.operations",
+    "Copy": "Tasker.operations",
+    "Delete": "Tasker.operations",
+    "Request": "Tasker.operations",
+    "Move": "Tasker.operations",
+    # Job Runner
+    "JobRunner": "Tasker.jobs",
     # CLI
-    "get_logger",
-    "get_args",
+    "get_logger": "Tasker.cli",
+    "get_args": "Tasker.cli",
     # Inspector
-    "inspect",
-    # Version
-    "__version__",
-]
+    "inspect": "Tasker.inspector",
+}
+
+__all__ = [*LAZY_EXPORTS.keys(), "__version__"]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in LAZY_EXPORTS:
+        raise AttributeError(f"module 'Tasker' has no attribute '{name}'")
+    module = import_module(LAZY_EXPORTS[name])
+    value = module if name == LAZY_EXPORTS[name] else getattr(module, name)
+    globals()[name] = value
+    return value
@@ -1,14 +1,82 @@
 import sys
+from argparse import Namespace
+from logging import Logger
+from os import environ as env
+from os import getcwd
+from typing import Literal, Union
 
 import chalk
 
 from .__version__ import __version__
 from .cli import flag_present, get_args, get_logger
-from .parser import Parser
-from .templater import ask_file_to_run, check_duplicate_names, create_template
+
+
+def choose_task(
+    args: Namespace, operation: Literal["execute", "edit", "validate", "watch", "inspect"]
+) -> Union[str, None]:
+    "Use the InstructionSet flag or ask for one. questionary is only imported to ask"
+    if args.Instruction_Set is not None:
+        return args.Instruction_Set
+    from .parser import Parser
+    from .templater import ask_file_to_run
+
+    return ask_file_to_run([*Parser.list_all_tasks(), "nevermind..."], operation)
+
+
+def execute_via_daemon(args: Namespace, logger: Logger) -> None:
+    "Hand the execution over to `tasker serve`. Falls back to a local one if it isn't running"
+    from .daemon import request, supported
+
+    if args.Instruction_Set is None or not supported():
+        return
+    try:
+        ok = request(
+            {
+                "action": "execute",
+                "instruction_set": args.Instruction_Set,
+                "level": logger.getEffectiveLevel(),
+                "flags": [_ for _ in ["-No-Rollback", "-No-History"] if _ in env],
+            },
+            logger,
+        )
+    except OSError:
+        logger.warning("Tasker daemon is not running, executing locally")
+        return
+    sys.exit(0 if ok else 1)
+
+
+def execute_instrumented(instruction_set: str, args: Namespace, logger: Logger) -> None:
+    """Execute while tracing or profiling, writing the results even when the
+    InstructionSet can't be loaded"""
+    from .parser import Parser
+    from .profiling import Profiler
+    from .tracing import Tracer
+
+    tracer = Tracer() if args.Trace is not None else None
+    profiler = None
+    if args.Profile is not None:
+        profiler = Profiler(args.Profile, f"{getcwd()}/{instruction_set}-profile")
+    try:
+        Parser(instruction_set, logger, tracer=tracer, profiler=profiler).execute()
+    finally:
+        if tracer is not None:
+            tracer.export(args.Trace)
+            logger.info(f"Trace written to {args.Trace}")
+        if profiler is not None:
+            profiler.summarize(logger)
 
 
 def main() -> None:
+    from .errors import TaskerError
+
+    try:
+        _main()
+    except TaskerError:
+        # The reason has already been logged
+        sys.exit(1)
+
+
+def _main() -> None:
     logger = get_logger()
     try:
         args = get_args(__version__, logger)
@@ -16,28 +84,75 @@ def main() -> None:
         logger.error("No action provided")
         sys.exit(1)
 
+    if args.action == "execute" and args.Via_Daemon:
+        execute_via_daemon(args, logger)
+    from .parser import Parser
+
     if args.action == "list":
         print("Available InstructionSets:")
-        for task in Parser.list_all_tasks():
+        tasks = (
+            Parser.list_all_tasks()
+            if args.Filter is None
+            else Parser.query_tasks(args.Filter, logger)
+        )
+        for task in tasks:
             print(f"   {chalk.green('➡')} {task}")
     elif args.action == "execute":
-        ans = (
-            ask_file_to_run([*Parser.list_all_tasks(), "nevermind..."], "execute")
-            if args.Instruction_Set is None
-            else args.Instruction_Set
-        )
+        ans = choose_task(args, "execute")
+        if ans != None:
+            if args.Trace is None and args.Profile is None:
+                P = Parser(ans, logger)
+                P.execute()
+            else:
+                execute_instrumented(ans, args, logger)
+    elif args.action == "serve":
+        from .daemon import serve, supported
+
+        if not supported():
+            logger.error("Tasker daemon needs Unix sockets, not available on this OS")
+            sys.exit(1)
+        serve(logger)
+    elif args.action == "run":
+        from .jobs import JobRunner, summarize
+
+        runner = JobRunner(logger, args.Workers)
+        for job in (args.Instruction_Set or "").split(","):
+            if job.strip() != "":
+                name, _, priority = job.strip().partition(":")
+                runner.submit(name, int(priority or 0))
+        if args.Queue is not None:
+            runner.submit_file(args.Queue)
+        results = runner.run()
+        summarize(results, logger)
+        if not all(_["ok"] for _ in results):
+            sys.exit(1)
+    elif args.action == "schedule":
+        from .scheduler import Scheduler
+
+        Scheduler(logger, args.Workers).run()
+    elif args.action == "watch":
+        from .watcher import Watcher
+
+        ans = choose_task(args, "watch")
         if ans != None:
-            P = Parser(ans, logger)
-            P.execute()
+            Watcher(ans, logger, args.Debounce).run()
+    elif args.action == "stats":
+        from .history import get_history, report
+
+        ans = choose_task(args, "inspect")
+        if ans != None and not report(ans, get_history(), logger):
+            sys.exit(1)
+    elif args.action == "validate":
+        ans = choose_task(args, "validate")
+        if ans != None and not Parser.validate_task(ans, logger):
+            sys.exit(1)
     elif args.action == "edit":
-        ans = (
-            ask_file_to_run([*Parser.list_all_tasks(), "nevermind..."], "edit")
-            if args.Instruction_Set is None
-            else args.Instruction_Set
-        )
+        ans = choose_task(args, "edit")
         if ans != None:
             Parser.open_file_for_edit(ans)
     elif args.action == "create":
+        from .templater import check_duplicate_names, create_template
+
         if flag_present(["File", "Description", "Name"], args):
             Parser.create_new_task(
                 check_duplicate_names(args.File), args.Name, args.Description
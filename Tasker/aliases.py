@@ -0,0 +1,93 @@
+from typing import Container, Dict, List, Optional, Set, Tuple
+
+from .interpolation import AliasReference, Reference, Template, compile_value
+from .types import Alias
+
+
+class AliasIndex:
+    "Aliases compiled once per run, with nested aliases already expanded"
+
+    def __init__(self, aliases: List[Alias]) -> None:
+        self.__raw: Dict[str, str] = {_["name"]: _["path"] for _ in aliases}
+        self.__paths: Dict[str, str] = {}
+        self.__failed: Set[str] = set()
+        self.errors: List[str] = []
+        for name in self.__raw.keys():
+            self.__expand(name, [])
+
+    def get(self, name: str) -> Optional[str]:
+        return self.__paths.get(name)
+
+    def resolve(self, node: AliasReference) -> Optional[str]:
+        "Get the path of an alias expression. Legacy prefixes use the longest matching alias"
+        if not node.prefix:
+            return self.__paths.get(node.name)
+        match = self.longest_prefix(node.name)
+        if match is None:
+            return None
+        return f"{self.__paths[match[0]]}{match[1]}"
+
+    def longest_prefix(self, value: str) -> Optional[Tuple[str, str]]:
+        "Find the longest alias `value` starts with, returning it and the remaining path"
+        return longest_prefix(value, self.__paths)
+
+    def __expand(self, name: str, chain: List[str]) -> Optional[str]:
+        "Expand an alias defined in terms of other aliases, detecting cycles"
+        if name in self.__paths or name in self.__failed:
+            return self.__paths.get(name)
+        if name in chain:
+            cycle = " → ".join([*chain[chain.index(name) :], name])
+            self.errors.append(f"Alias cycle detected: {cycle}")
+            return None
+        compiled = compile_value(self.__raw[name])
+        if not isinstance(compiled, Template):
+            self.__paths[name] = self.__raw[name]
+            return self.__paths[name]
+        if any(isinstance(_, Reference) for _ in compiled.references()):
+            self.errors.append(f'Alias "{name}" can\'t reference steps')
+            self.__failed.add(name)
+            return None
+        failed = False
+
+        def nested(node: AliasReference) -> str:
+            nonlocal failed
+            match = self.__nested_match(node)
+            if match is None:
+                self.errors.append(f'Alias "{name}" uses unknown alias "{node.source}"')
+                failed = True
+                return ""
+            path = self.__expand(match[0], [*chain, name])
+            if path is None:
+                failed = True
+                return ""
+            return f"{path}{match[1]}"
+
+        folded = compiled.fold(nested)
+        if failed:
+            self.__failed.add(name)
+            return None
+        self.__paths[name] = folded  # type: ignore
+        return self.__paths[name]
+
+    def __nested_match(self, node: AliasReference) -> Optional[Tuple[str, str]]:
+        "Match against every alias, since nested ones may not be expanded yet"
+        if not node.prefix:
+            return (node.name, "") if node.name in self.__raw else None
+        return longest_prefix(node.name, self.__raw)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__paths
+
+    def __len__(self) -> int:
+        return len(self.__paths)
+
+
+def longest_prefix(value: str, names: Container[str]) -> Optional[Tuple[str, str]]:
+    "Split `value` into the longest name it starts with and the remaining path"
+    name, rest = value, ""
+    while name not in names:
+        if "/" not in name:
+            return None
+        name, _, tail = name.rpartition("/")
+        rest = f"/{tail}{rest}"
+    return (name, rest)
@@ -0,0 +1,44 @@
+from Tasker.aliases import AliasIndex
+from Tasker.interpolation import compile_value
+
+
+def test_nested_aliases_are_expanded():
+    index = AliasIndex(
+        [
+            {"name": "backups", "path": "&home/backups"},
+            {"name": "home", "path": "/home/user"},
+            {"name": "daily", "path": "${&backups}/daily"},
+        ]
+    )
+    assert index.errors == []
+    assert index.get("backups") == "/home/user/backups"
+    assert index.get("daily") == "/home/user/backups/daily"
+
+
+def test_longest_prefix_resolution():
+    index = AliasIndex(
+        [
+            {"name": "proj", "path": "/srv/proj"},
+            {"name": "proj/docs", "path": "/srv/docs"},
+        ]
+    )
+    node = compile_value("&proj/docs/api").nodes[0]
+    assert index.resolve(node) == "/srv/docs/api"
+    node = compile_value("&proj/src").nodes[0]
+    assert index.resolve(node) == "/srv/proj/src"
+    assert index.resolve(compile_value("&nope/src").nodes[0]) is None
+
+
+def test_cycles_and_unknown_aliases_are_reported():
+    index = AliasIndex(
+        [
+            {"name": "a", "path": "&b/x"},
+            {"name": "b", "path": "&a/y"},
+            {"name": "c", "path": "&missing/z"},
+        ]
+    )
+    assert index.errors == [
+        "Alias cycle detected: a → b → a",
+        'Alias "c" uses unknown alias "&missing/z"',
+    ]
+    assert "a" not in index and "c" not in index
@@ -0,0 +1,131 @@
+import json
+import os
+import os.path as Path
+import threading
+from typing import Dict, List, Optional
+
+from .types import CatalogEntry
+
+EXTENSION = ".tasker.json"
+CATALOG_VERSION = 2
+
+
+class Catalog:
+    "Index of every InstructionSet, only re-reading the files that changed"
+
+    def __init__(self, location: str, index: str) -> None:
+        self.location = location
+        self.index = index
+        self.__entries: Optional[Dict[str, CatalogEntry]] = None
+
+    def refresh(self) -> List[CatalogEntry]:
+        "Sync the index with the InstructionSets folder and return every entry"
+        known = self.__load()
+        entries: Dict[str, CatalogEntry] = {}
+        changed = False
+        with os.scandir(self.location) as it:
+            for file in it:
+                if not file.name.endswith(EXTENSION) or not file.is_file():
+                    continue
+                name = file.name[: -len(EXTENSION)]
+                stat = file.stat()
+                entry = known.get(name)
+                if (
+                    entry is None
+                    or entry["mtime"] != stat.st_mtime_ns
+                    or entry["size"] != stat.st_size
+                ):
+                    entry = self.__describe(
+                        name, file.path, stat.st_mtime_ns, stat.st_size
+                    )
+                    changed = True
+                entries[name] = entry
+        if changed or len(entries) != len(known):
+            self.__save(entries)
+        self.__entries = entries
+        return list(entries.values())
+
+    def names(self) -> List[str]:
+        return [_["file"] for _ in self.refresh()]
+
+    def exists(self, name: str) -> bool:
+        return Path.isfile(f"{self.location}/{name}{EXTENSION}")
+
+    def query(self, filters: Dict[str, str]) -> List[CatalogEntry]:
+        "Filter entries by `operation`, `extension` or a `name`/`description` substring"
+        entries = self.refresh()
+        for key, value in filters.items():
+            if key == "operation":
+                entries = [_ for _ in entries if value in _["operations"]]
+            elif key == "extension":
+                entries = [_ for _ in entries if value in _["extensions"]]
+            elif key in ["name", "description", "file"]:
+                entries = [_ for _ in entries if value.lower() in str(_[key]).lower()]
+            else:
+                raise KeyError(key)
+        return entries
+
+    def __describe(self, name: str, path: str, mtime: int, size: int) -> CatalogEntry:
+        entry = CatalogEntry(
+            file=name,
+            name=name,
+            description="",
+            tasks=0,
+            operations=[],
+            extensions=[],
+            schedule=None,
+            mtime=mtime,
+            size=size,
+        )
+        try:
+            with open(path, "r") as f:
+                instruction_set = json.load(f)
+            tasks = instruction_set.get("tasks", [])
+            entry["name"] = instruction_set.get("name", name)
+            entry["description"] = instruction_set.get("description", "")
+            entry["tasks"] = len(tasks)
+            entry["operations"] = sorted(set(str(_.get("operation")) for _ in tasks))
+            entry["extensions"] = sorted(
+                set(str(_["extension_name"]) for _ in tasks if "extension_name" in _)
+            )
+            entry["schedule"] = instruction_set.get("schedule")
+        except (OSError, ValueError, AttributeError):
+            # Broken InstructionSets are still listed, `tasker validate` explains them
+            pass
+        return entry
+
+    def __load(self) -> Dict[str, CatalogEntry]:
+        if self.__entries is not None:
+            return self.__entries
+        try:
+            with open(self.index, "r") as f:
+                data = json.load(f)
+            if data.get("version") == CATALOG_VERSION:
+                return data["sets"]
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def __save(self, entries: Dict[str, CatalogEntry]) -> None:
+        temp = f"{self.index}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp, "w") as f:
+                json.dump({"version": CATALOG_VERSION, "sets": entries}, f)
+            os.replace(temp, self.index)
+        except OSError:
+            # The index is only a cache, it is rebuilt on the next run
+            if Path.exists(temp):
+                os.remove(temp)
+
+
+_catalogs: Dict[str, Catalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(root: Optional[str] = None) -> Catalog:
+    "Get the process wide Catalog of `~/.tasker/Tasks`"
+    root = root or f"{Path.expanduser('~')}/.tasker"
+    with _catalogs_lock:
+        if root not in _catalogs:
+            _catalogs[root] = Catalog(f"{root}/Tasks", f"{root}/catalog.json")
+        return _catalogs[root]
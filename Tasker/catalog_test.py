@@ -0,0 +1,32 @@
+import json
+import os
+
+from Tasker.catalog import Catalog
+
+
+def _write(tmp_path, name, operations):
+    tasks = [
+        {"name": f"{op} {i}", "step": i, "operation": op}
+        for i, op in enumerate(operations)
+    ]
+    with open(f"{tmp_path}/Tasks/{name}.tasker.json", "w") as f:
+        json.dump({"name": name.title(), "description": "", "tasks": tasks}, f)
+
+
+def test_catalog_updates_incrementally(tmp_path):
+    os.mkdir(f"{tmp_path}/Tasks")
+    _write(tmp_path, "backup", ["copy", "zip"])
+    _write(tmp_path, "notify", ["request"])
+    catalog = Catalog(f"{tmp_path}/Tasks", f"{tmp_path}/catalog.json")
+    assert sorted(catalog.names()) == ["backup", "notify"]
+    assert [_["file"] for _ in catalog.query({"operation": "zip"})] == ["backup"]
+
+    # A new Catalog instance reuses the stored index
+    catalog = Catalog(f"{tmp_path}/Tasks", f"{tmp_path}/catalog.json")
+    _write(tmp_path, "notify", ["request", "zip"])
+    os.remove(f"{tmp_path}/Tasks/backup.tasker.json")
+    entries = catalog.refresh()
+    assert [(_["file"], _["tasks"]) for _ in entries] == [("notify", 2)]
+    assert catalog.exists("notify") and not catalog.exists("backup")
+    with open(f"{tmp_path}/catalog.json") as f:
+        assert list(json.load(f)["sets"].keys()) == ["notify"]
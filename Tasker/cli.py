@@ -1,22 +1,39 @@
 import argparse
 import logging
 from os import environ as env
-from typing import List, Union
+from typing import List, Optional, Union
 
 import chalk
 
+from .logs import LogFormat, setup
 
-def get_logger() -> logging.Logger:
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format=f'[{chalk.blue("%(levelname)s")}] → %(message)s',
-        datefmt="%H:%M:%S",
-    )
+# Actions executing InstructionSets, their records are written by a background thread
+QUEUED_ACTIONS = ["execute", "run", "schedule", "watch", "serve"]
+
+
+def get_logger(
+    log_format: LogFormat = "text", file: Optional[str] = None, queued: bool = False
+) -> logging.Logger:
+    "Configure the logging of the CLI and get its logger. See `Tasker.logs.setup`"
+    setup(log_format, file, queued)
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.DEBUG)
     return logger
 
 
+def profile_modes(value: str) -> List[str]:
+    "Comma separated modes of `--Profile`"
+    from .profiling import PROFILE_MODES
+
+    modes = [_.strip() for _ in value.split(",")]
+    unknown = [_ for _ in modes if _ not in PROFILE_MODES]
+    if len(unknown) > 0:
+        raise argparse.ArgumentTypeError(
+            f"invalid choice: {', '.join(map(repr, unknown))} (choose from {', '.join(PROFILE_MODES)})"
+        )
+    return modes
+
+
 def get_args(version: str, logger: logging.Logger) -> argparse.Namespace:
     "Create Argument parser for CLI use and return all the parsed args"
     parser = argparse.ArgumentParser(
@@ -33,6 +50,12 @@ def get_args(version: str, logger: logging.Logger) -> argparse.Namespace:
         choices=[
             "list",
             "execute",
+            "validate",
+            "serve",
+            "run",
+            "schedule",
+            "watch",
+            "stats",
             "create",
             "edit",
             "extension",
@@ -51,7 +74,7 @@ def get_args(version: str, logger: logging.Logger) -> argparse.Namespace:
         type=str,
         metavar="",
         required=False,
-        help=f"Instruction Set name flag. Use {chalk.green('`tasker list`')} for a list with all InstructionSets",
+        help=f"Instruction Set name flag. Use {chalk.green('`tasker list`')} for a list with all InstructionSets. On `run`, a comma separated list of `name[:priority]`",
     )
     options.add_argument(
         "-e",
@@ -93,6 +116,62 @@ def get_args(version: str, logger: logging.Logger) -> argparse.Namespace:
         required=False,
         help="Path alias argument.",
     )
+    options.add_argument(
+        "-F",
+        "--Filter",
+        type=str,
+        metavar="",
+        action="append",
+        required=False,
+        help="Usable only on `list`. Filter InstructionSets with `key=value`, like `operation=zip`.",
+    )
+    options.add_argument(
+        "-q",
+        "--Queue",
+        type=str,
+        metavar="",
+        required=False,
+        help="Usable only on `run`. File with one `<InstructionSet> [priority]` per line.",
+    )
+    options.add_argument(
+        "-w",
+        "--Workers",
+        type=int,
+        metavar="",
+        required=False,
+        help="Usable only on `run` and `schedule`. InstructionSets executed at the same time. Defaults to the CPU count.",
+    )
+    options.add_argument(
+        "-db",
+        "--Debounce",
+        type=float,
+        metavar="",
+        required=False,
+        help="Usable only on `watch`. Seconds without changes before executing again. Defaults to 0.5.",
+    )
+    options.add_argument(
+        "-tr",
+        "--Trace",
+        type=str,
+        metavar="",
+        required=False,
+        help="Usable only on `execute`. Write the time spent on every phase and Task to a Chrome trace file, or OTLP JSON when it ends in `.otlp.json`.",
+    )
+    options.add_argument(
+        "-pr",
+        "--Profile",
+        type=profile_modes,
+        metavar="",
+        required=False,
+        help="Usable only on `execute`. Profile every Task with `cpu` (cProfile), `memory` (tracemalloc) or `cpu,memory`, writing a file per Task to `<InstructionSet>-profile` and a summary of the heaviest functions.",
+    )
+    options.add_argument(
+        "-vd",
+        "--Via-Daemon",
+        "--via-daemon",
+        action="store_true",
+        help="Usable only on `execute`. Run the InstructionSet on the `tasker serve` daemon.",
+    )
     options.add_argument(
         "-nw",
         "--No-Warning",
@@ -111,6 +190,29 @@ def get_args(version: str, logger: logging.Logger) -> argparse.Namespace:
         action="store_true",
         help="Disables normal logging, only shows Warnings and Errors.",
     )
+    options.add_argument(
+        "-nh",
+        "--No-History",
+        action="store_true",
+        help="Executions are not added to the run history used by `stats`.",
+    )
+    options.add_argument(
+        "-lf",
+        "--Log-Format",
+        type=str,
+        metavar="",
+        choices=["text", "json"],
+        default="text",
+        help="`json` writes every log record as a JSON line, for machines to read. Defaults to `text`.",
+    )
+    options.add_argument(
+        "-lp",
+        "--Log-Path",
+        type=str,
+        metavar="",
+        required=False,
+        help="Also write every log record to this file, as JSON lines.",
+    )
     options.add_argument(
         "-u",
         "--Update",
@@ -122,6 +224,13 @@ def get_args(version: str, logger: logging.Logger) -> argparse.Namespace:
         env["-No-Warning"] = "1"
     if args.No_Rollback:
         env["-No-Rollback"] = "1"
+    if args.Log_Format != "text":
+        # Read by the worker processes
+        env["-Log-Format"] = args.Log_Format
+    if args.action in QUEUED_ACTIONS or args.Log_Format != "text" or args.Log_Path:
+        setup(args.Log_Format, args.Log_Path, args.action in QUEUED_ACTIONS)
+    if args.No_History:
+        env["-No-History"] = "1"
     if args.No_Output:
         logger.setLevel(logging.WARNING)
     return args
@@ -1,43 +1,28 @@
+import os
 import os.path as Path
 import subprocess
 import sys
+import threading
 from hashlib import md5
 from os import listdir
-from time import time
+from time import perf_counter, time
+from typing import Any, List
 
-from .types import Alias, OperationType
+from .interpolation import FORBIDDEN_REF_ALIAS
+from .types import OperationType
 
-FORBIDDEN_REF_ALIAS = ["name", "step", "operation"]
+# `requests.Session` is not thread safe, parallel Request Tasks get one per thread
+_http = threading.local()
 
 
 def ref(self: OperationType) -> None:
-    for key in [_ for _ in self.task.keys() if _ not in FORBIDDEN_REF_ALIAS]:
-        if type(self.task[key]) == str and self.task[key].startswith("$"):
-            if "." in self.task[key]:
-                _ = self.task[key].split(".")
-                step = self.context._get_step_reference(self.task, _[0])
-                self.task[key] = step[_[1]]
-            else:
-                step = self.context._get_step_reference(self.task, self.task[key])
-                self.task[key] = step[key]
+    "Resolve the references and aliases of the current Task"
+    self.context._interpolate(self.task)
 
 
 def alias(self: OperationType) -> None:
-    for key in [_ for _ in self.task.keys() if _ not in FORBIDDEN_REF_ALIAS]:
-        if type(self.task[key]) == str and self.task[key].startswith("&"):
-            p = self.task[key].split("/")
-            trigger = p[0].replace("&", "")
-            p = p[1:] if len(p) > 1 else []
-            alias: Alias = next(
-                (p for p in self.context.settings["alias"] if p["name"] == trigger),
-                Alias(name="home", path=Path.expanduser("~")),
-            )
-            self.task[key] = "/".join(
-                [
-                    alias["path"],
-                    *p,
-                ]
-            )
+    "Kept for Extensions created before `ref` also resolved aliases"
+    self.context._interpolate(self.task)
 
 
 def get_file_name(p: str) -> str:
@@ -46,6 +31,24 @@ def get_file_name(p: str) -> str:
     return p
 
 
+def get_all_file_paths(directory: str) -> List[str]:
+    file_paths = []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            file_paths.append(Path.join(root, filename).replace("\\", "/"))
+    return file_paths
+
+
+def http_session() -> Any:
+    "`requests.Session` of the current thread, reusing connections between Request Tasks"
+    session = getattr(_http, "session", None)
+    if session is None:
+        import requests
+
+        session = _http.session = requests.Session()
+    return session
+
+
 def md5_hash(string: str) -> str:
     return f"{string}_{md5(f'{time()}'.encode('UTF-8')).hexdigest()[:6]}"
 
@@ -64,11 +67,11 @@ class Timer:
 
     def start(self) -> None:
         if self.start_time == 0.0:
-            self.start_time = time()
+            self.start_time = perf_counter()
 
     def stop(self) -> None:
         if self.end_time == 0.0:
-            self.end_time = time()
+            self.end_time = perf_counter()
             self.ellapsed_time = f"{round(self.end_time-self.start_time, 4)}s"
 
     def reset(self) -> None:
@@ -0,0 +1,215 @@
+import codecs
+import json
+import logging
+import os
+import os.path as Path
+import socket
+import sys
+import threading
+from contextlib import contextmanager, redirect_stdout
+from os import environ as env
+from typing import Any, Dict, Iterator, Optional
+
+# Environment flags set by the CLI, applied to a single job of the daemon
+JOB_FLAGS = ["-No-Rollback", "-No-History"]
+# Operations asking the console, which the client of a served job can't answer
+INTERACTIVE = ["input"]
+# Seconds waited for the output of processes a job left running in the background
+DRAIN = 1
+
+
+def socket_path() -> str:
+    return f"{Path.expanduser('~')}/.tasker/tasker.sock"
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+class _Stream:
+    "Writable file sending everything written to it as `output` messages"
+
+    def __init__(self, connection: socket.socket) -> None:
+        self.connection = connection
+
+    def write(self, text: str) -> int:
+        send(self.connection, {"type": "output", "text": text})
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+class _Handler(logging.Handler):
+    "Logging Handler sending records as `log` messages"
+
+    def __init__(self, connection: socket.socket) -> None:
+        super().__init__()
+        self.connection = connection
+
+    def emit(self, record: logging.LogRecord) -> None:
+        send(
+            self.connection,
+            {"type": "log", "level": record.levelno, "message": record.getMessage()},
+        )
+
+
+@contextmanager
+def _captured(connection: socket.socket) -> Iterator[None]:
+    """Send everything the job writes to stdout to the client, the output of Command
+    processes included, and give it an empty stdin. Served jobs run one at a time"""
+    stream = _Stream(connection)
+    read, write = os.pipe()
+    null = os.open(os.devnull, os.O_RDONLY)
+    sys.stdout.flush()
+    saved = [os.dup(0), os.dup(1)]
+    forwarder = threading.Thread(target=_forward, args=(read, stream), daemon=True)
+    forwarder.start()
+    os.dup2(null, 0)
+    os.dup2(write, 1)
+    os.close(null)
+    os.close(write)
+    try:
+        with redirect_stdout(stream):  # type: ignore
+            yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved[0], 0)
+        os.dup2(saved[1], 1)
+        for fd in saved:
+            os.close(fd)
+        forwarder.join(DRAIN)
+
+
+def _forward(fd: int, stream: _Stream) -> None:
+    decoder = codecs.getincrementaldecoder("UTF-8")("replace")
+    try:
+        while True:
+            data = os.read(fd, 65536)
+            if len(data) == 0:
+                break
+            stream.write(decoder.decode(data))
+    finally:
+        os.close(fd)
+
+
+def send(connection: socket.socket, message: Dict[str, Any]) -> None:
+    "Send a JSON line. Clients that went away are ignored, the job keeps running"
+    try:
+        connection.sendall(f"{json.dumps(message, default=str)}\n".encode("UTF-8"))
+    except OSError:
+        pass
+
+
+def serve(logger: logging.Logger) -> None:
+    "Accept jobs over the daemon socket, one at a time, until stopped"
+    from .parser import Parser
+
+    path = socket_path()
+    if Path.exists(path):
+        if ping():
+            logger.error(f"Tasker daemon is already running on {path}")
+            return
+        os.remove(path)
+    Parser.do_config()
+    # There is nobody to answer the OS warning
+    env["-No-Warning"] = "1"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen()
+    logger.info(f"Tasker daemon listening on {path}")
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    request = json.loads(connection.makefile("r").readline())
+                except ValueError:
+                    send(connection, {"type": "result", "ok": False})
+                    continue
+                if request.get("action") == "stop":
+                    send(connection, {"type": "result", "ok": True})
+                    break
+                if request.get("action") == "execute":
+                    _execute(connection, request, logger)
+                else:
+                    send(connection, {"type": "result", "ok": True})
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.remove(path)
+        logger.info("Tasker daemon stopped")
+
+
+def _execute(
+    connection: socket.socket, request: Dict[str, Any], logger: logging.Logger
+) -> None:
+    from .errors import TaskerError
+    from .parser import Parser
+
+    job = logging.getLogger("Tasker.daemon.job")
+    job.propagate = False
+    job.setLevel(request.get("level", logging.DEBUG))
+    handler = _Handler(connection)
+    job.addHandler(handler)
+    flags = {_: env.pop(_, None) for _ in JOB_FLAGS}
+    for flag in request.get("flags", []):
+        if flag in JOB_FLAGS:
+            env[flag] = "1"
+    ok = False
+    execution: Dict[str, Any] = {}
+    logger.info(f"Executing {request.get('instruction_set')}")
+    try:
+        with _captured(connection):
+            parser = Parser(request["instruction_set"], job)
+            interactive = [
+                _["name"] for _ in parser.task["tasks"] if _["operation"] in INTERACTIVE
+            ]
+            if len(interactive) > 0:
+                names = ", ".join(f'"{_}"' for _ in interactive)
+                reason = f"{names} can't ask the console through the daemon, execute without --Via-Daemon"
+                parser.abort(reason)
+            parser.execute()
+        execution = parser.execution
+        ok = parser.result()["ok"]
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+    except TaskerError:
+        # Already logged to the client
+        pass
+    except Exception as e:
+        job.error(f"Tasker daemon failed: {e}")
+    finally:
+        job.removeHandler(handler)
+        for flag, value in flags.items():
+            env.pop(flag, None)
+            if value is not None:
+                env[flag] = value
+    send(connection, {"type": "result", "ok": ok, "execution": execution})
+
+
+def request(message: Dict[str, Any], logger: Optional[logging.Logger] = None) -> bool:
+    """Send a request to the daemon, replaying its logs and output.
+    Returns whether it succeeded. Raises OSError when the daemon is not running"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path())
+        client.sendall(f"{json.dumps(message)}\n".encode("UTF-8"))
+        for line in client.makefile("r", encoding="UTF-8"):
+            reply = json.loads(line)
+            if reply["type"] == "log" and logger is not None:
+                logger.log(reply["level"], reply["message"])
+            elif reply["type"] == "output":
+                print(reply["text"], end="")
+            elif reply["type"] == "result":
+                return reply["ok"]
+    return False
+
+
+def ping() -> bool:
+    "Check if a daemon is answering on the socket"
+    try:
+        return request({"action": "ping"})
+    except OSError:
+        return False
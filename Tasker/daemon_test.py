@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from Tasker import daemon
+
+pytestmark = pytest.mark.skipif(not daemon.supported(), reason="Needs Unix sockets")
+
+
+def test_daemon_streams_logs_and_stops(tmp_path, monkeypatch, caplog):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("-No-Warning", "1")
+    server = threading.Thread(target=daemon.serve, args=(logging.getLogger("test"),))
+    server.start()
+    while not daemon.ping():
+        time.sleep(0.05)
+    logger = logging.getLogger("test.client")
+    with caplog.at_level(logging.DEBUG, logger="test.client"):
+        assert not daemon.request(
+            {"action": "execute", "instruction_set": "missing"}, logger
+        )
+    assert "'missing' InstructionSet was not found" in caplog.text
+    assert daemon.request({"action": "stop"})
+    server.join(5)
+    assert not os.path.exists(daemon.socket_path())
+
+
+def test_daemon_sends_command_output_and_failures(tmp_path, monkeypatch, caplog, capsys):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("-No-Warning", "1")
+    # Its own process, the stdout of a job would be the one of the client otherwise
+    server = subprocess.Popen(
+        [sys.executable, "-c", "from Tasker.__main__ import main; main()", "serve"],
+        cwd=os.path.dirname(os.path.dirname(daemon.__file__)),
+        stderr=subprocess.DEVNULL,
+    )
+    while not daemon.ping():
+        time.sleep(0.05)
+    shell = {"name": "shell", "step": 0, "operation": "command", "output": False}
+    instruction_sets = {
+        "served": [
+            dict(shell, command="echo from the shell"),
+            dict(shell, name="failing", step=1, command=["exit 3"]),
+        ],
+        "asking": [{"name": "ask", "step": 0, "operation": "input", "question": "?"}],
+    }
+    for name, tasks in instruction_sets.items():
+        (tmp_path / ".tasker" / "Tasks" / f"{name}.tasker.json").write_text(
+            json.dumps({"name": name, "description": "", "tasks": tasks})
+        )
+    logger = logging.getLogger("test.client")
+    try:
+        with caplog.at_level(logging.DEBUG, logger="test.client"):
+            for name in instruction_sets:
+                # The client of a failed Task exits with an error
+                assert not daemon.request(
+                    {"action": "execute", "instruction_set": name}, logger
+                )
+    finally:
+        assert daemon.request({"action": "stop"})
+        server.wait(5)
+    # Written by the shell, not by Python
+    assert "from the shell" in capsys.readouterr().out
+    assert '"ask" can\'t ask the console through the daemon' in caplog.text
@@ -0,0 +1,191 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Awaitable, Dict, List, NamedTuple, Optional, Tuple
+
+from .common import get_all_file_paths
+from .outputs import collect_outputs
+from .types import OperationType, Settings, Task
+
+# Threads available to the synchronous Operations of a parallel group
+MAX_THREADS = 64
+
+
+class WorkerJob(NamedTuple):
+    "CPU bound Operation sent to a worker process, with its Task already resolved"
+    operation: str  # Registered Operation name
+    # (file, path) of the Extension of `custom` Tasks
+    extension: Optional[Tuple[str, str]]
+    task: Task
+    settings: Settings
+    logger: str
+
+
+class WorkerError(Exception):
+    "Exception of an Operation executed in a worker process, with the result it left"
+
+    def __init__(self, error: BaseException, result: Dict[str, Any]) -> None:
+        super().__init__(error, result)
+        self.error = error
+        self.result = result
+
+
+class WorkerContext:
+    "Parser stand-in given to the Operations executed in a worker process"
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+
+    def _interpolate(self, task: Task) -> None:
+        # Tasks are resolved by the Parser before being sent
+        pass
+
+    def _get_all_file_paths(self, directory: str) -> List[str]:
+        return get_all_file_paths(directory)
+
+    def _changed_files(
+        self, directory: str, recursive: bool = True
+    ) -> Optional[List[str]]:
+        return None
+
+
+def parallel_groups(tasks: List[Task]) -> List[List[Task]]:
+    "Split the sorted Tasks into the groups executed together"
+    groups: List[List[Task]] = []
+    for task in tasks:
+        if (
+            task.get("parallel", False)
+            and len(groups) > 0
+            and groups[-1][-1].get("parallel", False)
+        ):
+            groups[-1].append(task)
+        else:
+            groups.append([task])
+    return groups
+
+
+def group_index(tasks: List[Task]) -> Dict[int, int]:
+    "Map every step to the index of the group executing it"
+    ordered = sorted(tasks, key=lambda d: d["step"])
+    return {
+        task["step"]: index
+        for index, group in enumerate(parallel_groups(ordered))
+        for task in group
+    }
+
+
+def process_context() -> Any:
+    "Start worker processes from a clean interpreter, as forking a threaded Parser can deadlock"
+    import multiprocessing
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def initialize_worker() -> None:
+    from .cli import get_logger
+
+    # Spawned workers start without the logging configuration of the Parser. They exit
+    # without running `atexit`, so records are not queued
+    get_logger(os.environ.get("-Log-Format", "text"))  # type: ignore
+
+
+def run_in_worker(job: WorkerJob) -> Dict[str, Any]:
+    "Execute a WorkerJob, returning the state, outputs and affected files of the Operation"
+    if job.extension is not None:
+        from .extensions import load_extension
+
+        operation = load_extension(*job.extension).Extension
+    else:
+        from .registry import get_operation
+
+        operation = get_operation(job.operation).operation  # type: ignore
+    function: OperationType = operation(
+        WorkerContext(job.settings), job.task, getLogger(job.logger)
+    )
+    try:
+        function.execute()
+    except Exception as e:
+        # Files affected before failing are still needed by the rollback
+        raise WorkerError(e, worker_result(function))
+    return worker_result(function)
+
+
+def worker_result(function: OperationType) -> Dict[str, Any]:
+    "State, outputs and affected files of an Operation executed in another process"
+    return {
+        "state": function.get_state(),
+        "attributes": {
+            "affected_files": function.affected_files,
+            **collect_outputs(function),
+        },
+    }
+
+
+def run_concurrently(
+    operations: List[OperationType],
+    jobs: Optional[List[Optional[WorkerJob]]] = None,
+    timings: Optional[List[Tuple[float, float]]] = None,
+) -> List[Optional[BaseException]]:
+    """Run the Operations at the same time, returning the exception raised by each one.
+    Operations with a WorkerJob are executed in a process pool instead of a thread.
+    `timings` gets the `perf_counter` start and end of every Operation"""
+    import asyncio
+
+    jobs = jobs or [None] * len(operations)
+    workers = len([_ for _ in jobs if _ is not None])
+
+    def _apply(operation: OperationType, result: Dict[str, Any]) -> None:
+        for key, value in result["attributes"].items():
+            setattr(operation, key, value)
+        operation.set_state(result["state"])
+
+    async def _run_job(operation: OperationType, job: WorkerJob, pool: Executor) -> None:
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                pool, run_in_worker, job
+            )
+        except WorkerError as e:
+            _apply(operation, e.result)
+            raise e.error
+        _apply(operation, result)
+
+    async def _timed(index: int, awaitable: Awaitable[None]) -> None:
+        start = perf_counter()
+        try:
+            await awaitable
+        finally:
+            if timings is not None:
+                timings[index] = (start, perf_counter())
+
+    async def _run(pool: Optional[Executor]) -> list:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=min(len(operations), MAX_THREADS))
+        )
+        return await asyncio.gather(
+            *(
+                _timed(
+                    index,
+                    _run_job(operation, job, pool)  # type: ignore
+                    if job is not None
+                    else operation.aexecute(),
+                )
+                for index, (operation, job) in enumerate(zip(operations, jobs))  # type: ignore
+            ),
+            return_exceptions=True,
+        )
+
+    if workers == 0:
+        results = asyncio.run(_run(None))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, os.cpu_count() or 1),
+            mp_context=process_context(),
+            initializer=initialize_worker,
+        ) as pool:
+            results = asyncio.run(_run(pool))
+    return [_ if isinstance(_, BaseException) else None for _ in results]
@@ -0,0 +1,95 @@
+import asyncio
+import os
+from time import perf_counter, sleep
+
+from Tasker.engine import WorkerJob, group_index, parallel_groups, run_concurrently
+from Tasker.types import OperationType
+
+
+class Slow(OperationType):
+    def execute(self) -> None:
+        sleep(0.2)
+
+
+class Async(OperationType):
+    async def aexecute(self) -> None:
+        await asyncio.sleep(0.2)
+
+
+class Broken(OperationType):
+    def execute(self) -> None:
+        raise ValueError("broken")
+
+
+def test_parallel_groups():
+    tasks = [
+        {"step": 0},
+        {"step": 1, "parallel": True},
+        {"step": 2, "parallel": True},
+        {"step": 3},
+        {"step": 4, "parallel": True},
+    ]
+    groups = parallel_groups(tasks)
+    assert [[_["step"] for _ in group] for group in groups] == [[0], [1, 2], [3], [4]]
+    assert group_index(list(reversed(tasks))) == {0: 0, 1: 1, 2: 1, 3: 2, 4: 3}
+
+
+def test_run_concurrently():
+    start = perf_counter()
+    errors = run_concurrently([Slow(), Slow(), Async(), Async(), Broken()])
+    assert perf_counter() - start < 0.6
+    assert errors[:4] == [None, None, None, None]
+    assert isinstance(errors[4], ValueError)
+
+
+EXTENSION = """
+import os
+
+from Tasker.types import OperationType
+
+
+class Extension(OperationType):
+    _outputs = ("pid",)
+    _cpu_bound = True
+
+    def __init__(self, ctx, task, logger) -> None:
+        self.task = task
+        self.affected_files = []
+        self.state = True
+
+    def execute(self) -> None:
+        self.pid = os.getpid()
+        self.affected_files = [self.task["target"]]
+        if self.task.get("fail"):
+            raise ValueError("failed after the first file")
+
+    def get_state(self) -> bool:
+        return self.state
+
+    def set_state(self, state: bool) -> None:
+        self.state = state
+"""
+
+
+def test_cpu_bound_operations_run_in_worker_processes(tmp_path):
+    path = tmp_path / "extension_cpu.py"
+    path.write_text(EXTENSION)
+    task = {"name": "cpu", "step": 0, "operation": "custom", "target": "a.txt"}
+    operation = Slow()
+    job = WorkerJob("custom", ("extension_cpu.py", str(path)), task, {}, "test")
+    assert run_concurrently([operation], [job]) == [None]
+    assert operation.affected_files == ["a.txt"]
+    assert operation.pid != os.getpid()
+
+
+def test_failed_worker_operations_keep_their_affected_files(tmp_path):
+    path = tmp_path / "extension_fail.py"
+    path.write_text(EXTENSION)
+    task = {"name": "cpu", "step": 0, "operation": "custom", "target": "a.txt"}
+    task["fail"] = True
+    operation = Slow()
+    job = WorkerJob("custom", ("extension_fail.py", str(path)), task, {}, "test")
+    [error] = run_concurrently([operation], [job])
+    assert isinstance(error, ValueError)
+    # Sent back for the rollback
+    assert operation.affected_files == ["a.txt"]
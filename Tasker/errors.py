@@ -0,0 +1,13 @@
+from typing import List
+
+
+class TaskerError(Exception):
+    "Raised when Tasker can't go on. The reason has already been logged"
+
+
+class InstructionSetError(TaskerError):
+    "The InstructionSet is invalid. `errors` lists every problem found"
+
+    def __init__(self, errors: List[str]) -> None:
+        super().__init__("\n".join(errors))
+        self.errors = errors
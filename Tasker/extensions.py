@@ -0,0 +1,39 @@
+import os
+import sys
+from importlib.util import module_from_spec, spec_from_file_location
+from threading import Lock
+from types import ModuleType
+from typing import Dict, Tuple
+
+# Imported extensions, by path, with the (mtime, size) of the file they came from
+_modules: Dict[str, Tuple[Tuple[int, int], ModuleType]] = {}
+# Jobs running in threads must not import the same extension twice
+_lock = Lock()
+
+
+def load_extension(file: str, path: str) -> ModuleType:
+    """Import an extension file once per process. Bytecode is cached by `importlib` in
+    the `__pycache__` folder next to it, so unchanged extensions are not compiled again"""
+    with _lock:
+        return _load(file, path)
+
+
+def _load(file: str, path: str) -> ModuleType:
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _modules.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    name = f"tasker_extensions.{file.replace('.py', '')}"
+    spec = spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import {path}")
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    _modules[path] = (key, module)
+    return module
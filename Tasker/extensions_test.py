@@ -0,0 +1,14 @@
+import os
+
+from Tasker.extensions import load_extension
+
+
+def test_extensions_are_memoized_until_changed(tmp_path):
+    path = tmp_path / "extension_test.py"
+    path.write_text("VALUE = 1\n")
+    first = load_extension("extension_test.py", str(path))
+    assert first.VALUE == 1
+    assert load_extension("extension_test.py", str(path)) is first
+    path.write_text("VALUE = 22\n")
+    os.utime(path, ns=(0, 0))
+    assert load_extension("extension_test.py", str(path)).VALUE == 22
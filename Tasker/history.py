@@ -0,0 +1,204 @@
+import os.path as Path
+import sqlite3
+import threading
+from logging import Logger
+from statistics import median
+from typing import Dict, List, Optional, Tuple
+
+import chalk
+
+from .logs import flush
+from .types import ExecutionResult, TaskStats
+
+# Runs used by `tasker stats`
+WINDOW = 50
+# The latest runs of a Task, compared against the ones before them
+RECENT = 5
+# Slower than this ratio of its baseline median is a regression...
+THRESHOLD = 1.5
+# ...unless it is only this many seconds slower, which is noise
+NOISE = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    instruction_set TEXT NOT NULL,
+    started REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    initialization REAL NOT NULL,
+    execution REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    step INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    files INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_set ON runs(instruction_set, started);
+CREATE INDEX IF NOT EXISTS tasks_by_run ON tasks(run);
+"""
+
+
+class History:
+    "SQLite database of every execution, with the duration and size of each Task"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Shared by the threads of `tasker run`, `schedule` and `serve`
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        # Other processes keep reading while a run is written
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        self.__db.execute("PRAGMA synchronous=NORMAL")
+        self.__db.executescript(SCHEMA)
+
+    def record(
+        self, result: ExecutionResult, started: float, name: Optional[str] = None
+    ) -> int:
+        """Store an execution started at the `started` timestamp and return its id.
+        `name` is the file of the InstructionSet, its `name` otherwise"""
+        with self.__lock, self.__db:
+            run = self.__db.execute(
+                "INSERT INTO runs (instruction_set, started, ok, initialization, execution) VALUES (?, ?, ?, ?, ?)",
+                (
+                    name or result["instruction_set"],
+                    started,
+                    result["ok"],
+                    result["initialization"],
+                    result["execution"],
+                ),
+            ).lastrowid
+            self.__db.executemany(
+                "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run,
+                        _["step"],
+                        _["name"],
+                        _["operation"],
+                        _["ok"],
+                        _["duration"],
+                        _["files"],
+                        _["bytes"],
+                        _["error"],
+                    )
+                    for _ in result["tasks"]
+                ],
+            )
+        return run or 0
+
+    def runs(self, instruction_set: str, limit: int = WINDOW) -> List[Tuple[int, bool]]:
+        "Id and outcome of the latest runs of the InstructionSet, newest first"
+        with self.__lock:
+            rows = self.__db.execute(
+                "SELECT id, ok FROM runs WHERE instruction_set = ? ORDER BY started DESC, id DESC LIMIT ?",
+                (instruction_set, limit),
+            ).fetchall()
+        return [(id, bool(ok)) for id, ok in rows]
+
+    def stats(self, instruction_set: str, limit: int = WINDOW) -> List[TaskStats]:
+        "Percentiles of the successful durations of each Task over the latest runs"
+        runs = self.runs(instruction_set, limit)
+        if len(runs) == 0:
+            return []
+        ids = [_ for _, _ok in runs]
+        with self.__lock:
+            rows = self.__db.execute(
+                f"SELECT run, step, name, duration, files, bytes FROM tasks WHERE ok AND run IN ({','.join('?' * len(ids))})",
+                ids,
+            ).fetchall()
+        order = {id: i for i, id in enumerate(ids)}
+        tasks: Dict[Tuple[int, str], List[Tuple[int, float, int, int]]] = {}
+        for run, step, name, duration, files, size in rows:
+            tasks.setdefault((step, name), []).append((order[run], duration, files, size))
+        stats = []
+        for (step, name), samples in sorted(tasks.items()):
+            # Newest first
+            samples.sort()
+            durations = [_[1] for _ in samples]
+            baseline, slower = regression(durations)
+            stats.append(
+                TaskStats(
+                    step=step,
+                    name=name,
+                    runs=len(samples),
+                    p50=percentile(durations, 50),
+                    p95=percentile(durations, 95),
+                    max=max(durations),
+                    last=durations[0],
+                    files=samples[0][2],
+                    bytes=samples[0][3],
+                    baseline=baseline,
+                    regression=slower,
+                )
+            )
+        return stats
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__db.close()
+
+
+def percentile(values: List[float], p: float) -> float:
+    "Nearest-rank percentile"
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def regression(durations: List[float]) -> Tuple[Optional[float], bool]:
+    """Baseline median of the durations before the RECENT latest ones, newest first, and
+    whether the recent median got slower than it"""
+    recent, previous = durations[:RECENT], durations[RECENT:]
+    if len(recent) < RECENT or len(previous) < RECENT:
+        return None, False
+    baseline = median(previous)
+    now = median(recent)
+    return baseline, now - baseline > NOISE and now > baseline * THRESHOLD
+
+
+def report(instruction_set: str, history: History, logger: Logger) -> bool:
+    "Log the latency of every Task of the InstructionSet, returning False on regressions"
+    runs = history.runs(instruction_set)
+    if len(runs) == 0:
+        logger.warning(f"'{instruction_set}' has no executions in the run history")
+        return True
+    failed = len([_ for _, ok in runs if not ok])
+    flush()
+    print()
+    print(f"--------------  {instruction_set}  --------------")
+    print()
+    logger.info(f"{len(runs)} latest runs, {failed} failed")
+    ok = True
+    for task in history.stats(instruction_set):
+        timings = ", ".join(
+            f"{key} {task[key]:.3f}s" for key in ["p50", "p95", "max", "last"]
+        )
+        line = f"Task \"{task['name']}\" - {task['runs']} runs ({timings}) - {task['files']} files, {task['bytes']} bytes"
+        if task["regression"]:
+            ok = False
+            logger.warning(
+                f"{line} - {chalk.red('SLOWER')} than its baseline of {task['baseline']:.3f}s"
+            )
+        else:
+            logger.info(line)
+    return ok
+
+
+_histories: Dict[str, History] = {}
+_histories_lock = threading.Lock()
+
+
+def get_history(root: Optional[str] = None) -> History:
+    "Get the process wide History of `~/.tasker`"
+    root = root or f"{Path.expanduser('~')}/.tasker"
+    # Threads of `tasker run`, `schedule` and `serve` would open a database each
+    with _histories_lock:
+        if root not in _histories:
+            _histories[root] = History(f"{root}/history.db")
+        return _histories[root]
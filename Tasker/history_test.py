@@ -0,0 +1,70 @@
+import threading
+
+from Tasker.common import http_session
+from Tasker.history import History, get_history, percentile, regression
+from Tasker.types import ExecutionResult, TaskResult
+
+
+def execution(duration: float, ok: bool = True) -> ExecutionResult:
+    task = TaskResult(
+        name="copy",
+        step=0,
+        operation="copy",
+        ok=ok,
+        duration=duration,
+        files=2,
+        bytes=10,
+        outputs={},
+        error=None if ok else "failed",
+    )
+    return ExecutionResult(
+        instruction_set="Copy files", ok=ok, tasks=[task], initialization=0, execution=0
+    )
+
+
+def test_percentiles():
+    values = [float(_) for _ in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([3.0], 95) == 3
+
+
+def test_regression():
+    # Newest first
+    assert regression([1.0] * 5 + [0.5] * 5) == (0.5, True)
+    assert regression([0.52] * 5 + [0.5] * 5) == (0.5, False)
+    # Fast Tasks are not flagged over a few milliseconds
+    assert regression([0.003] * 5 + [0.001] * 5) == (0.001, False)
+    assert regression([1.0] * 9) == (None, False)
+
+
+def test_stats(tmp_path):
+    history = History(f"{tmp_path}/history.db")
+    for i in range(10):
+        history.record(execution(0.1 if i < 5 else 0.5), float(i), "copy")
+    # Failed runs don't count towards the latencies
+    history.record(execution(9, ok=False), 10.0, "copy")
+    assert history.runs("copy")[0] == (11, False)
+    [stats] = history.stats("copy")
+    assert stats["runs"] == 10 and stats["last"] == 0.5 and stats["max"] == 0.5
+    assert stats["files"] == 2 and stats["bytes"] == 10
+    assert stats["baseline"] == 0.1 and stats["regression"]
+    history.close()
+
+
+def test_process_wide_caches_across_threads(tmp_path):
+    histories, sessions = [], []
+
+    def use() -> None:
+        histories.append(get_history(str(tmp_path)))
+        sessions.append(http_session())
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(_) for _ in histories}) == 1
+    # requests.Session is not thread safe
+    assert len({id(_) for _ in sessions}) == 8
+    histories[0].close()
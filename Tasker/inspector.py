@@ -1,5 +1,6 @@
 import inspect
-from typing import Callable
+from functools import wraps
+from typing import Callable, Set
 
 try:
     from typing import ParamSpec, TypeVar
@@ -11,16 +12,36 @@ P = ParamSpec("P")
 R = TypeVar("R")
 
 
+# Classes already checked against their interface
+VERIFIED: Set[Callable] = set()
+
+
 def implements(interface_cls: Callable[P, R]) -> Callable[P, R]:
+    "Check the class against the interface when it is first instantiated"
+
     def _decorator(cls: Callable[P, R]):
-        verify_methods(interface_cls, cls)
-        verify_properties(interface_cls, cls)
-        verify_attributes(interface_cls, cls)
+        init = cls.__init__
+
+        @wraps(init)
+        def __init__(self, *args, **kwargs) -> None:
+            if cls not in VERIFIED:
+                verify(interface_cls, cls)
+            init(self, *args, **kwargs)
+
+        cls.__init__ = __init__
         return cls
 
     return _decorator
 
 
+def verify(interface_cls: Callable[P, R], cls: Callable[P, R]) -> None:
+    "Check that the class implements every method, property and attribute of the interface"
+    verify_methods(interface_cls, cls)
+    verify_properties(interface_cls, cls)
+    verify_attributes(interface_cls, cls)
+    VERIFIED.add(cls)
+
+
 def verify_methods(interface_cls: Callable[P, R], cls: Callable[P, R]):
     def methods_predicate(m):
         return inspect.isfunction(m) or inspect.ismethod(m)
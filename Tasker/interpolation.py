@@ -0,0 +1,198 @@
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+# Keys that are never interpolated
+FORBIDDEN_REF_ALIAS = ["name", "step", "operation"]
+
+# Whole value references kept from the original reference system: `$0` or `$0.value`
+LEGACY_REFERENCE = re.compile(r"^\$(\d+)(?:\.(\w+))?$")
+# Embedded expressions: `${0}`, `${0.value}` or `${&alias}`. Anything else, like the
+# shell `${HOME}`, is kept as is
+EXPRESSION = re.compile(r"\$\{\s*(?:&([^}\s]+)|(\d+)(?:\.(\w+))?)\s*\}")
+
+
+class Literal(NamedTuple):
+    text: str
+
+
+class Reference(NamedTuple):
+    step: int
+    field: Optional[str]  # When None, fallback to the key where it was invoked
+    source: str
+
+
+class AliasReference(NamedTuple):
+    name: str
+    source: str
+    # Legacy `&alias/rest` prefix, where the longest matching alias is used
+    prefix: bool = False
+
+
+Node = Union[Literal, Reference, AliasReference]
+Resolver = Callable[[Union[Reference, AliasReference], str], Any]
+Folder = Callable[[AliasReference], str]
+
+
+class Template:
+    "Compiled representation of a string value containing references and/or aliases"
+
+    def __init__(self, nodes: List[Node]) -> None:
+        self.nodes = nodes
+
+    def render(self, key: str, resolve: Resolver) -> Any:
+        if len(self.nodes) == 1 and not isinstance(self.nodes[0], Literal):
+            # Whole value expressions keep the type of the referenced value
+            return resolve(self.nodes[0], key)
+        return "".join(
+            node.text if isinstance(node, Literal) else str(resolve(node, key))
+            for node in self.nodes
+        )
+
+    def references(self) -> List[Union[Reference, AliasReference]]:
+        return [_ for _ in self.nodes if not isinstance(_, Literal)]
+
+    def fold(self, alias: Folder) -> Union["Template", str]:
+        "Replace aliases with their static value. Returns a string when nothing is left"
+        nodes: List[Node] = []
+        for node in self.nodes:
+            if isinstance(node, AliasReference):
+                node = Literal(alias(node))
+            if (
+                isinstance(node, Literal)
+                and len(nodes) > 0
+                and isinstance(nodes[-1], Literal)
+            ):
+                node = Literal(nodes.pop().text + node.text)
+            nodes.append(node)
+        if all(isinstance(_, Literal) for _ in nodes):
+            return "".join(_.text for _ in nodes)  # type: ignore
+        return Template(nodes)
+
+    def __repr__(self) -> str:
+        return f"Template({self.nodes})"
+
+
+class Structure:
+    "Compiled representation of a list/dict value with templates somewhere inside it"
+
+    def __init__(self, value: Union[list, dict], children: Dict[Any, "Compiled"]) -> None:
+        self.value = value
+        self.children = children
+
+    def render(self, key: str, resolve: Resolver) -> Any:
+        value = list(self.value) if isinstance(self.value, list) else dict(self.value)
+        for index, child in self.children.items():
+            value[index] = child.render(key, resolve)
+        return value
+
+    def references(self) -> List[Union[Reference, AliasReference]]:
+        return [ref for child in self.children.values() for ref in child.references()]
+
+    def fold(self, alias: Folder) -> Union["Structure", list, dict]:
+        "Replace aliases with their static value. Returns the plain value when nothing is left"
+        value = list(self.value) if isinstance(self.value, list) else dict(self.value)
+        children: Dict[Any, Compiled] = {}
+        for index, child in self.children.items():
+            folded = child.fold(alias)
+            if isinstance(folded, (Template, Structure)):
+                children[index] = folded
+            else:
+                value[index] = folded
+        return Structure(value, children) if len(children) > 0 else value
+
+
+Compiled = Union[Template, Structure]
+
+
+def parse(value: str) -> List[Node]:
+    "Parse a string value into its Literal, Reference and AliasReference nodes"
+    legacy = LEGACY_REFERENCE.match(value)
+    if legacy is not None:
+        return [Reference(int(legacy.group(1)), legacy.group(2), value)]
+    if value.startswith("&"):
+        # Legacy alias prefix: `&alias/rest/of/path`, up to the first embedded expression
+        match = EXPRESSION.search(value)
+        end = match.start() if match is not None else len(value)
+        nodes: List[Node] = [AliasReference(value[1:end], value[:end], True)]
+        return nodes + parse(value[end:]) if end < len(value) else nodes
+    nodes = []
+    position = 0
+    for match in EXPRESSION.finditer(value):
+        if match.start() > position:
+            nodes.append(Literal(value[position : match.start()]))
+        if match.group(1) is not None:
+            nodes.append(AliasReference(match.group(1), match.group(0)))
+        else:
+            nodes.append(Reference(int(match.group(2)), match.group(3), match.group(0)))
+        position = match.end()
+    if position < len(value):
+        nodes.append(Literal(value[position:]))
+    return nodes
+
+
+def compile_value(value: Any) -> Optional[Compiled]:
+    "Compile a value once. Returns None when there is nothing to interpolate"
+    if isinstance(value, str):
+        if "$" not in value and not value.startswith("&"):
+            return None
+        nodes = parse(value)
+        if all(isinstance(_, Literal) for _ in nodes):
+            return None
+        return Template(nodes)
+    if isinstance(value, (list, dict)):
+        items = enumerate(value) if isinstance(value, list) else value.items()
+        children = {}
+        for index, item in items:
+            compiled = compile_value(item)
+            if compiled is not None:
+                children[index] = compiled
+        return Structure(value, children) if len(children) > 0 else None
+    return None
+
+
+def compile_task(task: Dict[str, Any]) -> Dict[str, Compiled]:
+    "Compile every interpolable key of a Task"
+    templates: Dict[str, Compiled] = {}
+    for key, value in task.items():
+        if key not in FORBIDDEN_REF_ALIAS:
+            compiled = compile_value(value)
+            if compiled is not None:
+                templates[key] = compiled
+    return templates
+
+
+def encode(compiled: Compiled) -> Dict[str, Any]:
+    "Convert a compiled value into JSON serializable data"
+    if isinstance(compiled, Structure):
+        return {
+            "value": compiled.value,
+            "children": [
+                [index, encode(child)] for index, child in compiled.children.items()
+            ],
+        }
+    nodes: List[list] = []
+    for node in compiled.nodes:
+        if isinstance(node, Literal):
+            nodes.append(["literal", node.text])
+        elif isinstance(node, Reference):
+            nodes.append(["reference", node.step, node.field, node.source])
+        else:
+            nodes.append(["alias", node.name, node.source, node.prefix])
+    return {"nodes": nodes}
+
+
+def decode(data: Dict[str, Any]) -> Compiled:
+    "Rebuild a compiled value from the output of `encode`"
+    if "children" in data:
+        return Structure(
+            data["value"], {index: decode(_) for index, _ in data["children"]}
+        )
+    nodes: List[Node] = []
+    for node in data["nodes"]:
+        if node[0] == "literal":
+            nodes.append(Literal(node[1]))
+        elif node[0] == "reference":
+            nodes.append(Reference(node[1], node[2], node[3]))
+        else:
+            nodes.append(AliasReference(node[1], node[2], node[3]))
+    return Template(nodes)
@@ -0,0 +1,72 @@
+import json
+
+from Tasker.interpolation import (
+    AliasReference,
+    Literal,
+    Reference,
+    Structure,
+    Template,
+    compile_task,
+    compile_value,
+    decode,
+    encode,
+    parse,
+)
+
+
+def resolve(node, key):
+    if isinstance(node, AliasReference):
+        return "/backups"
+    return {"destination": "/out", "value": 7, "affected_files": ["a", "b"]}[
+        node.field or key
+    ]
+
+
+def test_plain_values_are_not_compiled():
+    assert compile_value("/home/user/docs") is None
+    assert compile_value("echo $HOME ${HOME}") is None
+    assert compile_value(True) is None
+
+
+def test_legacy_references():
+    assert parse("$2") == [Reference(2, None, "$2")]
+    assert parse("$2.destination") == [Reference(2, "destination", "$2.destination")]
+    assert compile_value("$0.affected_files").render("matrix", resolve) == ["a", "b"]
+    assert compile_value("$0").render("destination", resolve) == "/out"
+
+
+def test_legacy_alias_prefix():
+    template = compile_value("&backups/daily/${0.value}")
+    assert template.nodes == [
+        AliasReference("backups/daily/", "&backups/daily/", True),
+        Reference(0, "value", "${0.value}"),
+    ]
+    folded = template.fold(lambda node: f"/mnt/{node.name}")
+    assert folded.nodes == [
+        Literal("/mnt/backups/daily/"),
+        Reference(0, "value", "${0.value}"),
+    ]
+    assert compile_value("&backups").fold(lambda node: "/mnt") == "/mnt"
+
+
+def test_embedded_expressions():
+    template = compile_value("${2.destination}/sub/${&backups}-${ 3.value }")
+    assert isinstance(template, Template)
+    assert [_.step for _ in template.references() if isinstance(_, Reference)] == [2, 3]
+    assert template.render("origin", resolve) == "/out/sub//backups-7"
+
+
+def test_nested_structures():
+    compiled = compile_task(
+        {"name": "x", "step": 1, "body": {"id": "$0.value", "static": 1}, "other": 2}
+    )
+    assert list(compiled.keys()) == ["body"]
+    assert isinstance(compiled["body"], Structure)
+    assert compiled["body"].render("body", resolve) == {"id": 7, "static": 1}
+
+
+def test_encode_decode_round_trip():
+    for value in ["${2.destination}/sub/$x", "&backups/x", {"a": ["$0.value", 1]}]:
+        compiled = compile_value(value)
+        decoded = decode(json.loads(json.dumps(encode(compiled))))
+        assert decoded.render("key", resolve) == compiled.render("key", resolve)
@@ -0,0 +1,254 @@
+import traceback
+from logging import Logger, getLogger
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from .common import ref
+from .engine import WorkerContext, initialize_worker, process_context, worker_result
+from .inspector import implements
+from .types import OperationType as Operation
+from .types import ParserType as Parser
+from .types import Settings, Task
+
+try:
+    import resource
+except ImportError:
+    # Memory limits are not available on Windows
+    resource = None  # type: ignore
+
+MEGABYTE = 1024 * 1024
+
+
+def _limit_memory(megabytes: Optional[int]) -> None:
+    """Limit the address space of the current process, interpreter and extension
+    included, not only what the Task allocates. None removes the limit"""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = megabytes * MEGABYTE if megabytes is not None else hard
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _serve(
+    connection: Any, file: str, path: str, settings: Settings, logger: str
+) -> None:
+    "Worker process loop, answering the (message, task, argument) sent by IsolatedWorker"
+    initialize_worker()
+    from .extensions import load_extension
+
+    try:
+        extension = load_extension(file, path).Extension
+    except BaseException:
+        connection.send(("error", traceback.format_exc()))
+        return
+    connection.send(("ready", None))
+    # Operations executed by this worker, by step, kept for their rollback
+    operations: Dict[int, Operation] = {}
+    while True:
+        try:
+            message, task, argument = connection.recv()
+        except EOFError:
+            return
+        if message == "close":
+            return
+        try:
+            if message == "execute":
+                _limit_memory(argument)
+                try:
+                    operation = extension(
+                        WorkerContext(settings), task, getLogger(logger)
+                    )
+                    operations[task["step"]] = operation
+                    operation.execute()
+                finally:
+                    _limit_memory(None)
+                connection.send(("ok", worker_result(operation)))
+            elif message == "rollback":
+                operation = operations.get(task["step"])
+                if operation is None:
+                    # Executed by a worker that no longer exists
+                    operation = extension(
+                        WorkerContext(settings), task, getLogger(logger)
+                    )
+                    for key, value in argument.items():
+                        setattr(operation, key, value)
+                operation.rollback()
+                connection.send(("ok", None))
+        except BaseException:
+            connection.send(("error", traceback.format_exc()))
+
+
+class IsolatedWorker:
+    "Reusable subprocess with an extension already imported, executing its Tasks"
+
+    def __init__(self, file: str, path: str, settings: Settings, logger: str) -> None:
+        self.path = path
+        context = process_context()
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child, file, path, settings, logger), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.__ready = False
+
+    def call(
+        self,
+        message: str,
+        task: Task,
+        argument: Any = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        "Send a message to the worker and wait for its answer, killing it after `timeout`"
+        if not self.__ready:
+            self.__receive(timeout)
+            self.__ready = True
+        self.connection.send((message, task, argument))
+        return self.__receive(timeout)
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def close(self) -> None:
+        if self.alive():
+            try:
+                self.connection.send(("close", None, None))
+            except OSError:
+                pass
+            self.process.join(1)
+        if self.alive():
+            self.process.kill()
+        self.connection.close()
+
+    def __receive(self, timeout: Optional[float]) -> Any:
+        if not self.connection.poll(timeout):
+            self.process.kill()
+            self.process.join()
+            raise TimeoutError(f"Worker of {self.path} timed out after {timeout}s")
+        try:
+            status, value = self.connection.recv()
+        except EOFError:
+            self.process.join(1)
+            raise ChildProcessError(
+                f"Worker of {self.path} exited with code {self.process.exitcode}"
+            )
+        if status == "error":
+            raise Exception(value)
+        return value
+
+
+class WorkerPool:
+    "Idle IsolatedWorkers of every extension, reused between Tasks"
+
+    def __init__(self, settings: Settings, logger: str) -> None:
+        self.settings = settings
+        self.logger = logger
+        self.__idle: Dict[str, List[IsolatedWorker]] = {}
+        self.__workers: List[IsolatedWorker] = []
+        self.__lock = Lock()
+
+    def start(self, file: str, path: str) -> None:
+        "Pre-fork a worker, importing the extension before its first Task"
+        self.release(self.acquire(file, path))
+
+    def acquire(
+        self, file: str, path: str, preferred: Optional[IsolatedWorker] = None
+    ) -> IsolatedWorker:
+        "Take an idle worker, the `preferred` one when no other Task is using it"
+        with self.__lock:
+            idle = self.__idle.get(path, [])
+            if preferred is not None and preferred in idle and preferred.alive():
+                idle.remove(preferred)
+                return preferred
+            while len(idle) > 0:
+                worker = idle.pop()
+                if worker.alive():
+                    return worker
+            worker = IsolatedWorker(file, path, self.settings, self.logger)
+            self.__workers.append(worker)
+            return worker
+
+    def release(self, worker: IsolatedWorker) -> None:
+        if worker.alive():
+            with self.__lock:
+                self.__idle.setdefault(worker.path, []).append(worker)
+
+    def close(self) -> None:
+        for worker in self.__workers:
+            worker.close()
+        self.__idle = {}
+        self.__workers = []
+
+
+@implements(Operation)
+class IsolatedOperation(Operation):
+    "Proxy executing a custom Task in an IsolatedWorker"
+
+    __annotations__ = {
+        "name": "Isolated Action",
+        "intent": "Run a Custom Extension in a separate process",
+    }
+
+    def __init__(
+        self,
+        ctx: Parser,
+        task: Task,
+        logger: Logger,
+        pool: WorkerPool,
+        extension: Tuple[str, str],
+    ) -> None:
+        self.context = ctx  # Parser Context
+        self.task = task  # Current assigned Task
+        self.logger = logger
+        self.affected_files: List[str] = []
+        self.__internal_state = True  # Faulty execution flag
+        self._type = "Custom"
+        self.__pool = pool
+        self.__extension = extension
+        self.__worker: Optional[IsolatedWorker] = None
+        self.__attributes: Dict[str, Any] = {}
+        ref(self)
+
+    def execute(self) -> None:
+        self.__worker = self.__pool.acquire(*self.__extension)
+        try:
+            result = self.__worker.call(
+                "execute",
+                self.task,
+                self.task.get("memory_limit"),
+                self.task.get("timeout"),
+            )
+        except Exception as e:
+            # Errors raised by the extension carry the worker traceback
+            self.logger.debug(str(e))
+            self.logger.error(
+                f"\"{self.task['name']}\" Task failed in its worker: {str(e).strip().splitlines()[-1]}"
+            )
+            raise
+        finally:
+            self.__pool.release(self.__worker)
+        self.__attributes = result["attributes"]
+        self._outputs = tuple(self.__attributes.keys())
+        for key, value in self.__attributes.items():
+            setattr(self, key, value)
+        self.set_state(result["state"])
+
+    def rollback(self) -> None:
+        # The worker that executed the Task keeps its Operation. Others rebuild it
+        worker = self.__pool.acquire(*self.__extension, self.__worker)
+        try:
+            worker.call(
+                "rollback", self.task, self.__attributes, self.task.get("timeout")
+            )
+        finally:
+            self.__pool.release(worker)
+
+    def set_state(self, state: bool) -> None:
+        "Sets the state for the Internal Fault flag"
+        self.__internal_state = state
+
+    def get_state(self) -> bool:
+        "Returns the of the Internal Fault flag"
+        return self.__internal_state
@@ -0,0 +1,83 @@
+import logging
+import os
+
+import pytest
+
+from Tasker.isolation import IsolatedOperation, WorkerPool
+
+EXTENSION = """
+import os
+import time
+
+from Tasker.types import OperationType
+
+
+class Extension(OperationType):
+    _outputs = ("pid",)
+
+    def __init__(self, ctx, task, logger) -> None:
+        self.task = task
+        self.affected_files = []
+
+    def execute(self) -> None:
+        self.pid = os.getpid()
+        time.sleep(self.task.get("sleep", 0))
+
+    def rollback(self) -> None:
+        if self.pid is None:
+            raise Exception("Rollback without state")
+
+    def get_state(self) -> bool:
+        return True
+"""
+
+
+def test_workers_are_reused_and_killed_on_timeout(tmp_path):
+    path = tmp_path / "extension_isolated.py"
+    path.write_text(EXTENSION)
+    pool = WorkerPool({}, "test")
+    try:
+        pool.start("extension_isolated.py", str(path))
+        task = {"name": "isolated", "step": 0}
+        pids = []
+        for _ in range(2):
+            worker = pool.acquire("extension_isolated.py", str(path))
+            pids.append(worker.call("execute", task)["attributes"]["pid"])
+            pool.release(worker)
+        assert pids[0] == pids[1] != os.getpid()
+        worker = pool.acquire("extension_isolated.py", str(path))
+        with pytest.raises(TimeoutError):
+            worker.call("execute", dict(task, step=1, sleep=5), timeout=0.5)
+        assert not worker.alive()
+        # A new worker rebuilds the Operation from the state sent by the parent
+        worker = pool.acquire("extension_isolated.py", str(path))
+        worker.call("rollback", dict(task, step=1), {"pid": pids[0]})
+    finally:
+        pool.close()
+
+
+class Context:
+    def _interpolate(self, task):
+        pass
+
+
+def test_rollbacks_give_back_the_worker_they_took(tmp_path):
+    path = tmp_path / "extension_rollback.py"
+    path.write_text(EXTENSION)
+    pool = WorkerPool({}, "test")
+    extension = ("extension_rollback.py", str(path))
+    logger = logging.getLogger(__name__)
+    try:
+        operations = [
+            IsolatedOperation(Context(), {"name": "isolated", "step": step}, logger, pool, extension)  # type: ignore
+            for step in range(2)
+        ]
+        for operation in operations:
+            operation.execute()
+        for operation in operations:
+            operation.rollback()
+        # Every worker is idle once, so no two Tasks can be given the same one
+        idle = pool._WorkerPool__idle[str(path)]  # type: ignore
+        assert len(idle) == len(set(idle)) == 1
+    finally:
+        pool.close()
@@ -0,0 +1,120 @@
+import heapq
+import os
+import threading
+from logging import Logger, LoggerAdapter
+from time import perf_counter
+from typing import Any, List, MutableMapping, Optional, Tuple
+
+import chalk
+
+from .errors import TaskerError
+from .logs import flush
+from .types import JobResult
+
+
+class _JobLogger(LoggerAdapter):
+    "Prefix every message with the InstructionSet, as jobs log at the same time"
+
+    def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, Any]:
+        job = self.extra["job"]  # type: ignore
+        kwargs["extra"] = {"instruction_set": job, **kwargs.get("extra", {})}
+        return f"[{job}] {msg}", kwargs
+
+
+class JobRunner:
+    """Run many InstructionSets in one process, sharing its configuration, extensions
+    and HTTP connections. Higher priorities run first, equal ones in submission order"""
+
+    def __init__(self, logger: Logger, workers: Optional[int] = None) -> None:
+        self.logger = logger
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.__queue: List[Tuple[int, int, str]] = []
+        self.__submitted = 0
+        self.__lock = threading.Lock()
+
+    def submit(self, instruction_set: str, priority: int = 0) -> None:
+        with self.__lock:
+            heapq.heappush(self.__queue, (-priority, self.__submitted, instruction_set))
+            self.__submitted += 1
+
+    def submit_file(self, path: str) -> None:
+        "Queue every `<InstructionSet> [priority]` line of a file. `#` starts a comment"
+        with open(path, "r") as f:
+            for line in f:
+                values = line.split("#")[0].split()
+                if len(values) > 0:
+                    self.submit(values[0], int(values[1]) if len(values) > 1 else 0)
+
+    def run(self) -> List[JobResult]:
+        "Run the queued InstructionSets, returning their results in submission order"
+        results: List[Tuple[int, JobResult]] = []
+        threads = [
+            threading.Thread(target=self.__work, args=(results,))
+            for _ in range(min(self.workers, len(self.__queue)))
+        ]
+        # Every worker would ask the OS warning at the same time, racing on stdin
+        warning = os.environ.get("-No-Warning")
+        os.environ["-No-Warning"] = "1"
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if warning is None:
+                del os.environ["-No-Warning"]
+        return [result for _, result in sorted(results, key=lambda d: d[0])]
+
+    def __work(self, results: List[Tuple[int, JobResult]]) -> None:
+        while True:
+            with self.__lock:
+                if len(self.__queue) == 0:
+                    return
+                _, order, instruction_set = heapq.heappop(self.__queue)
+            results.append((order, self.__execute(instruction_set)))
+
+    def __execute(self, instruction_set: str) -> JobResult:
+        return execute_job(instruction_set, self.logger)
+
+
+def execute_job(instruction_set: str, logger: Logger) -> JobResult:
+    "Execute an InstructionSet, logging with its name as prefix, and time it"
+    from .parser import Parser
+
+    job = _JobLogger(logger, {"job": instruction_set})
+    result = JobResult(
+        instruction_set=instruction_set,
+        ok=False,
+        initialization=0.0,
+        execution=0.0,
+        error=None,
+    )
+    start = perf_counter()
+    try:
+        parser = Parser(instruction_set, job)  # type: ignore
+        result["initialization"] = perf_counter() - start
+        parser.execute()
+        result["execution"] = perf_counter() - start - result["initialization"]
+        result["ok"] = parser.result()["ok"]
+    except TaskerError as e:
+        # Already logged
+        result["error"] = str(e)
+    except SystemExit:
+        result["error"] = "Aborted"
+    except Exception as e:
+        result["error"] = str(e)
+        job.error(f"Job failed: {e}")
+    return result
+
+
+def summarize(results: List[JobResult], logger: Logger) -> None:
+    "Log the outcome and timings of every job"
+    flush()
+    print()
+    print("--------------  Jobs  --------------")
+    print()
+    for result in results:
+        status = chalk.green("OK") if result["ok"] else chalk.red("ERROR")
+        timings = f"init {result['initialization']:.3f}s, run {result['execution']:.3f}s"
+        error = f" - {result['error']}" if result["error"] is not None else ""
+        logger.info(f"{result['instruction_set']} - {status} ({timings}){error}")
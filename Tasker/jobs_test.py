@@ -0,0 +1,46 @@
+import logging
+import os
+
+from Tasker.jobs import JobRunner
+
+
+def test_priority_and_fifo_order(tmp_path, monkeypatch):
+    executed = []
+
+    def execute(self, instruction_set):
+        executed.append(instruction_set)
+        return {"instruction_set": instruction_set, "ok": True}
+
+    monkeypatch.setattr(JobRunner, "_JobRunner__execute", execute)
+    queue = tmp_path / "queue.txt"
+    queue.write_text("# nightly\nbackup 10\nreport\n")
+    runner = JobRunner(logging.getLogger(__name__), workers=1)
+    runner.submit("lint")
+    runner.submit("deploy", priority=5)
+    runner.submit_file(str(queue))
+    results = runner.run()
+    assert executed == ["backup", "deploy", "lint", "report"]
+    # Results keep the submission order
+    assert [_["instruction_set"] for _ in results] == [
+        "lint",
+        "deploy",
+        "backup",
+        "report",
+    ]
+
+
+def test_workers_skip_the_os_warning(monkeypatch):
+    warned = []
+
+    def execute(self, instruction_set):
+        warned.append("-No-Warning" not in os.environ)
+        return {"instruction_set": instruction_set, "ok": True}
+
+    monkeypatch.setattr(JobRunner, "_JobRunner__execute", execute)
+    monkeypatch.delenv("-No-Warning", raising=False)
+    runner = JobRunner(logging.getLogger(__name__), workers=2)
+    runner.submit("lint")
+    runner.submit("deploy")
+    runner.run()
+    assert warned == [False, False]
+    assert "-No-Warning" not in os.environ
@@ -0,0 +1,138 @@
+import atexit
+import json
+import logging
+import re
+import sys
+from queue import Queue
+from typing import Any, List, Literal, Optional, TextIO
+
+import chalk
+
+LogFormat = Literal["text", "json"]
+
+ANSI = re.compile(r"\x1b\[[0-9;]*m")
+# Structured values added with `extra=`, kept as fields of the JSON lines
+FIELDS = ["instruction_set", "task", "step", "operation", "ok", "file", "index"]
+# Per-file debug events of bulk Operations: the first ones, then one in every SAMPLE
+SAMPLE_FIRST = 10
+SAMPLE = 100
+
+# Writes the queued records. `logging.handlers` is only imported once it is needed
+_listener: Any = None
+# Handlers added to the root logger by `setup`, the ones of the application are kept
+_installed: List[logging.Handler] = []
+
+
+class Colored:
+    "Text colored with a `chalk` color once the record is formatted, if ever"
+
+    def __init__(self, text: Any, color: str) -> None:
+        self.text = text
+        self.color = color
+
+    def __str__(self) -> str:
+        return getattr(chalk, self.color)(str(self.text))
+
+
+class TerminalFormatter(logging.Formatter):
+    "`[LEVEL] → message`, colored only when written to a terminal"
+
+    def __init__(self, color: bool) -> None:
+        super().__init__("%(message)s")
+        self.color = color
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if not self.color:
+            return f"[{record.levelname}] → {ANSI.sub('', message)}"
+        return f"[{chalk.blue(record.levelname)}] → {message}"
+
+
+class JsonFormatter(logging.Formatter):
+    "One JSON object per line, with the structured values of the record"
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": ANSI.sub("", record.getMessage()),
+        }
+        for field in FIELDS:
+            if field in record.__dict__:
+                data[field] = record.__dict__[field]
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.Handler):
+    """Queue records as they are. The queue never leaves the process, so they are
+    formatted, and colored, by the listener thread instead of the one logging"""
+
+    def __init__(self, queue: Queue) -> None:
+        super().__init__()
+        self.queue = queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+
+
+def setup(
+    log_format: LogFormat = "text",
+    file: Optional[str] = None,
+    queued: bool = False,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Send the records of every logger to stderr, as text or JSON lines, and to `file` as
+    JSON lines. When `queued`, they are written by a background thread"""
+    global _listener
+    stream = stream or sys.stderr
+    handlers: List[logging.Handler] = [logging.StreamHandler(stream)]
+    handlers[0].setFormatter(
+        JsonFormatter()
+        if log_format == "json"
+        else TerminalFormatter(getattr(stream, "isatty", lambda: False)())
+    )
+    if file is not None:
+        handlers.append(logging.FileHandler(file, encoding="UTF-8"))
+        handlers[-1].setFormatter(JsonFormatter())
+    stop()
+    root = logging.getLogger()
+    for handler in _installed:
+        root.removeHandler(handler)
+        handler.close()
+    _installed.clear()
+    if queued:
+        from logging.handlers import QueueListener
+
+        queue: Queue = Queue()
+        _listener = QueueListener(queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        handlers = [_QueueHandler(queue)]
+    for handler in handlers:
+        root.addHandler(handler)
+        _installed.append(handler)
+    root.setLevel(logging.DEBUG)
+
+
+def flush() -> None:
+    "Wait for the queued records to be written, before printing to the terminal"
+    if _listener is not None:
+        _listener.queue.join()  # type: ignore
+
+
+def stop() -> None:
+    "Write the queued records and stop the background thread"
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def sampled(index: int) -> bool:
+    "Whether the debug event of the `index` file of a bulk Operation is logged"
+    return index < SAMPLE_FIRST or index % SAMPLE == 0
+
+
+atexit.register(stop)
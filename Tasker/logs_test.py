@@ -0,0 +1,94 @@
+import io
+import json
+import logging
+
+from Tasker.logs import Colored, JsonFormatter, flush, sampled, setup, stop
+
+
+def test_json_lines():
+    record = logging.LogRecord(
+        "Tasker",
+        logging.ERROR,
+        __file__,
+        1,
+        'Task "%s" - %s',
+        ("copy", Colored("ERROR", "red")),
+        None,
+    )
+    record.__dict__.update(task="copy", step=0, ok=False)
+    line = json.loads(JsonFormatter().format(record))
+    assert line["message"] == 'Task "copy" - ERROR'
+    assert (line["level"], line["task"], line["step"], line["ok"]) == (
+        "ERROR",
+        "copy",
+        0,
+        False,
+    )
+
+
+def test_queued_terminal_output():
+    class Counted:
+        calls = 0
+
+        def __str__(self) -> str:
+            Counted.calls += 1
+            return "value"
+
+    stream = io.StringIO()
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    logger = logging.getLogger("Tasker.logs_test")
+    # The handlers of pytest would format the records too
+    for handler in handlers:
+        root.removeHandler(handler)
+    try:
+        setup("text", queued=True, stream=stream)
+        logger.setLevel(logging.INFO)
+        logger.debug("filtered %s", Counted())
+        logger.info("Task %s - %s", Counted(), Colored("OK", "green"))
+        flush()
+        # Not a terminal, so nothing is colored
+        assert stream.getvalue() == "[INFO] → Task value - OK\n"
+        assert Counted.calls == 1
+    finally:
+        stop()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+
+def test_sampling():
+    assert [_ for _ in range(1000) if sampled(_)] == [
+        *range(10),
+        100,
+        200,
+        300,
+        400,
+        500,
+        600,
+        700,
+        800,
+        900,
+    ]
+
+
+def test_setup_keeps_the_handlers_of_the_application():
+    root = logging.getLogger()
+    level = root.level
+    application = logging.StreamHandler(io.StringIO())
+    root.addHandler(application)
+    try:
+        for _ in range(2):
+            setup("json", stream=io.StringIO())
+        assert application in root.handlers
+        # Replaced, not added again
+        assert len(root.handlers) == len(set(root.handlers))
+        logging.getLogger("Tasker.logs_test").warning("kept")
+        assert application.stream.getvalue() == "kept\n"
+    finally:
+        for handler in root.handlers[:]:
+            if handler is application or isinstance(handler.formatter, JsonFormatter):
+                root.removeHandler(handler)
+        root.setLevel(level)
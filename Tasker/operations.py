@@ -1,13 +1,28 @@
 import os
 import shutil
-from logging import WARNING, Logger, getLogger
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging import DEBUG, WARNING, Logger, getLogger
 from zipfile import ZIP_DEFLATED, ZipFile
 
-import chalk
-import requests
-
-from .common import alias, get_file_name, ref
+from . import types as definitions
+from .common import alias, get_file_name, http_session, ref
 from .inspector import implements
+from .logs import Colored, sampled
+from .registry import register
+from .session import kill_tree
+from .types import (
+    OP_COMMAND,
+    OP_COPY,
+    OP_CUSTOM,
+    OP_DELETE,
+    OP_ECHO,
+    OP_INPUT,
+    OP_MOVE,
+    OP_REQUEST,
+    OP_ZIP,
+)
 from .types import OperationType as Operation
 from .types import ParserType as Parser
 from .types import Task
@@ -15,6 +30,24 @@ from .types import Task
 # from Tasker.regutils import backup
 
 
+def log_file(operation: Operation, index: int, action: str, file: str) -> None:
+    "Debug event of a file handled by a bulk Operation, sampled past the first files"
+    if sampled(index) and operation.logger.isEnabledFor(DEBUG):
+        operation.logger.debug(
+            '%s "%s" (file %d)',
+            action,
+            file,
+            index + 1,
+            extra={
+                "task": operation.task["name"],
+                "step": operation.task["step"],
+                "file": file,
+                "index": index,
+            },
+        )
+
+
+@register("copy", OP_COPY, definitions.Copy, destination_check=True)
 @implements(Operation)
 class Copy(Operation):
     "Copy Action"
@@ -24,22 +57,29 @@ class Copy(Operation):
         "intent": "Create a duplicate of a specific file on a different location",
     }
 
+    _outputs = ("affected_files", "affected_bytes")
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         self.context = ctx  # Parser Context
         self.task = task  # Current assigned Task
         self.logger = logger
         self.affected_files: list[str] = []
+        self.affected_bytes = 0  # Measured before the files are moved or deleted
         self.__internal_state = True  # Faulty execution flag
         self._type = "copy"
         ref(self)
         alias(self)
 
     def execute(self) -> None:
-        files = (
-            self.context._get_all_file_paths(self.task["origin"])
-            if self.task["subfolders"] is True
-            else os.listdir(self.task["origin"])
+        files = self.context._changed_files(
+            self.task["origin"], self.task["subfolders"] is True
         )
+        if files is None:
+            files = (
+                self.context._get_all_file_paths(self.task["origin"])
+                if self.task["subfolders"] is True
+                else os.listdir(self.task["origin"])
+            )
         if self.task["target"] == "*":
             self.__execute(files)
         elif "*" in self.task["target"]:
@@ -74,16 +114,19 @@ class Copy(Operation):
 
     def __execute(self, files: "list[str]") -> None:
         "Copy files execution action"
-        for f in files:
+        for i, f in enumerate(files):
             ori_path = (
                 f if self.task["subfolders"] is True else f"{self.task['origin']}/{f}"
             )
             self.affected_files.append(ori_path)
+            self.affected_bytes += os.path.getsize(ori_path)
             shutil.copyfile(
                 f"{ori_path}", f"{self.task['destination']}/{get_file_name(f)}"
             )
+            log_file(self, i, "Copied", ori_path)
 
 
+@register("move", OP_MOVE, definitions.Move, destination_check=True)
 @implements(Operation)
 class Move(Operation):
     "Move Action"
@@ -93,18 +136,23 @@ class Move(Operation):
         "intent": "Move file/files from one location to another",
     }
 
+    _outputs = ("affected_files", "affected_bytes")
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         self.context = ctx  # Parser Context
         self.task = task  # Current assigned Task
         self.logger = logger
         self.affected_files: list[str] = []
+        self.affected_bytes = 0  # Measured before the files are moved or deleted
         self.__internal_state = True  # Faulty execution flag
         self._type = "move"
         ref(self)
         alias(self)
 
     def execute(self) -> None:
-        files = self.context._get_all_file_paths(self.task["origin"])
+        files = self.context._changed_files(self.task["origin"])
+        if files is None:
+            files = self.context._get_all_file_paths(self.task["origin"])
         if self.task["target"] == "*":
             self.__execute(files)
         elif "*" in self.task["target"]:
@@ -139,12 +187,15 @@ class Move(Operation):
 
     def __execute(self, files: "list[str]") -> None:
         "Move files execution action"
-        for f in files:
+        for i, f in enumerate(files):
             ori_path = f
             self.affected_files.append(ori_path)
+            self.affected_bytes += os.path.getsize(ori_path)
             shutil.move(f"{ori_path}", f"{self.task['destination']}/{get_file_name(f)}")
+            log_file(self, i, "Moved", ori_path)
 
 
+@register("delete", OP_DELETE, definitions.Delete, destination_check=True)
 @implements(Operation)
 class Delete(Operation):
     "Delete Action"
@@ -154,11 +205,14 @@ class Delete(Operation):
         "intent": "Delete file/files from the system",
     }
 
+    _outputs = ("affected_files", "affected_bytes")
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         self.context = ctx  # Parser Context
         self.task = task  # Current assigned Task
         self.logger = logger
         self.affected_files: list[str] = []
+        self.affected_bytes = 0  # Measured before the files are moved or deleted
         self.__internal_state = True  # Faulty execution flag
         self._type = "delete"
         ref(self)
@@ -179,8 +233,11 @@ class Delete(Operation):
                 for _ in all_files
                 if get_file_name(_).lower().endswith(self.task["target"].split(".")[1])
             ]
-        for _ in fp:
+        for i, _ in enumerate(fp):
+            self.affected_files.append(_)
+            self.affected_bytes += os.path.getsize(_)
             os.remove(_)
+            log_file(self, i, "Deleted", _)
 
     def rollback(self) -> None:
         self.logger.warn("No rollback support for Delete Action")
@@ -194,6 +251,7 @@ class Delete(Operation):
         return self.__internal_state
 
 
+@register("zip", OP_ZIP, definitions.Zip, destination_check=True)
 @implements(Operation)
 class Zip(Operation):
     "Zip Action"
@@ -203,11 +261,15 @@ class Zip(Operation):
         "intent": "Group files into one zipped folder",
     }
 
+    _outputs = ("affected_files", "affected_bytes")
+    _cpu_bound = True
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         self.context = ctx  # Parser Context
         self.task = task  # Current assigned Task
         self.logger = logger
         self.affected_files: list[str] = []
+        self.affected_bytes = 0  # Measured before the files are moved or deleted
         self.__internal_state = True  # Faulty execution flag
         self._type = "zip"
         ref(self)
@@ -247,6 +309,8 @@ class Zip(Operation):
             f"{self.task['destination']}/{self.task['rename']}.zip", "w", ZIP_DEFLATED
         ) as zip:
             for i, _ in enumerate(fp):
+                self.affected_files.append(_)
+                self.affected_bytes += os.path.getsize(_)
                 if "deflate" in self.task.keys():
                     if self.task["deflate"] is True:
                         zip.write(_, files[i])
@@ -254,6 +318,7 @@ class Zip(Operation):
                         zip.write(_)
                 else:
                     zip.write(_)
+                log_file(self, i, "Zipped", _)
             zip.close()
 
     def rollback(self) -> None:
@@ -275,12 +340,15 @@ class Zip(Operation):
         return self.__internal_state
 
 
+@register("command", OP_COMMAND, definitions.Command)
 @implements(Operation)
 class Command(Operation):
     "Command Action"
 
     __annotations__ = {"name": "Command Action", "intent": "Execute CLI commands"}
 
+    _outputs = ("affected_files", "output", "outputs")
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         self.context = ctx  # Parser Context
         self.task = task  # Current assigned Task
@@ -288,15 +356,21 @@ class Command(Operation):
         self.affected_files: list[str] = []
         self.__internal_state = True  # Faulty execution flag
         self.output = "Nothing is stored"
+        self.outputs: list[dict] = []  # Per job output when running a matrix
         ref(self)
         alias(self)
 
     def execute(self) -> None:
-        if self.task["output"]:
-            self.output = os.popen(self.task["command"]).read()
-        else:
-            os.system(self.task["command"])
-        # raise NotImplementedError("Command action has not been implemented yet")
+        if "session" in self.task.keys():
+            self.__run_session(self.__expand_commands())
+            return
+        if isinstance(self.task["command"], str) and "matrix" not in self.task.keys():
+            if self.task["output"]:
+                self.output = os.popen(self.task["command"]).read()
+            else:
+                os.system(self.task["command"])
+            return
+        self.__run_jobs(self.__expand_commands())
 
     def rollback(self) -> None:
         pass
@@ -309,7 +383,117 @@ class Command(Operation):
         "Returns the of the Internal Fault flag"
         return self.__internal_state
 
-
+    def __expand_commands(self) -> "list[str]":
+        "Expand the `command` template(s) over every value of the `matrix`"
+        commands = self.task["command"]
+        templates = [commands] if isinstance(commands, str) else list(commands)
+        if "matrix" not in self.task.keys():
+            return templates
+        matrix = self.task["matrix"]
+        if isinstance(matrix, str):
+            # Allows feeding the output of a previous Command Task line by line
+            matrix = [_ for _ in matrix.splitlines() if _.strip() != ""]
+        return [t.replace("{item}", str(item)) for item in matrix for t in templates]
+
+    def __run_jobs(self, commands: "list[str]") -> None:
+        """Run every command as a job of a pool limited to `max_parallel` workers. With
+        `fail_fast`, the first failure cancels the pending jobs and kills the running ones"""
+        max_parallel = self.task.get("max_parallel") or os.cpu_count() or 1
+        self.__fail_fast = self.task.get("fail_fast", True)
+        failed = 0
+        self.__processes: "dict[subprocess.Popen, int]" = {}  # Running jobs, by index
+        self.__killed: "set[int]" = set()  # Jobs killed after the first failure
+        self.__stopped = False
+        self.__lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=max(1, int(max_parallel))) as pool:
+            jobs = {pool.submit(self.__run_job, i, c): i for i, c in enumerate(commands)}
+            results: "list[dict]" = [{} for _ in commands]
+            for job in as_completed(jobs):
+                if job.cancelled():
+                    continue
+                result = job.result()
+                if result is None:
+                    # Started after the failure
+                    continue
+                results[jobs[job]] = result
+                if not self.task["output"] and result["output"] != "":
+                    print(result["output"], end="")
+                if jobs[job] in self.__killed:
+                    self.logger.warning(
+                        f"Job \"{result['command']}\" was killed after another one failed"
+                    )
+                elif result["returncode"] != 0:
+                    failed += 1
+                    self.logger.error(
+                        f"Job \"{result['command']}\" exited with code {result['returncode']}"
+                    )
+                    if self.__fail_fast:
+                        for pending in jobs:
+                            pending.cancel()
+        self.outputs = [_ for _ in results if _ != {}]
+        if self.task["output"]:
+            self.output = "".join(_["output"] for _ in self.outputs)
+        if failed > 0:
+            raise Exception(f"{failed} of {len(commands)} jobs failed")
+
+    def __run_session(self, commands: "list[str]") -> None:
+        "Run every command, in order, inside the shared shell session"
+        session = self.context._get_session(self.task["session"])
+        fail_fast = self.task.get("fail_fast", True)
+        failed = 0
+        # The commands of a Task run together, parallel Tasks wait for the session
+        with session.lock:
+            for command in commands:
+                returncode, output = session.run(command, self.task.get("timeout"))
+                self.outputs.append(
+                    {"command": command, "returncode": returncode, "output": output}
+                )
+                if not self.task["output"] and output != "":
+                    print(output, end="")
+                if returncode != 0:
+                    failed += 1
+                    self.logger.error(f'Job "{command}" exited with code {returncode}')
+                    if fail_fast:
+                        break
+        if self.task["output"]:
+            self.output = "".join(_["output"] for _ in self.outputs)
+        if failed > 0:
+            raise Exception(f"{failed} of {len(commands)} jobs failed")
+
+    def __run_job(self, index: int, command: str) -> "dict | None":
+        "Run a single command capturing its output, None once the jobs are stopped"
+        with self.__lock:
+            if self.__stopped:
+                return None
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                # Killed along with the processes the shell started
+                start_new_session=True,
+            )
+            self.__processes[process] = index
+        try:
+            output, _ = process.communicate()
+        finally:
+            with self.__lock:
+                del self.__processes[process]
+                if process.returncode != 0 and self.__fail_fast and not self.__stopped:
+                    # Before this worker can take the next job
+                    self.__stopped = True
+                    for running, running_index in self.__processes.items():
+                        self.__killed.add(running_index)
+                        kill_tree(running)
+        return {
+            "command": command,
+            "returncode": process.returncode,
+            "output": output,
+        }
+
+
+@register("input", OP_INPUT, definitions.Input)
 @implements(Operation)
 class Input(Operation):
     "Input Action"
@@ -319,6 +503,8 @@ class Input(Operation):
         "intent": "Ask User for Input in the console",
     }
 
+    _outputs = ("affected_files", "value")
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         self.context = ctx  # Parser Context
         self.task = task  # Current assigned Task
@@ -346,12 +532,15 @@ class Input(Operation):
         return self.__internal_state
 
 
+@register("echo", OP_ECHO, definitions.Echo)
 @implements(Operation)
 class Echo(Operation):
     "Echo Action"
 
     __annotations__ = {"name": "Echo Action", "intent": "Print a value to the console"}
 
+    _outputs = ("affected_files",)
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         self.context = ctx  # Parser Context
         self.task = task  # Current assigned Task
@@ -365,7 +554,7 @@ class Echo(Operation):
     def execute(self) -> None:
         value = self.task["value"]
         self.logger.debug(
-            f"Output of \"{self.task['name']}\" Task ➡ {chalk.yellow(value)}"
+            'Output of "%s" Task ➡ %s', self.task["name"], Colored(value, "yellow")
         )
 
     def rollback(self) -> None:
@@ -380,6 +569,7 @@ class Echo(Operation):
         return self.__internal_state
 
 
+@register("request", OP_REQUEST, definitions.Request)
 @implements(Operation)
 class Request(Operation):
     "Request Action"
@@ -389,6 +579,8 @@ class Request(Operation):
         "intent": "Make API Calls and store JSON value",
     }
 
+    _outputs = ("affected_files", "response")
+
     def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
         getLogger("requests").setLevel(WARNING)
         getLogger("urllib3").setLevel(WARNING)
@@ -401,30 +593,34 @@ class Request(Operation):
         ref(self)
         alias(self)
         self.response = None
+        self._http_calls = 0
 
     def execute(self) -> None:
+        session = http_session()
         verb = self.task["method"]
         res = None
+        if verb in ["get", "post", "delete", "put"]:
+            self._http_calls += 1
         if verb == "get":
-            res = requests.get(
+            res = session.get(
                 self.task["endpoint"],
                 json=self.task["body"] if "body" in self.task.keys() else None,
                 headers=self.task["headers"] if "headers" in self.task.keys() else None,
             ).json()
         elif verb == "post":
-            res = requests.post(
+            res = session.post(
                 self.task["endpoint"],
                 json=self.task["body"] if "body" in self.task.keys() else None,
                 headers=self.task["headers"] if "headers" in self.task.keys() else None,
             ).json()
         elif verb == "delete":
-            res = requests.delete(
+            res = session.delete(
                 self.task["endpoint"],
                 json=self.task["body"] if "body" in self.task.keys() else None,
                 headers=self.task["headers"] if "headers" in self.task.keys() else None,
             ).json()
         elif verb == "put":
-            res = requests.put(
+            res = session.put(
                 self.task["endpoint"],
                 json=self.task["body"] if "body" in self.task.keys() else None,
                 headers=self.task["headers"] if "headers" in self.task.keys() else None,
@@ -443,3 +639,7 @@ class Request(Operation):
     def get_state(self) -> bool:
         "Returns the of the Internal Fault flag"
         return self.__internal_state
+
+
+# Custom tasks run the Extension class of the extension they name
+register("custom", OP_CUSTOM, definitions.Custom)(None)
@@ -0,0 +1,100 @@
+import logging
+from time import perf_counter
+
+import pytest
+
+from Tasker.inspector import verify
+from Tasker.operations import Command, Copy, Delete, Echo, Input, Move, Request, Zip
+from Tasker.session import ShellSession
+from Tasker.types import OperationType
+
+logger = logging.getLogger(__name__)
+
+
+class Context:
+    "Parser stand-in for Tasks without references"
+
+    def _interpolate(self, task):
+        pass
+
+
+# ----------------------------------- Command --------------------------------------------
+
+
+def test_command_matrix_captures_every_job():
+    task = {
+        "name": "Matrix",
+        "step": 0,
+        "operation": "command",
+        "output": True,
+        "command": "echo {item}",
+        "matrix": ["a", "b", "c"],
+        "max_parallel": 2,
+    }
+    c = Command(Context(), task, logger)
+    c.execute()
+    assert [_["output"].strip() for _ in c.outputs] == ["a", "b", "c"]
+    assert all(_["returncode"] == 0 for _ in c.outputs)
+
+
+def test_command_list_keep_going():
+    task = {
+        "name": "Keep going",
+        "step": 0,
+        "operation": "command",
+        "output": True,
+        "command": ["exit 3", "echo done"],
+        "fail_fast": False,
+    }
+    c = Command(Context(), task, logger)
+    with pytest.raises(Exception):
+        c.execute()
+    assert [_["returncode"] for _ in c.outputs] == [3, 0]
+
+
+def test_command_fail_fast_kills_running_jobs():
+    task = {
+        "name": "Fail fast",
+        "step": 0,
+        "operation": "command",
+        "output": True,
+        "command": ["sleep 30", "exit 3", "echo never"],
+        "max_parallel": 2,
+    }
+    c = Command(Context(), task, logger)
+    start = perf_counter()
+    with pytest.raises(Exception, match="1 of 3 jobs failed"):
+        c.execute()
+    assert perf_counter() - start < 10
+    assert sorted(_["command"] for _ in c.outputs) == ["exit 3", "sleep 30"]
+
+
+def test_session_keeps_state_between_commands():
+    session = ShellSession("test")
+    try:
+        assert session.run("cd / && export TASKER_TEST=1") == (0, "")
+        assert session.run("pwd; printf $TASKER_TEST") == (0, "/\n1")
+        assert session.run("false")[0] == 1
+    finally:
+        session.close()
+
+
+def test_session_survives_broken_and_hanging_commands():
+    session = ShellSession("test")
+    try:
+        # The unbalanced quote used to swallow the sentinel and block forever
+        assert session.run('echo "foo', timeout=10)[0] != 0
+        assert session.run("cd / && echo 'it''s'") == (0, "its\n")
+        with pytest.raises(TimeoutError):
+            session.run("sleep 30", timeout=0.5)
+        # Restarted, without the state of the killed shell
+        assert session.run("pwd")[1] != "/\n"
+        assert session.run("echo done", timeout=10) == (0, "done\n")
+    finally:
+        session.close()
+
+
+def test_builtin_operations_implement_the_interface():
+    # Verification is deferred to the first instantiation, so check every class here
+    for operation in [Copy, Move, Delete, Zip, Command, Input, Echo, Request]:
+        verify(OperationType, operation)
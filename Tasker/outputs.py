@@ -0,0 +1,41 @@
+from typing import Any, Dict, Optional
+
+from .types import OperationType, Task
+
+# Attributes never published by Operations that don't declare their outputs
+PRIVATE_ATTRIBUTES = ["context", "task", "logger"]
+
+
+class OutputRegistry:
+    "Values published by every executed step, indexed by step number"
+
+    def __init__(self) -> None:
+        self.__steps: Dict[int, Dict[str, Any]] = {}
+
+    def publish(self, task: Task, operation: OperationType) -> None:
+        "Store the Task values together with the declared outputs of its Operation"
+        self.__steps[task["step"]] = dict(task, **collect_outputs(operation))
+
+    def get(self, step: int) -> Optional[Dict[str, Any]]:
+        return self.__steps.get(step)
+
+    def clear(self) -> None:
+        self.__steps = {}
+
+    def __contains__(self, step: int) -> bool:
+        return step in self.__steps
+
+    def __len__(self) -> int:
+        return len(self.__steps)
+
+
+def collect_outputs(operation: OperationType) -> Dict[str, Any]:
+    "Get the outputs declared in `_outputs`, or every public attribute when undeclared"
+    declared = getattr(operation, "_outputs", None)
+    if declared is None:
+        return {
+            key: value
+            for key, value in vars(operation).items()
+            if not key.startswith("_") and key not in PRIVATE_ATTRIBUTES
+        }
+    return {key: getattr(operation, key) for key in declared}
@@ -1,96 +1,284 @@
+import copy
 import json
 import os
 import os.path as Path
 import platform
+import sqlite3
 import sys
+import threading
 from hashlib import md5
-from importlib.machinery import SourceFileLoader as importer
 from logging import WARNING, Logger, getLogger
-from time import time
-from typing import List, Literal, Union
-from webbrowser import open as FileOpener
+from textwrap import dedent
+from time import perf_counter, time
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple, Union
 
 import chalk
-from requests import get
 
-from .common import Timer, pip, pip_freeze
+from .aliases import AliasIndex
+from .catalog import get_catalog
+from .common import Timer, get_all_file_paths, pip, pip_freeze
+from .engine import WorkerJob, group_index, parallel_groups, run_concurrently
+from .errors import InstructionSetError, TaskerError
+from .extensions import load_extension
+from .history import History, get_history
 from .inspector import implements
-from .operations import *
+from .interpolation import (
+    Compiled,
+    Reference,
+    Structure,
+    Template,
+    compile_task,
+    decode,
+    encode,
+)
+from .isolation import IsolatedOperation, WorkerPool
+from .logs import Colored
+from .logs import flush as flush_logs
+from .outputs import OutputRegistry, collect_outputs
+from .plan import load_plan, plan_key, save_plan
+from .profiling import NullProfiler, Profiler
+from .registry import get_operation
+from .session import ShellSession
+from .settings import get_settings_store
+from .tracing import NullTracer, Span, Tracer, task_attributes
 from .types import (
-    DESTINATION_CHECK_MAP,
-    OP_COMMAND,
-    OP_COPY,
-    OP_CUSTOM,
-    OP_DELETE,
-    OP_ECHO,
-    OP_INPUT,
-    OP_INSTRUCTION,
-    OP_MOVE,
-    OP_REQUEST,
-    OP_TASK,
-    OP_ZIP,
-    OPERATIONS,
     Alias,
     CustomOperation,
+    ExecutionResult,
     InstructionSet,
     OperationType,
     ParserType,
+    Plan,
     Settings,
     Task,
+    TaskResult,
 )
+from .validator import reference_errors, validate, validate_references
+
+OK = Colored("OK", "green")
+ERROR = Colored("ERROR", "red")
 
 
 @implements(ParserType)
 class Parser(ParserType):
-    def __init__(self, task: str, logger: Logger) -> None:
+    def __init__(
+        self,
+        task: Union[str, InstructionSet],
+        logger: Logger,
+        settings: Optional[Settings] = None,
+        tracer: Optional[Tracer] = None,
+        profiler: Optional[Profiler] = None,
+    ) -> None:
         self.execution = {}
         t = Timer()
         t.start()
         self.supported_os = ["Windows"]  # List of Tasker supported OSes
         self.logger = logger
-        if task not in self.list_all_tasks():
+        self.tracer = tracer if tracer is not None else NullTracer()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        # Executions are added to it. Named InstructionSets use the one of `~/.tasker`
+        self.history: Optional[History] = None
+        self.__file = None if isinstance(task, dict) else task
+        with self.tracer.span("load"):
+            if isinstance(task, dict):
+                # Embedded: nobody is asked anything and the given settings are used
+                self.system = platform.system()
+                self.default_location = f"{Path.expanduser('~')}/.tasker/Tasks"
+                self.settings = self.__default_settings(settings)
+                # Compiling normalizes the Tasks in place, the caller keeps its dict
+                self.__compile(copy.deepcopy(task))
+            else:
+                self.__load(task)
+            self.__setup()
+        t.stop()
+        self.execution["initialization"] = t.ellapsed_time
+        self.__durations = {"initialization": t.end_time - t.start_time, "execution": 0.0}
+
+    @classmethod
+    def from_dict(
+        cls,
+        instruction_set: InstructionSet,
+        settings: Optional[Settings] = None,
+        logger: Optional[Logger] = None,
+        tracer: Optional[Tracer] = None,
+        profiler: Optional[Profiler] = None,
+    ) -> "Parser":
+        """Create a Parser for an InstructionSet kept in memory. Without `settings` the
+        ones of `~/.tasker` are used. Problems raise a TaskerError instead of exiting"""
+        return cls(
+            instruction_set, logger or getLogger("Tasker"), settings, tracer, profiler
+        )
+
+    def __load(self, task: str) -> None:
+        "Read an InstructionSet of `~/.tasker/Tasks`, compiling it unless its Plan is up to date"
+        self.do_config()
+        if not get_catalog().exists(task):
             self.abort(f"'{task}' InstructionSet was not found")
         self.warn_user()
         self.__first_execution_routine()
-        self.task: InstructionSet = json.load(
-            open(f"{self.default_location}/{task}.tasker.json", "r")
+        source = f"{self.default_location}/{task}.tasker.json"
+        key = plan_key(source, f"{Path.expanduser('~')}/.tasker/config.json")
+        with self.tracer.span("read plan"):
+            plan = load_plan(task, key)
+        if plan is not None:
+            self.task = plan["task"]
+            self.settings = plan["settings"]
+            self.__templates: Dict[int, Dict[str, Compiled]] = {
+                int(step): {k: decode(v) for k, v in templates.items()}
+                for step, templates in plan["templates"].items()
+            }
+            return
+        self.settings = self.__get_configs()
+        self.__compile(json.load(open(source, "r")))
+        save_plan(
+            task,
+            Plan(
+                key=key,
+                settings=self.settings,
+                task=self.task,
+                templates={
+                    str(step): {k: encode(v) for k, v in templates.items()}
+                    for step, templates in self.__templates.items()
+                },
+            ),
         )
-        analysis = self.__analyse_keys()
-        if not analysis[0]:
-            self.abort(f'{analysis[3]} "{analysis[1]}" in {analysis[2]}')
+
+    def __compile(self, instruction_set: InstructionSet) -> None:
+        "Validate the InstructionSet and compile its references"
+        with self.tracer.span("validate"):
+            errors = validate(instruction_set)
+        if len(errors) > 0:
+            for error in errors:
+                self.logger.error(error)
+            raise InstructionSetError(errors)
+        self.task: InstructionSet = instruction_set
         self.__optional_parameters()
-        self.settings = self.__get_configs()
-        # load extensions
-        self.extensions: List[CustomOperation] = self.__load_extensions()
         self.__change_relative_locations(self.settings["current_location"])
-        self.__executed_tasks: List[Task] = []
+        with self.tracer.span("compile references"):
+            self.__compile_references()
+        self.task["tasks"] = sorted(self.task["tasks"], key=lambda d: d["step"])
+
+    def __setup(self) -> None:
+        "Prepare the extensions, workers and state used to execute the InstructionSet"
+        # Executions mutate the Tasks, every new one starts from this copy
+        self.__compiled = json.dumps(self.task)
+        # Only the extensions used by this InstructionSet are imported
+        self.extensions: Dict[str, CustomOperation] = self.__load_extensions()
+        self.workers = WorkerPool(self.settings, self.logger.name)
+        self.__isolated = self.__start_workers()
+        # Files that triggered this run, set by `tasker watch`
+        self.changed_files: Optional[List[str]] = None
+        self.sessions: Dict[str, ShellSession] = {}
+        self.__sessions_lock = threading.Lock()
+        self.__executed = False
+        self.__reset()
+
+    def __reset(self) -> None:
+        self.task = json.loads(self.__compiled)
+        self.__interpolated: Set[int] = set()
+        self.outputs = OutputRegistry()
+        self.results: Dict[int, TaskResult] = {}
         self.__operation_stack: List[OperationType] = []
-        t.stop()
-        self.execution["initialization"] = t.ellapsed_time
 
-    def execute(self) -> None:
+    def run(self, instruction_set: Optional[InstructionSet] = None) -> ExecutionResult:
+        """Execute the InstructionSet, or another one given in memory, and return the outcome.
+        The same Parser can run any number of times, keeping its settings and extensions"""
+        if instruction_set is not None:
+            t = Timer()
+            t.start()
+            with self.tracer.span("load"):
+                self.__compile(copy.deepcopy(instruction_set))
+                self.__setup()
+            t.stop()
+            self.execution["initialization"] = t.ellapsed_time
+            self.__durations["initialization"] = t.end_time - t.start_time
+        self.execute()
+        return self.result()
+
+    def result(self) -> ExecutionResult:
+        "Status, outputs and duration of every Task of the last execution"
+        tasks = [self.results[_] for _ in sorted(self.results.keys())]
+        return ExecutionResult(
+            instruction_set=self.task["name"],
+            ok=all(_["ok"] for _ in tasks),
+            tasks=tasks,
+            initialization=self.__durations["initialization"],
+            execution=self.__durations["execution"],
+        )
+
+    def execute(self, steps: Optional[Set[int]] = None) -> None:
+        "Execute every Task, or only `steps`, reusing the outputs already published"
+        if self.__executed:
+            self.__reset()
+        self.__executed = True
+        started = time()
         t = Timer()
         t.start()
+        with self.tracer.span("execute", instruction_set=self.task["name"]):
+            self.__execute_tasks(steps)
+            self.__rollback()
+        t.stop()
+        self.execution["execution"] = t.ellapsed_time
+        self.__durations["execution"] = t.end_time - t.start_time
+        self.__save_history(started)
+
+    def __save_history(self, started: float) -> None:
+        "Add the execution to the run history. Failing to do so never fails the execution"
+        if not self.__keeps_history():
+            return
+        try:
+            if self.history is None and self.__file is not None:
+                self.history = get_history()
+            if self.history is not None:
+                self.history.record(self.result(), started, self.__file)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"Execution not added to the run history: {e}")
+
+    def __keeps_history(self) -> bool:
+        "Whether the execution is added to the run history"
+        return "-No-History" not in os.environ and (
+            self.history is not None or self.__file is not None
+        )
+
+    def __execute_tasks(self, steps: Optional[Set[int]]) -> None:
         self.task["tasks"] = sorted(self.task["tasks"], key=lambda d: d["step"])
-        for task in self.task["tasks"]:
-            if self.__execute(task):
-                self.logger.debug(f"Task \"{task['name']}\" - {chalk.green('OK')}")
+        for group in parallel_groups(self.task["tasks"]):
+            if steps is not None:
+                group = [_ for _ in group if _["step"] in steps]
+                if len(group) == 0:
+                    continue
+            # Concurrent Tasks can't be told apart by profilers, they run one at a time
+            if len(group) > 1 and not self.profiler.enabled:
+                results = self.__execute_group(group)
             else:
-                self.logger.error(f"Task \"{task['name']}\" - {chalk.red('ERROR')}")
+                results = [self.__execute(_) for _ in group]
+            for task, result in zip(group, results):
+                fields = {"task": task["name"], "step": task["step"], "ok": result}
+                if result:
+                    self.logger.debug('Task "%s" - %s', task["name"], OK, extra=fields)
+                else:
+                    self.logger.error('Task "%s" - %s', task["name"], ERROR, extra=fields)
+        self.__close_sessions()
+
+    def __rollback(self) -> None:
         # Reverse Operation Stack
         # Do this to use rollback feature on a reverse order
         self.__operation_stack.reverse()
         tick = True
-        for operation in self.__operation_stack:
-            if not operation.get_state() and "-No-Rollback" not in os.environ:
-                if tick:
-                    print()
-                    print("--------------  Rollbacks  --------------")
-                    print()
-                    tick = False
-                operation.rollback()
-        t.stop()
-        self.execution["execution"] = t.ellapsed_time
+        try:
+            for operation in self.__operation_stack:
+                if not operation.get_state() and "-No-Rollback" not in os.environ:
+                    if tick:
+                        flush_logs()
+                        print()
+                        print("--------------  Rollbacks  --------------")
+                        print()
+                        tick = False
+                    with self.tracer.span("rollback", task=operation.task["name"]):
+                        operation.rollback()
+        finally:
+            # Isolated Operations are rolled back by their workers
+            self.workers.close()
 
     def warn_user(self) -> None:
         "Verifies if current OS is one of the allowed ones"
@@ -104,138 +292,160 @@ class Parser(ParserType):
             elif ans.lower() == "n":
                 sys.exit(0)
             else:
-                self.logger.error("Answer not allowed. Aborting...")
-                sys.exit(1)
+                self.abort("Answer not allowed. Aborting...")
 
     def abort(self, reason: str) -> None:
         self.logger.error(reason)
-        sys.exit(1)
+        raise TaskerError(reason)
 
     def __execute(self, task: Task) -> bool:
-        try:
-            self.__check_destination_path(task, DESTINATION_CHECK_MAP[task["operation"]])
-            if task["operation"] == "copy":
-                c = Copy(self, task, self.logger)
-                self.__operation_stack.append(c)
-                c.execute()
-            elif task["operation"] == "move":
-                m = Move(self, task, self.logger)
-                self.__operation_stack.append(m)
-                m.execute()
-            elif task["operation"] == "delete":
-                d = Delete(self, task, self.logger)
-                self.__operation_stack.append(d)
-                d.execute()
-            elif task["operation"] == "zip":
-                z = Zip(self, task, self.logger)
-                self.__operation_stack.append(z)
-                z.execute()
-            elif task["operation"] == "command":
-                command = Command(self, task, self.logger)
-                self.__operation_stack.append(command)
-                command.execute()
-            elif task["operation"] == "input":
-                i = Input(self, task, self.logger)
-                self.__operation_stack.append(i)
-                i.execute()
-            elif task["operation"] == "echo":
-                e = Echo(self, task, self.logger)
-                self.__operation_stack.append(e)
-                e.execute()
-            elif task["operation"] == "request":
-                r = Request(self, task, self.logger)
-                self.__operation_stack.append(r)
-                r.execute()
-            elif task["operation"] == "custom":
-                ex = next(
-                    (e for e in self.extensions if e["summon"] == task["extension_name"]),
-                    None,
+        start = perf_counter()
+        operation: Optional[OperationType] = None
+        error: Optional[Exception] = None
+        with self.tracer.span(task["name"]) as span:
+            try:
+                operation = self.__prepare(task)
+                with self.tracer.span("execute"), self.profiler.profile(task):
+                    operation.execute()
+                self.outputs.publish(task, operation)
+            except Exception as e:
+                if operation is not None:
+                    operation.set_state(False)
+                error = e
+            self.__trace(span, self.__record(task, operation, start, error), error)
+        return error is None
+
+    def __execute_group(self, tasks: List[Task]) -> List[bool]:
+        "Execute the Tasks of a parallel group concurrently. They share its duration"
+        start = perf_counter()
+        results: Dict[int, bool] = {}
+        prepared: List[Tuple[Task, OperationType]] = []
+        with self.tracer.span("parallel group") as group:
+            for task in tasks:
+                try:
+                    prepared.append((task, self.__prepare(task)))
+                except Exception as e:
+                    self.__record(task, None, start, e)
+                    results[task["step"]] = False
+            timings: List[Tuple[float, float]] = [(start, start)] * len(prepared)
+            errors = run_concurrently(
+                [operation for _, operation in prepared],
+                [self.__worker_job(task, operation) for task, operation in prepared],
+                timings,
+            )
+        for (task, operation), error, timing in zip(prepared, errors, timings):
+            if error is None:
+                self.outputs.publish(task, operation)
+            else:
+                operation.set_state(False)
+            attributes = self.__record(task, operation, start, error)
+            self.__trace(self.tracer.add(task["name"], *timing, group), attributes, error)
+            results[task["step"]] = error is None
+        return [results[_["step"]] for _ in tasks]
+
+    def __trace(
+        self, span: Span, attributes: Dict[str, Any], error: Optional[BaseException]
+    ) -> None:
+        "Add the files, bytes and HTTP calls of the Task to its Span"
+        if not self.tracer.enabled:
+            return
+        span.attributes.update(attributes)
+        if error is not None:
+            span.error = str(error) or type(error).__name__
+
+    def __record(
+        self,
+        task: Task,
+        operation: Optional[OperationType],
+        start: float,
+        error: Optional[BaseException] = None,
+    ) -> Dict[str, Any]:
+        "Keep the outcome of the Task, returning its files, bytes and HTTP calls"
+        duration = perf_counter() - start
+        # Reading every affected file is only worth it when someone keeps the sizes
+        attributes = task_attributes(
+            task, operation, self.tracer.enabled or self.__keeps_history()
+        )
+        self.results[task["step"]] = TaskResult(
+            name=task["name"],
+            step=task["step"],
+            operation=task["operation"],
+            ok=error is None,
+            duration=duration,
+            files=attributes["files"],
+            bytes=attributes["bytes"],
+            outputs=collect_outputs(operation)
+            if error is None and operation is not None
+            else {},
+            error=None if error is None else str(error) or type(error).__name__,
+        )
+        return attributes
+
+    def __worker_job(self, task: Task, operation: OperationType) -> Optional[WorkerJob]:
+        "Describe CPU bound Operations so they can be executed in a worker process"
+        if not operation._cpu_bound:
+            return None
+        extension = None
+        if task["operation"] == "custom":
+            path = self.extensions[task["extension_name"]]["executable"].__file__
+            extension = (Path.basename(path), path)
+        return WorkerJob(
+            task["operation"], extension, operation.task, self.settings, self.logger.name
+        )
+
+    def __prepare(self, task: Task) -> OperationType:
+        "Resolve the Task and create its Operation, ready to be executed"
+        spec = get_operation(task["operation"])
+        if spec is None:
+            raise Exception(f"{task['operation']} is an Unknown Operation")
+        self._interpolate(task)
+        with self.tracer.span("check destination"):
+            self.__check_destination_path(task, spec.destination_check)
+        if task["operation"] == "custom" and task.get("isolated", False):
+            if task["extension_name"] not in self.__isolated:
+                self.abort(
+                    f"No executable found with name {chalk.red(task['extension_name'])}"
                 )
-                if ex is None:
+            function: OperationType = IsolatedOperation(
+                self,
+                task,
+                self.logger,
+                self.workers,
+                self.__isolated[task["extension_name"]],
+            )
+        else:
+            if task["operation"] == "custom":
+                extension = self.extensions.get(task["extension_name"])
+                if extension is None:
                     self.abort(
                         f"No executable found with name {chalk.red(task['extension_name'])}"
                     )
-                function: OperationType = ex["executable"].Extension(
-                    self, task, self.logger
-                )
-                self.__operation_stack.append(function)
-                function.execute()
+                operation = extension["executable"].Extension
             else:
-                raise Exception(f"{task['operation']} is an Unknown Operation")
-            self.__executed_tasks.append(task)
-            return True
-        except Exception:
-            self.__operation_stack[-1].set_state(False)
-            return False
+                operation = spec.operation
+            function = operation(self, task, self.logger)
+        self.__operation_stack.append(function)
+        return function
 
     def __check_destination_path(self, task: Task, needs_path_check: bool = True) -> None:
         "Check destination path if requested end folder is present. If not, create it."
         if needs_path_check:
-            if "destination" in task.keys():
-                if "$" in task["destination"]:
-                    splitted_path = task["destination"].split("/")[-1]
-                    if "." in splitted_path:
-                        _ = splitted_path.split(".")
-                        ref = self._get_step_reference(task, _[0])
-                        task["destination"] = ref[_[1]]
-                    else:
-                        ref = self._get_step_reference(task, task["destination"])
-                        task["destination"] = ref["destination"]
-            if "origin" in task.keys():
-                if "$" in task["origin"]:
-                    splitted_path = task["origin"].split("/")[-1]
-                    if "." in splitted_path:
-                        _ = splitted_path.split(".")
-                        ref = self._get_step_reference(task, _[0])
-                        task["origin"] = ref[_[1]]
-                    else:
-                        ref = self._get_step_reference(task, task["destination"])
-                        task["destination"] = ref["destination"]
             if "destination" not in task.keys():
-                if task["target"].startswith("$"):
-                    if "." in task["target"]:
-                        _ = task["target"].split(".")
-                        ref = self._get_step_reference(task, _[0])
-                        task["destination"] = ref[_[1]]
-                    else:
-                        ref = self._get_step_reference(task, task["target"])
-                        task["destination"] = ref["destination"]
+                target = self.__templates.get(task["step"], {}).get("target")
+                if isinstance(target, Template) and isinstance(
+                    target.nodes[0], Reference
+                ):
+                    # Without a destination, a referenced target points to the location
+                    reference = target.nodes[0]
+                    task["destination"] = self.__resolve(
+                        task, reference, reference.field or "destination"
+                    )
                 else:
                     self.logger.debug("Destination parameter is not present")
                     raise Exception()
-            destination = task["destination"].split("/")[-1]
-            destination_parent = "/".join(_ for _ in task["destination"].split("/")[:-1])
-            if destination not in os.listdir(f"{destination_parent}"):
+            if not Path.isdir(task["destination"]):
                 os.mkdir(f"{task['destination']}")
 
-    def __analyse_keys(
-        self,
-    ) -> tuple[bool, Union[str, None], Union[str, None], Union[str, None]]:
-        "Verify if the structure of the Instruction Set is defined correctly"
-        for key in OP_INSTRUCTION:
-            if key not in self.task.keys():
-                return (False, key, "Definition", "Missing key")
-        if len(self.task["tasks"]) > 0:
-            for _task in self.task["tasks"]:
-                for key in OP_TASK:
-                    if key not in _task.keys():
-                        return (False, key, "Task", "Missing key")
-                op = _task["operation"]
-                if op not in OPERATIONS:
-                    return (False, op, f"\"{_task['name']}\" Task", "Unknown Operation")
-                operation_keys: list[str] = eval(f"OP_{op.upper()}")
-                for key in operation_keys:
-                    if key not in _task.keys():
-                        # Check for optional parameters
-                        if not key.startswith("!"):
-                            return (
-                                False,
-                                key,
-                                f"\"{_task['name']}\" Task",
-                                "Missing key",
-                            )
-        return (True, None, None, None)
-
     def __optional_parameters(self) -> None:
         to_change = []
         for i in range(len(self.task["tasks"])):
@@ -250,43 +460,122 @@ class Parser(ParserType):
             del self.task["tasks"][obj[0]][obj[1]]
 
     def _get_all_file_paths(self, directory: str) -> List[str]:
-        file_paths = []
-        for root, _, files in os.walk(directory):
-            for filename in files:
-                file_paths.append(Path.join(root, filename).replace("\\", "/"))
-        return file_paths
+        return get_all_file_paths(directory)
+
+    def _changed_files(
+        self, directory: str, recursive: bool = True
+    ) -> Optional[List[str]]:
+        """Existing `changed_files` inside `directory`, or None when not set. Listed like the
+        scan they replace: full paths, or file names of its direct children"""
+        if self.changed_files is None:
+            return None
+        root = Path.abspath(directory)
+        files: List[str] = []
+        for file in self.changed_files:
+            parent = Path.dirname(file)
+            if not Path.isfile(file):
+                continue
+            if parent == root:
+                files.append(file if recursive else Path.basename(file))
+            elif recursive and parent.startswith(f"{root}{os.sep}"):
+                files.append(file)
+        return files
+
+    def dependents(self, steps: Set[int]) -> Set[int]:
+        "Steps referencing, directly or through others, one of `steps`"
+        found: Set[int] = set()
+        for task in self.task["tasks"]:
+            for template in self.__templates.get(task["step"], {}).values():
+                if any(
+                    isinstance(_, Reference) and (_.step in steps or _.step in found)
+                    for _ in template.references()
+                ):
+                    found.add(task["step"])
+        return found
 
     def __change_relative_locations(self, home: str) -> None:
         for task in self.task["tasks"]:
             if (home != None or home != "") and task["operation"] != "custom":
-                if "destination" in task.keys():
+                if "destination" in task.keys() and not self.__is_expression(
+                    task["destination"]
+                ):
                     task["destination"] = f"{home}/{task['destination']}".replace(
                         "\\", "/"
                     )
-                if "origin" in task.keys() and ":" not in task["origin"]:
+                if (
+                    "origin" in task.keys()
+                    and ":" not in task["origin"]
+                    and not self.__is_expression(task["origin"])
+                ):
                     task["origin"] = f"{home}/{task['origin']}".replace("\\", "/")
 
+    def __is_expression(self, value: str) -> bool:
+        "Values starting with a reference or an alias are resolved later on"
+        return value.startswith("$") or value.startswith("&")
+
+    def __compile_references(self) -> None:
+        "Compile every reference/alias expression once and validate them before executing"
+        self.__templates = {}
+        self.aliases = AliasIndex(self.settings["alias"])
+        groups = group_index(self.task["tasks"])
+        errors: List[str] = [*self.aliases.errors]
+        for _task in self.task["tasks"]:
+            templates = compile_task(_task)
+            for key, template in list(templates.items()):
+                errors.extend(reference_errors(_task, template, groups, self.aliases))
+                # Aliases are static, so they are only resolved once
+                folded = template.fold(lambda node: self.aliases.resolve(node) or "")
+                if isinstance(folded, (Template, Structure)):
+                    templates[key] = folded
+                else:
+                    _task[key] = folded
+                    del templates[key]
+            if len(templates) > 0:
+                self.__templates[_task["step"]] = templates
+        if len(errors) > 0:
+            for error in errors:
+                self.logger.error(error)
+            raise InstructionSetError(errors)
+
+    def _interpolate(self, task: Task) -> None:
+        "Replace every compiled reference of the Task with its value"
+        if task["step"] in self.__interpolated:
+            return
+        self.__interpolated.add(task["step"])
+        templates = self.__templates.get(task["step"], {})
+        if len(templates) == 0:
+            return
+        with self.tracer.span("resolve references"):
+            for key, template in templates.items():
+                task[key] = template.render(
+                    key, lambda node, k: self.__resolve(task, node, k)
+                )
+
+    def __resolve(self, task: Task, node: Reference, key: str) -> Any:
+        step = self._get_step_reference(task, str(node.step))
+        return step[node.field or key]
+
     def _get_step_reference(self, task: Task, ref: str) -> Union[Task, dict]:
-        # get step in reference
-        step_index = next(
-            (
-                index
-                for (index, d) in enumerate(self.__executed_tasks)
-                if d["step"] == int(ref.replace("$", ""))
-            ),
-            None,
-        )
-        if step_index == None:
+        step = self.outputs.get(int(ref.replace("$", "")))
+        if step is None:
             self.logger.error(
                 f"Reference in Task \"{task['name']}\" is either not been executed or doesn't exist."
             )
             raise Exception()
-        vars = {}
-        for _ in self.__operation_stack:
-            if _.task["step"] == step_index:
-                vars = _.__dict__
-                break
-        return dict(self.__executed_tasks[step_index], **vars)
+        return step
+
+    def _get_session(self, name: str) -> ShellSession:
+        "Get the Shell Session with the given name, starting it on first use"
+        # Parallel Tasks would start a session each
+        with self.__sessions_lock:
+            if name not in self.sessions:
+                self.sessions[name] = ShellSession(name)
+            return self.sessions[name]
+
+    def __close_sessions(self) -> None:
+        for session in self.sessions.values():
+            session.close()
+        self.sessions = {}
 
     def __first_execution_routine(self) -> None:
         "Create the initial configuration and setup necessary directories"
@@ -296,21 +585,58 @@ class Parser(ParserType):
         # TODO: validate entry point for Starting Location on config file
 
     def __get_configs(self) -> Settings:
-        j: Settings = json.load(open(f"{Path.expanduser('~')}/.tasker/config.json"))
-        return j
+        return get_settings_store().load()
+
+    def __default_settings(self, settings: Optional[Settings]) -> Settings:
+        "Fill the missing values of embedded settings, or use the ones of `~/.tasker`"
+        if settings is None:
+            self.do_config()
+            return self.__get_configs()
+        return Settings(
+            **{  # type: ignore
+                "current_location": os.getcwd(),
+                "default_location": os.getcwd(),
+                "extensions": [],
+                "alias": [],
+                **settings,
+            }
+        )
 
-    def __load_extensions(self) -> List[CustomOperation]:
-        modules: List[CustomOperation] = []
+    def __load_extensions(self) -> Dict[str, CustomOperation]:
+        used = set(
+            _["extension_name"]
+            for _ in self.task["tasks"]
+            if _["operation"] == "custom" and not _.get("isolated", False)
+        )
+        modules: Dict[str, CustomOperation] = {}
         for extension in self.settings["extensions"]:
+            if extension["name"] not in used:
+                continue
             try:
-                spec: OperationType = importer(f"{extension['file'].replace('.py', '')}", extension["path"]).load_module()  # type: ignore
-                modules.append(CustomOperation(executable=spec, summon=extension["name"]))
+                spec: OperationType = load_extension(extension["file"], extension["path"])  # type: ignore
+                modules[extension["name"]] = CustomOperation(
+                    executable=spec, summon=extension["name"]
+                )
             except Exception:
                 self.abort(
                     f"There was a problem importing {chalk.yellow(extension['name'])} Custom Extension. Please revise code implementation"
                 )
         return modules
 
+    def __start_workers(self) -> Dict[str, Tuple[str, str]]:
+        "Pre-fork a worker for every extension used by isolated Tasks"
+        used = set(
+            _["extension_name"]
+            for _ in self.task["tasks"]
+            if _["operation"] == "custom" and _.get("isolated", False)
+        )
+        isolated: Dict[str, Tuple[str, str]] = {}
+        for extension in self.settings["extensions"]:
+            if extension["name"] in used:
+                isolated[extension["name"]] = (extension["file"], extension["path"])
+                self.workers.start(extension["file"], extension["path"])
+        return isolated
+
     # Static Methods
 
     @staticmethod
@@ -321,18 +647,11 @@ class Parser(ParserType):
             p: str, what: Literal["all", "settings", "template"]
         ) -> None:
             if what == "all" or what == "settings":
-                with open(f"{p}/.tasker/config.json", "w") as config:
-                    json.dump(
-                        {
-                            "current_location": p,
-                            "default_location": p,
-                            "extensions": [],
-                            "alias": [],
-                        },
-                        config,
-                        indent=4,
+                get_settings_store().save(
+                    Settings(
+                        current_location=p, default_location=p, extensions=[], alias=[]
                     )
-                    config.close()
+                )
             if what == "all" or what == "template":
                 with open(f"{p}/.tasker/template.txt", "w") as template:
                     template.write(
@@ -357,6 +676,11 @@ class Parser(ParserType):
             "intent": "<description>",
         }
 
+        # Attributes other Tasks can reference, besides the Task values
+        _outputs = ("affected_files",)
+        # When True, `parallel` Tasks are executed in a worker process, using every core
+        _cpu_bound = False
+
         def __init__(self, ctx: Parser, task: Task, logger: Logger) -> None:
             self.context = ctx  # Parser Context
             self.task = task  # Current assigned Task
@@ -371,6 +695,11 @@ class Parser(ParserType):
             # Execution Block
             pass
 
+        # Used instead of `execute` when the Task is `parallel`. Awaiting I/O here lets
+        # the other Tasks of the group run meanwhile. By default `execute` runs in a thread
+        # async def aexecute(self) -> None:
+        #     pass
+
         def rollback(self) -> None:
             # Rollback Block
             pass
@@ -385,8 +714,7 @@ class Parser(ParserType):
                     )
 
         root_path = Path.expanduser("~")
-        root_folders = os.listdir(root_path)
-        if ".tasker" not in root_folders:
+        if not Path.isdir(f"{root_path}/.tasker"):
             os.mkdir(f"{root_path}/.tasker")
             os.mkdir(f"{root_path}/.tasker/Tasks")
             os.mkdir(f"{root_path}/.tasker/Templates")
@@ -405,14 +733,51 @@ class Parser(ParserType):
             if "template.txt" not in tasker_folder:
                 create_initial_config(root_path, "template")
 
+    @staticmethod
+    def validate_task(task: str, logger: Logger) -> bool:
+        "Report every problem of an InstructionSet without executing it"
+        Parser.do_config()
+        if not get_catalog().exists(task):
+            logger.error(f"'{task}' InstructionSet was not found")
+            return False
+        try:
+            instruction_set = Parser.get_task_descriptor(task)
+            errors = validate(instruction_set)
+        except ValueError as e:
+            errors = [f"Invalid JSON: {e}"]
+        if len(errors) == 0:
+            settings = get_settings_store().load()
+            errors = validate_references(instruction_set, AliasIndex(settings["alias"]))
+        for error in errors:
+            logger.error(error)
+        if len(errors) == 0:
+            logger.debug(f"'{task}' is a valid InstructionSet")
+        return len(errors) == 0
+
     @staticmethod
     def list_all_tasks() -> List[str]:
         "Lists all Task templates created"
         Parser.do_config()
-        return [
-            _.replace(".tasker.json", "")
-            for _ in os.listdir(f"{Path.expanduser('~')}/.tasker/Tasks")
-        ]
+        return get_catalog().names()
+
+    @staticmethod
+    def query_tasks(filters: List[str], logger: Logger) -> List[str]:
+        "Lists the Task templates matching every `key=value` filter"
+        Parser.do_config()
+        query: Dict[str, str] = {}
+        for _filter in filters:
+            key, sep, value = _filter.partition("=")
+            if sep == "":
+                logger.error(f"Filter '{_filter}' must use the `key=value` format")
+                sys.exit(1)
+            query[key.strip()] = value.strip()
+        try:
+            return [_["file"] for _ in get_catalog().query(query)]
+        except KeyError as e:
+            logger.error(
+                f"Unknown filter {e}. Use operation, extension, name, description or file"
+            )
+            sys.exit(1)
 
     @staticmethod
     def get_task_descriptor(task: str) -> Task:
@@ -433,6 +798,8 @@ class Parser(ParserType):
 
     @staticmethod
     def open_file_for_edit(file: str) -> None:
+        from webbrowser import open as FileOpener
+
         Parser.do_config()
         FileOpener(f"{Path.expanduser('~')}/.tasker/Tasks/{file}.tasker.json")
 
@@ -441,36 +808,38 @@ class Parser(ParserType):
         Parser.do_config()
         root = Path.expanduser("~")
         with open(f"{root}/.tasker/template.txt", "r") as template:
-            t = template.read()
+            # Templates written by older versions are indented
+            t = dedent(template.read())
             t = t.replace("<name>", name)
             _n = md5(f"{time()}_{name}".encode("UTF-8")).hexdigest()[:10]
             f_name = f"extension_{_n}.py"
             with open(f"{root}/.tasker/Templates/{f_name}", "w") as ex:
                 ex.write(t)
                 ex.close()
-            j: Settings = json.load(open(f"{root}/.tasker/config.json"))
-            j["extensions"].append(
-                {
-                    "name": name,
-                    "file": f_name,
-                    "path": f"{root}/.tasker/Templates/{f_name}",
-                    "version": 0,
-                }
-            )
-            json.dump(j, open(f"{root}/.tasker/config.json", "w"), indent=4)
+            with get_settings_store().transaction() as j:
+                j["extensions"].append(
+                    {
+                        "name": name,
+                        "file": f_name,
+                        "path": f"{root}/.tasker/Templates/{f_name}",
+                        "version": 0,
+                    }
+                )
             template.close()
 
     @staticmethod
     def add_alias(alias: Alias, logger: Logger) -> None:
-        root = Path.expanduser("~")
-        settings: Settings = json.load(open(f"{root}/.tasker/config.json"))
-        # check if alias is already present
-        for _alias in settings["alias"]:
-            if alias["name"] == _alias["name"]:
-                logger.error("An Alias with that name already exists")
+        with get_settings_store().transaction() as settings:
+            # check if alias is already present
+            for _alias in settings["alias"]:
+                if alias["name"] == _alias["name"]:
+                    logger.error("An Alias with that name already exists")
+                    sys.exit(1)
+            index = AliasIndex([*settings["alias"], alias])
+            if len(index.errors) > 0:
+                logger.error(index.errors[0])
                 sys.exit(1)
-        settings["alias"].append(alias)
-        json.dump(settings, open(f"{root}/.tasker/config.json", "w"), indent=4)
+            settings["alias"].append(alias)
 
     @staticmethod
     def install_remote_extension(
@@ -498,24 +867,26 @@ class Parser(ParserType):
             with open(f"{root}/.tasker/Templates/{f_name}", "w") as ex:
                 ex.write(template)
                 ex.close()
-            j["extensions"].append(
-                {
-                    "name": extension,
-                    "description": context[extension]["description"],
-                    "file": f_name,
-                    "path": f"{root}/.tasker/Templates/{f_name}",
-                    "version": context[extension]["version"],
-                }
-            )
-            json.dump(j, open(f"{root}/.tasker/config.json", "w"), indent=4)
+            with get_settings_store().transaction() as settings:
+                settings["extensions"].append(
+                    {
+                        "name": extension,
+                        "description": context[extension]["description"],
+                        "file": f_name,
+                        "path": f"{root}/.tasker/Templates/{f_name}",
+                        "version": context[extension]["version"],
+                    }
+                )
             return True
 
+        from requests import get
+
         Parser.do_config()
         root = Path.expanduser("~")
         # Remove DEBUG WARNINGS
         getLogger("requests").setLevel(WARNING)
         getLogger("urllib3").setLevel(WARNING)
-        j: Settings = json.load(open(f"{root}/.tasker/config.json"))
+        j = get_settings_store().load()
         index = None
         for i, ex in enumerate(j["extensions"]):
             if ex["name"] == extension:
@@ -577,21 +948,21 @@ class Parser(ParserType):
             with open(f"{root}/.tasker/Templates/{f_name}", "w") as ex:
                 ex.write(template)
                 ex.close()
-            j["extensions"].append(
-                {
-                    "name": context["name"],
-                    "file": f_name,
-                    "description": context["description"],
-                    "path": f"{root}/.tasker/Templates/{f_name}",
-                    "version": context["version"],
-                }
-            )
-            json.dump(j, open(f"{root}/.tasker/config.json", "w"), indent=4)
+            with get_settings_store().transaction() as settings:
+                settings["extensions"].append(
+                    {
+                        "name": context["name"],
+                        "file": f_name,
+                        "description": context["description"],
+                        "path": f"{root}/.tasker/Templates/{f_name}",
+                        "version": context["version"],
+                    }
+                )
             return True
 
         Parser.do_config()
         root = Path.expanduser("~")
-        j: Settings = json.load(open(f"{root}/.tasker/config.json"))
+        j = get_settings_store().load()
         index = None
         for i, ex in enumerate(j["extensions"]):
             if ex["name"] == descriptor["name"]:
@@ -627,23 +998,23 @@ class Parser(ParserType):
     @staticmethod
     def uninstall_extension(extension: str, logger: Logger) -> None:
         Parser.do_config()
-        root = Path.expanduser("~")
-        j: Settings = json.load(open(f"{root}/.tasker/config.json"))
-        if extension not in [_["name"] for _ in j["extensions"]]:
-            logger.error(f"{extension} is not installed")
-            sys.exit(1)
-        index = None
-        for i, ex in enumerate(j["extensions"]):
-            if ex["name"] == extension:
-                index = i
-                os.remove(ex["path"])
-                break
-        j["extensions"].pop(index)
-        json.dump(j, open(f"{root}/.tasker/config.json", "w"), indent=4)
+        with get_settings_store().transaction() as j:
+            if extension not in [_["name"] for _ in j["extensions"]]:
+                logger.error(f"{extension} is not installed")
+                sys.exit(1)
+            index = None
+            for i, ex in enumerate(j["extensions"]):
+                if ex["name"] == extension:
+                    index = i
+                    os.remove(ex["path"])
+                    break
+            j["extensions"].pop(index)
         logger.debug("Extension removed successfully")
 
     @staticmethod
     def search_remote(extension: str, logger: Logger) -> None:
+        from requests import get
+
         Parser.do_config()
         # Remove DEBUG WARNINGS
         getLogger("requests").setLevel(WARNING)
@@ -660,6 +1031,8 @@ class Parser(ParserType):
 
     @staticmethod
     def list_remote(logger: Logger) -> None:
+        from requests import get
+
         Parser.do_config()
         # Remove DEBUG WARNINGS
         getLogger("requests").setLevel(WARNING)
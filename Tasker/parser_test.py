@@ -1,9 +1,12 @@
+import json
 import os
 import sys
+import threading
 
 import pytest
 
 from Tasker import __main__, parser
+from Tasker.errors import InstructionSetError
 
 # ----------------------------------- __main__ -------------------------------------------
 
@@ -50,3 +53,71 @@ def test_list_instructions():
     ]
     check = parser.Parser.list_all_tasks()
     assert all_files == check
+
+
+def test_from_dict_is_reusable(tmp_path):
+    instruction_set = {
+        "name": "embedded",
+        "description": "",
+        "tasks": [
+            {"name": "greet", "step": 0, "operation": "echo", "value": "hello"},
+            {"name": "repeat", "step": 1, "operation": "echo", "value": "${0.value}!"},
+        ],
+    }
+    P = parser.Parser.from_dict(instruction_set, {"current_location": str(tmp_path)})
+    for _ in range(2):
+        result = P.run()
+        assert result["ok"] and [_["ok"] for _ in result["tasks"]] == [True, True]
+    assert P.task["tasks"][1]["value"] == "hello!"
+    # Other InstructionSets reuse the settings of the Parser
+    instruction_set["tasks"] = [{"name": "copy", "step": 0, "operation": "copy"}]
+    with pytest.raises(InstructionSetError) as error:
+        P.run(instruction_set)
+    assert 'Missing key "origin" in "copy" Task' in error.value.errors
+
+
+def test_from_dict_keeps_the_instruction_set(tmp_path):
+    (tmp_path / "in").mkdir()
+    (tmp_path / "out").mkdir()
+    (tmp_path / "in" / "a.txt").write_text("a")
+    task = {"name": "copy", "step": 0, "operation": "copy", "target": "*"}
+    task.update(origin="in", destination="out", subfolders=False)
+    instruction_set = {
+        "name": "copy",
+        "description": "",
+        "tasks": [
+            task,
+            {"name": "echo", "step": 1, "operation": "echo", "value": "${0.name}"},
+        ],
+    }
+    copied = json.loads(json.dumps(instruction_set))
+    settings = {"current_location": str(tmp_path)}
+    for _ in range(2):
+        assert parser.Parser.from_dict(instruction_set, settings).run()["ok"]
+    assert parser.Parser.from_dict(instruction_set, settings).run(instruction_set)["ok"]
+    assert instruction_set == copied
+
+
+def test_parallel_tasks_share_a_session(tmp_path):
+    tasks = [
+        {
+            "name": f"count {step}",
+            "step": step,
+            "operation": "command",
+            "output": True,
+            "command": [f"echo {step}-{_}" for _ in range(50)],
+            "parallel": True,
+            "!session": "shared",
+        }
+        for step in range(4)
+    ]
+    instruction_set = {"name": "session", "description": "", "tasks": tasks}
+    P = parser.Parser.from_dict(instruction_set, {"current_location": str(tmp_path)})
+    run = threading.Thread(target=lambda: results.append(P.run()), daemon=True)
+    results: list = []
+    run.start()
+    run.join(30)
+    assert not run.is_alive(), "The parallel Tasks are stuck on the session"
+    assert results[0]["ok"]
+    for step, task in enumerate(results[0]["tasks"]):
+        assert task["outputs"]["output"] == "".join(f"{step}-{_}\n" for _ in range(50))
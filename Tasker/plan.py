@@ -0,0 +1,60 @@
+import json
+import os
+import os.path as Path
+import threading
+from typing import Any, Dict, Optional
+
+from .__version__ import __version__
+from .types import Plan
+
+# Plans already read or written by this process, as JSON text so every load gets a copy
+_plans: Dict[str, str] = {}
+
+
+def plan_location() -> str:
+    return f"{Path.expanduser('~')}/.tasker/Plans"
+
+
+def plan_key(source: str, config: str) -> Dict[str, Any]:
+    "Identify a Plan by the InstructionSet and configuration it was compiled from"
+    source_stat = os.stat(source)
+    config_stat = os.stat(config)
+    return {
+        "version": __version__,
+        "source": [source_stat.st_mtime_ns, source_stat.st_size],
+        "config": [config_stat.st_mtime_ns, config_stat.st_size],
+    }
+
+
+def load_plan(name: str, key: Dict[str, Any]) -> Optional[Plan]:
+    "Load the compiled Plan of an InstructionSet if it is still up to date"
+    try:
+        # Read once, other threads may remove it from the cache meanwhile
+        text = _plans.get(name)
+        if text is None:
+            with open(f"{plan_location()}/{name}.plan.json", "r") as f:
+                text = _plans[name] = f.read()
+        plan: Plan = json.loads(text)
+    except (OSError, ValueError):
+        return None
+    if plan.get("key") != key:
+        # Other threads may be invalidating it too
+        _plans.pop(name, None)
+        return None
+    return plan
+
+
+def save_plan(name: str, plan: Plan) -> None:
+    "Atomically store the compiled Plan so concurrent runs never read half a file"
+    location = plan_location()
+    os.makedirs(location, exist_ok=True)
+    temp = f"{location}/.{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    text = _plans[name] = json.dumps(plan)
+    try:
+        with open(temp, "w") as f:
+            f.write(text)
+        os.replace(temp, f"{location}/{name}.plan.json")
+    except OSError:
+        # A Plan is only a cache, failing to store it never stops an execution
+        if Path.exists(temp):
+            os.remove(temp)
@@ -0,0 +1,165 @@
+import contextlib
+import os
+import re
+from contextlib import ExitStack, contextmanager
+from logging import Logger
+from typing import Iterator, List, Literal, Tuple, Union
+
+import chalk
+
+from .logs import flush
+from .types import Task
+
+ProfileMode = Literal["cpu", "memory"]
+PROFILE_MODES = ["cpu", "memory"]
+
+# Functions or allocation sites shown for every Task
+TOP = 5
+
+
+class TaskProfile:
+    "What a Task spent while profiled"
+
+    def __init__(self, task: Task, path: str, mode: ProfileMode) -> None:
+        self.mode = mode
+        self.step = task["step"]
+        self.name = task["name"]
+        self.path = path
+        self.total = 0.0  # Seconds, or peak bytes on `memory`
+        # Label and seconds, or bytes on `memory`, of the heaviest places
+        self.top: List[Tuple[str, float]] = []
+
+
+class Profiler:
+    """Profile the `execute()` of every Operation with cProfile (`cpu`), tracemalloc
+    (`memory`) or both, writing a file per Task and mode to `directory`"""
+
+    enabled = True
+
+    def __init__(
+        self, mode: Union[ProfileMode, List[ProfileMode]], directory: str
+    ) -> None:
+        self.modes: List[ProfileMode] = [mode] if isinstance(mode, str) else mode
+        self.directory = directory
+        self.profiles: List[TaskProfile] = []
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def profile(self, task: Task) -> Iterator[None]:
+        "Profile the block as the execution of the Task"
+        name = re.sub(r"[^\w.-]+", "_", task["name"])
+        with ExitStack() as stack:
+            # tracemalloc is started first, so its snapshots are not part of the cProfile
+            if "memory" in self.modes:
+                stack.enter_context(
+                    self.__memory(task, f"{self.directory}/{task['step']}-{name}.txt")
+                )
+            if "cpu" in self.modes:
+                stack.enter_context(
+                    self.__cpu(task, f"{self.directory}/{task['step']}-{name}.pstats")
+                )
+            yield
+
+    @contextmanager
+    def __cpu(self, task: Task, path: str) -> Iterator[None]:
+        import cProfile
+        import pstats
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+            result = TaskProfile(task, path, "cpu")
+            stats = pstats.Stats(profile)
+            result.total = stats.total_tt  # type: ignore
+            functions = sorted(
+                (
+                    _
+                    for _ in stats.stats.items()  # type: ignore
+                    if _[0][0] not in [__file__, contextlib.__file__]
+                ),
+                key=lambda _: _[1][2],
+                reverse=True,
+            )
+            result.top = [
+                (pstats.func_std_string(function), timings[2])
+                for function, timings in functions[:TOP]
+            ]
+            self.profiles.append(result)
+
+    @contextmanager
+    def __memory(self, task: Task, path: str) -> Iterator[None]:
+        import tracemalloc
+
+        # Already tracing when started with `python -X tracemalloc`
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            if started:
+                tracemalloc.stop()
+            # The cProfile of `cpu,memory` is written while tracing
+            filters = [
+                tracemalloc.Filter(False, _)
+                for _ in [tracemalloc.__file__, __file__, contextlib.__file__]
+                + ["*/cProfile.py", "*/pstats.py"]
+            ]
+            allocations = after.filter_traces(filters).compare_to(
+                before.filter_traces(filters), "lineno"
+            )
+            result = TaskProfile(task, path, "memory")
+            result.total = peak
+            result.top = [
+                (str(_.traceback), _.size_diff) for _ in allocations if _.size_diff > 0
+            ][:TOP]
+            with open(path, "w") as f:
+                f.write(f"Peak memory: {peak} bytes\n")
+                for allocation in allocations:
+                    f.write(f"{allocation}\n")
+            self.profiles.append(result)
+
+    def summarize(self, logger: Logger) -> None:
+        "Log the cost and heaviest places of every profiled Task"
+        flush()
+        print()
+        print("--------------  Profile  --------------")
+        print()
+        for result in sorted(self.profiles, key=lambda _: (_.step, _.mode)):
+            if result.mode == "cpu":
+                total = f"{result.total:.3f}s"
+            else:
+                total = f"peak {_size(result.total)}"
+            logger.info(f'Task "{result.name}" - {chalk.yellow(total)} - {result.path}')
+            for label, cost in result.top:
+                spent = f"{cost:.3f}s" if result.mode == "cpu" else f"+{_size(cost)}"
+                logger.info(f"    {spent:>10}  {label}")
+
+
+class NullProfiler(Profiler):
+    "Profiler used when profiling is off, measuring nothing"
+
+    enabled = False
+
+    def __init__(self) -> None:
+        self.profiles: List[TaskProfile] = []
+
+    @contextmanager
+    def profile(self, task: Task) -> Iterator[None]:
+        yield
+
+
+def _size(value: float) -> str:
+    for unit in ["B", "KiB", "MiB"]:
+        if abs(value) < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
@@ -0,0 +1,57 @@
+import pstats
+
+from Tasker.parser import Parser
+from Tasker.profiling import Profiler
+
+INSTRUCTION_SET = {
+    "name": "profiled",
+    "description": "",
+    "tasks": [
+        {
+            "name": "greet",
+            "step": 0,
+            "operation": "echo",
+            "value": "hi",
+            "parallel": True,
+        },
+        {
+            "name": "greet again",
+            "step": 1,
+            "operation": "echo",
+            "value": "hi",
+            "parallel": True,
+        },
+    ],
+}
+
+
+def test_cpu_profile(tmp_path):
+    profiler = Profiler("cpu", f"{tmp_path}/profile")
+    settings = {"current_location": str(tmp_path)}
+    Parser.from_dict(INSTRUCTION_SET, settings, profiler=profiler).run()
+    # Parallel Tasks are profiled one at a time
+    assert [_.name for _ in profiler.profiles] == ["greet", "greet again"]
+    assert profiler.profiles[1].path == f"{tmp_path}/profile/1-greet_again.pstats"
+    assert pstats.Stats(profiler.profiles[1].path).total_calls > 0  # type: ignore
+
+
+def test_memory_profile(tmp_path):
+    profiler = Profiler("memory", f"{tmp_path}/profile")
+    task = INSTRUCTION_SET["tasks"][0]
+    with profiler.profile(task):  # type: ignore
+        kept = [bytearray(1024) for _ in range(100)]
+    [profile] = profiler.profiles
+    assert profile.total >= 100 * 1024 and profile.top[0][1] >= 100 * 1024
+    assert open(profile.path).readline().startswith("Peak memory")
+    del kept
+
+
+def test_cpu_and_memory_profile(tmp_path):
+    profiler = Profiler(["cpu", "memory"], f"{tmp_path}/profile")
+    task = INSTRUCTION_SET["tasks"][0]
+    with profiler.profile(task):  # type: ignore
+        kept = [bytearray(1024) for _ in range(100)]
+    assert sorted(_.mode for _ in profiler.profiles) == ["cpu", "memory"]
+    memory = next(_ for _ in profiler.profiles if _.mode == "memory")
+    assert memory.total >= 100 * 1024
+    del kept
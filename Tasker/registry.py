@@ -0,0 +1,90 @@
+from logging import getLogger
+from threading import Lock
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TypeVar
+
+# Python package entry points providing extra Operations
+ENTRY_POINT_GROUP = "tasker.operations"
+
+T = TypeVar("T")
+
+
+class OperationSpec(NamedTuple):
+    name: str
+    operation: Any  # OperationType subclass, None for `custom`
+    keys: List[str]  # Operation keys, `!` prefixed keys are optional
+    definition: Any  # TypedDict with the value types of the keys
+    destination_check: bool  # Create the destination folder before executing
+
+
+REGISTRY: Dict[str, OperationSpec] = {}
+_loaded = False
+_lock = Lock()
+
+
+def register(
+    name: str,
+    keys: Optional[List[str]] = None,
+    definition: Any = None,
+    destination_check: bool = False,
+) -> Callable[[T], T]:
+    """Register an Operation class under `name`. Keys default to the `_keys` attribute
+    of the class"""
+
+    def _decorator(operation: T) -> T:
+        REGISTRY[name] = OperationSpec(
+            name=name,
+            operation=operation,
+            keys=list(keys if keys is not None else getattr(operation, "_keys", [])),
+            definition=definition,
+            destination_check=destination_check,
+        )
+        return operation
+
+    return _decorator
+
+
+def _entry_points() -> List[Any]:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return []
+    found = entry_points()
+    if hasattr(found, "select"):
+        return list(found.select(group=ENTRY_POINT_GROUP))
+    return list(found.get(ENTRY_POINT_GROUP, []))  # type: ignore
+
+
+def load_operations() -> Dict[str, OperationSpec]:
+    "Register, once per process, the built-in Operations and the installed plugins"
+    global _loaded
+    if _loaded:
+        return REGISTRY
+    with _lock:
+        if not _loaded:
+            _load_operations()
+            _loaded = True
+    return REGISTRY
+
+
+def _load_operations() -> None:
+    from . import operations  # noqa: F401 Built-ins register on import
+
+    for entry_point in _entry_points():
+        try:
+            plugin = entry_point.load()
+        except Exception:
+            getLogger(__name__).warning(
+                f'Could not load the "{entry_point.name}" Operation from {entry_point.value}'
+            )
+            continue
+        # Plugins can register themselves or expose an Operation class
+        if entry_point.name not in REGISTRY and isinstance(plugin, type):
+            register(
+                entry_point.name,
+                definition=getattr(plugin, "_definition", None),
+                destination_check=getattr(plugin, "_destination_check", False),
+            )(plugin)
+
+
+def get_operation(name: str) -> Optional[OperationSpec]:
+    return load_operations().get(name)
@@ -0,0 +1,39 @@
+from Tasker import registry
+from Tasker.operations import Copy
+
+PLUGIN = """
+from Tasker.types import OperationType
+
+
+class Upload(OperationType):
+    _keys = ["bucket", "!public"]
+    _destination_check = True
+"""
+
+
+def test_builtins_are_registered():
+    spec = registry.get_operation("copy")
+    assert spec is not None
+    assert spec.operation is Copy
+    assert spec.destination_check
+    assert registry.get_operation("custom").operation is None
+    assert registry.get_operation("unknown") is None
+
+
+def test_entry_point_plugins(tmp_path, monkeypatch):
+    (tmp_path / "tasker_upload.py").write_text(PLUGIN)
+    dist = tmp_path / "tasker_upload-0.1.dist-info"
+    dist.mkdir()
+    (dist / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: tasker-upload\nVersion: 0.1\n"
+    )
+    (dist / "entry_points.txt").write_text(
+        "[tasker.operations]\nupload = tasker_upload:Upload\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(registry, "_loaded", False)
+    monkeypatch.setattr(registry, "REGISTRY", dict(registry.REGISTRY))
+    spec = registry.get_operation("upload")
+    assert spec is not None
+    assert spec.keys == ["bucket", "!public"]
+    assert spec.destination_check
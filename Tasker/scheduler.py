@@ -0,0 +1,335 @@
+import json
+import os
+import os.path as Path
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from logging import Logger
+from os import environ as env
+from time import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .catalog import get_catalog
+from .jobs import execute_job
+from .types import JobResult, Schedule, ScheduleState
+
+CATCH_UP = ["skip", "once", "all"]
+# Runs started less than this many seconds late were not missed
+GRACE = 60.0
+# Longest wait between checks, so new and edited InstructionSets are picked up
+MAX_SLEEP = 30.0
+# Missed runs executed with the `all` catch up policy
+MAX_CATCH_UP = 100
+
+# (lowest, highest) value of every cron field
+FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+NAMES = [
+    {},
+    {},
+    {},
+    {
+        name: index + 1
+        for index, name in enumerate(
+            "jan feb mar apr may jun jul aug sep oct nov dec".split()
+        )
+    },
+    {name: index for index, name in enumerate("sun mon tue wed thu fri sat".split())},
+]
+
+
+def _parse_field(
+    field: str, lowest: int, highest: int, names: Dict[str, int]
+) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.lower().split(","):
+        part, _, step = part.partition("/")
+        if step != "" and (not step.isdigit() or int(step) < 1):
+            raise ValueError(f'Invalid step "{step}" in cron field "{field}"')
+        bounds = [names.get(_, _) for _ in part.split("-")] if part != "*" else []
+        try:
+            start, end = (
+                [int(_) for _ in bounds] if len(bounds) == 2 else [lowest, highest]
+            )
+            if len(bounds) == 1:
+                start = int(bounds[0])
+                # `5/15` starts at 5 and goes on until the end of the range
+                end = highest if step != "" else start
+        except ValueError:
+            raise ValueError(f'Invalid cron field "{field}"')
+        if len(bounds) > 2 or not lowest <= start <= end <= highest:
+            raise ValueError(
+                f'Invalid cron field "{field}". Values go from {lowest} to {highest}'
+            )
+        values.update(range(start, end + 1, int(step or 1)))
+    return values
+
+
+class CronExpression:
+    "5 field cron expression: minute hour day-of-month month day-of-week"
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f'Cron expression "{expression}" must have 5 fields')
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            _parse_field(field, *bounds, names)
+            for field, bounds, names in zip(fields, FIELDS, NAMES)
+        ]
+        # Both 0 and 7 are Sunday
+        self.weekdays = {_ % 7 for _ in weekdays}
+        # Like cron, when both days are restricted matching either is enough
+        self.any_day = not fields[2].startswith("*") and not fields[4].startswith("*")
+
+    def matches_day(self, date: datetime) -> bool:
+        day = date.day in self.days
+        weekday = date.isoweekday() % 7 in self.weekdays
+        return day or weekday if self.any_day else day and weekday
+
+    def next(self, after: datetime) -> datetime:
+        "First minute matching the expression strictly after `after`"
+        date = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = date + timedelta(days=366 * 8)
+        while date < limit:
+            if date.month not in self.months:
+                date = datetime(date.year + date.month // 12, date.month % 12 + 1, 1)
+            elif not self.matches_day(date):
+                date = date.replace(hour=0, minute=0) + timedelta(days=1)
+            elif date.hour not in self.hours:
+                date = date.replace(minute=0) + timedelta(hours=1)
+            elif date.minute not in self.minutes:
+                date += timedelta(minutes=1)
+            else:
+                return date
+        raise ValueError("Cron expression never matches a date")
+
+
+@lru_cache(maxsize=None)
+def compile_cron(expression: str) -> CronExpression:
+    return CronExpression(expression)
+
+
+def parse_schedule(value: Any) -> Schedule:
+    "Normalize the `schedule` of an InstructionSet: a cron expression, seconds or an object"
+    if isinstance(value, str):
+        value = {"cron": value}
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = {"every": value}
+    if not isinstance(value, dict):
+        raise ValueError("Expected a cron expression, seconds or an object")
+    schedule = Schedule(
+        cron=value.get("cron"),
+        every=value.get("every"),
+        catch_up=value.get("catch_up", "skip"),
+        jitter=value.get("jitter", 0),
+    )
+    if (schedule["cron"] is None) == (schedule["every"] is None):
+        raise ValueError('Expected either "cron" or "every"')
+    if schedule["cron"] is not None:
+        if not isinstance(schedule["cron"], str):
+            raise ValueError('"cron" must be a cron expression')
+        compile_cron(schedule["cron"]).next(datetime.now())
+    every = schedule["every"]
+    if every is not None and (
+        not isinstance(every, (int, float)) or isinstance(every, bool) or every <= 0
+    ):
+        raise ValueError('"every" must be a positive number of seconds')
+    if schedule["catch_up"] not in CATCH_UP:
+        raise ValueError(f'"catch_up" must be one of {", ".join(CATCH_UP)}')
+    jitter = schedule["jitter"]
+    if not isinstance(jitter, (int, float)) or isinstance(jitter, bool) or jitter < 0:
+        raise ValueError('"jitter" must be a positive number of seconds')
+    return schedule
+
+
+def next_run(schedule: Schedule, after: float) -> float:
+    "Timestamp of the first run strictly after `after`"
+    if schedule["every"] is not None:
+        return after + schedule["every"]
+    cron = compile_cron(schedule["cron"])  # type: ignore
+    return cron.next(datetime.fromtimestamp(after)).timestamp()
+
+
+def due_runs(schedule: Schedule, start: float, now: float) -> Tuple[int, float, bool]:
+    """Runs due from `start` until `now`, up to MAX_CATCH_UP. Also returns the first run
+    after `now` and if the latest due one is recent enough to still be on time"""
+    every = schedule["every"]
+    if every is not None:
+        missed = int((now - start) // every)
+        recent = (now - start) % every <= GRACE
+        return min(missed + 1, MAX_CATCH_UP), start + every * (missed + 1), recent
+    count, date = 0, start
+    while date <= now and count < MAX_CATCH_UP:
+        count += 1
+        date = next_run(schedule, date)
+    return count, next_run(schedule, now), next_run(schedule, now - GRACE) <= now
+
+
+def _format(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Scheduler:
+    """Long-lived loop executing the InstructionSets that declare a `schedule`.
+    A run that is due while the previous one is still going is skipped"""
+
+    def __init__(
+        self, logger: Logger, workers: Optional[int] = None, root: Optional[str] = None
+    ) -> None:
+        self.logger = logger
+        self.root = root or f"{Path.expanduser('~')}/.tasker"
+        self.path = f"{self.root}/schedule.json"
+        self.state = self.__load()
+        self.schedules: Dict[str, Schedule] = {}
+        # Start timestamps of the queued runs of every InstructionSet
+        self.__pending: Dict[str, List[float]] = {}
+        self.__running: Dict[str, Tuple[Future, float]] = {}
+        self.__invalid: Set[str] = set()
+        self.__changed = False
+        self.__wake = threading.Event()
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max(1, workers or os.cpu_count() or 1)
+        )
+
+    def run(self) -> None:
+        "Execute scheduled InstructionSets until interrupted"
+        from .parser import Parser
+
+        Parser.do_config()
+        # There is nobody to answer the OS warning
+        env["-No-Warning"] = "1"
+        self.logger.info("Tasker scheduler started")
+        try:
+            while True:
+                self.__wake.wait(self.tick(time()))
+                self.__wake.clear()
+        except KeyboardInterrupt:
+            self.logger.info("Stopping, waiting for the running InstructionSets")
+        finally:
+            self.close()
+            self.logger.info("Tasker scheduler stopped")
+
+    def tick(self, now: float) -> float:
+        "Queue and start the runs that are due. Returns the seconds until the next check"
+        self.__collect()
+        self.refresh(now)
+        for name, schedule in self.schedules.items():
+            state = self.state[name]
+            if state["next_run"] > now:
+                continue
+            count, state["next_run"], recent = due_runs(schedule, state["next_run"], now)
+            self.__changed = True
+            if count == 1 and recent:
+                runs = 1
+            elif schedule["catch_up"] == "all":
+                runs = count
+            elif schedule["catch_up"] == "once":
+                runs = 1
+            else:
+                runs = 1 if recent else 0
+            if runs < count:
+                self.logger.warning(f'"{name}" missed {count - runs} run(s)')
+            if runs == 0:
+                continue
+            if name in self.__running or len(self.__pending.get(name, [])) > 0:
+                self.logger.warning(f'"{name}" is still running, skipping its run')
+                continue
+            jitter = random.uniform(0, schedule["jitter"])
+            self.__pending[name] = [now + jitter] + [now] * (runs - 1)
+        for name, queue in self.__pending.items():
+            if len(queue) > 0 and queue[0] <= now and name not in self.__running:
+                queue.pop(0)
+                self.__start(name, now)
+        if self.__changed:
+            self.__save()
+        upcoming = [_["next_run"] for _ in self.state.values()] + [
+            queue[0] for queue in self.__pending.values() if len(queue) > 0
+        ]
+        return max(0.0, min([now + MAX_SLEEP, *upcoming]) - now)
+
+    def refresh(self, now: float) -> None:
+        "Read the schedule of every InstructionSet, restarting the ones that changed"
+        schedules: Dict[str, Schedule] = {}
+        for entry in get_catalog(self.root).refresh():
+            name = entry["file"]
+            if entry.get("schedule") is None:
+                continue
+            try:
+                schedules[name] = parse_schedule(entry["schedule"])
+                self.__invalid.discard(name)
+            except ValueError as e:
+                if name not in self.__invalid:
+                    self.logger.error(f'Invalid schedule in "{name}": {e}')
+                self.__invalid.add(name)
+                continue
+            state = self.state.get(name)
+            if state is None or state.get("schedule") != schedules[name]:
+                self.state[name] = ScheduleState(
+                    schedule=schedules[name],
+                    next_run=next_run(schedules[name], now),
+                    last_run=None if state is None else state["last_run"],
+                    last_ok=None if state is None else state["last_ok"],
+                    last_duration=None if state is None else state["last_duration"],
+                )
+                self.__changed = True
+                self.logger.info(
+                    f'Scheduled "{name}", next run at {_format(self.state[name]["next_run"])}'
+                )
+        for name in [_ for _ in self.state.keys() if _ not in schedules]:
+            del self.state[name]
+            self.__pending.pop(name, None)
+            self.__changed = True
+        self.schedules = schedules
+
+    def close(self) -> None:
+        self.__executor.shutdown(wait=True)
+        self.__collect()
+        if self.__changed:
+            self.__save()
+
+    def __start(self, name: str, now: float) -> None:
+        self.logger.info(f'Starting "{name}"')
+        future = self.__executor.submit(execute_job, name, self.logger)
+        future.add_done_callback(lambda _: self.__wake.set())
+        self.__running[name] = (future, now)
+
+    def __collect(self) -> None:
+        "Record the outcome of the runs that finished"
+        for name, (future, started) in list(self.__running.items()):
+            if not future.done():
+                continue
+            del self.__running[name]
+            result: JobResult = future.result()
+            state = self.state.get(name)
+            if state is not None:
+                state["last_run"] = started
+                state["last_ok"] = result["ok"]
+                state["last_duration"] = result["initialization"] + result["execution"]
+                self.__changed = True
+            if result["ok"]:
+                self.logger.info(f'"{name}" finished')
+            else:
+                self.logger.error(f'"{name}" failed')
+
+    def __load(self) -> Dict[str, ScheduleState]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def __save(self) -> None:
+        temp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp, "w") as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(temp, self.path)
+            self.__changed = False
+        except OSError as e:
+            self.logger.warning(f"Could not save the schedule state: {e}")
+            if Path.exists(temp):
+                os.remove(temp)
@@ -0,0 +1,54 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from Tasker import scheduler
+from Tasker.scheduler import Scheduler, compile_cron, parse_schedule
+
+
+def test_cron_next_run():
+    cron = compile_cron("*/15 9-17 * * mon-fri")
+    # Saturday evening goes to Monday morning
+    assert cron.next(datetime(2024, 6, 1, 18, 0)) == datetime(2024, 6, 3, 9, 0)
+    assert cron.next(datetime(2024, 6, 3, 9, 0)) == datetime(2024, 6, 3, 9, 15)
+    # Day of month and day of week restricted: either one matches
+    assert compile_cron("0 0 13 * 5").next(datetime(2024, 6, 1)) == datetime(2024, 6, 7)
+    assert compile_cron("0 0 29 2 *").next(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+    for invalid in ["* * *", "60 * * * *", "*/0 * * * *", "a * * * *"]:
+        with pytest.raises(ValueError):
+            parse_schedule(invalid)
+    assert parse_schedule(30)["every"] == 30
+
+
+def test_catch_up_and_overlap(tmp_path, monkeypatch):
+    os.mkdir(f"{tmp_path}/Tasks")
+    for name, catch_up in [("skip", "skip"), ("all", "all")]:
+        with open(f"{tmp_path}/Tasks/{name}.tasker.json", "w") as f:
+            json.dump({"schedule": {"every": 100, "catch_up": catch_up}}, f)
+    release = threading.Event()
+    started = []
+
+    def execute_job(name, logger):
+        started.append(name)
+        release.wait(5)
+        return {"ok": True, "initialization": 0.0, "execution": 0.0}
+
+    monkeypatch.setattr(scheduler, "execute_job", execute_job)
+    runner = Scheduler(logging.getLogger(__name__), workers=2, root=str(tmp_path))
+    runner.tick(1000)
+    assert runner.state["skip"]["next_run"] == 1100
+    # Down for 4 runs, the latest one too late to be on time
+    runner.tick(1475)
+    assert started == ["all"]
+    # Still running when the next run is due, the other one is on time
+    runner.tick(1500)
+    release.set()
+    runner.close()
+    assert started == ["all", "skip"]
+    state = json.load(open(f"{tmp_path}/schedule.json"))
+    assert state["all"]["last_ok"] and state["all"]["next_run"] == 1600
+    assert state["skip"]["last_run"] == 1500
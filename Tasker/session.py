@@ -0,0 +1,111 @@
+import os
+import platform
+import signal
+import subprocess
+import threading
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+
+def kill_tree(process: subprocess.Popen) -> None:
+    "Kill a process started with `start_new_session`, along with the ones it started"
+    if platform.system() == "Windows":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+class ShellSession:
+    "Long lived shell process shared by every Command Task with the same `session` name"
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.sentinel = f"__tasker_{uuid4().hex}__"
+        self.windows = platform.system() == "Windows"
+        # Parallel Tasks share the session, one command is written and read at a time
+        self.lock = threading.RLock()
+        self.process = self.__start()
+        self.__expired = False
+
+    def run(self, command: str, timeout: Optional[float] = None) -> Tuple[int, str]:
+        """Run a command inside the session and return its exit code and output. After
+        `timeout` seconds the session is killed and started again, losing its state"""
+        with self.lock:
+            if timeout is None:
+                return self.__run(command)
+            self.__expired = False
+            timer = threading.Timer(timeout, self.__expire)
+            timer.start()
+            try:
+                return self.__run(command)
+            except Exception:
+                if self.__expired:
+                    raise TimeoutError(
+                        f"Session '{self.name}' timed out after {timeout}s running '{command}', it was restarted"
+                    )
+                raise
+            finally:
+                timer.cancel()
+                timer.join()
+                if self.__expired:
+                    self.process.wait()
+                    self.process = self.__start()
+
+    def __run(self, command: str) -> Tuple[int, str]:
+        if self.process.poll() is not None:
+            raise Exception(f"Session '{self.name}' is no longer running")
+        self.process.stdin.write(self.__frame(command))  # type: ignore
+        self.process.stdin.flush()  # type: ignore
+        lines: List[str] = []
+        while True:
+            line = self.process.stdout.readline()  # type: ignore
+            if line == "":
+                raise Exception(f"Session '{self.name}' exited while running '{command}'")
+            if self.sentinel in line:
+                # Output without a trailing newline ends up on the sentinel line
+                head, _, code = line.rpartition(self.sentinel)
+                lines.append(head)
+                return (int(code.strip() or 0), "".join(lines))
+            lines.append(line)
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write("exit\n")  # type: ignore
+                self.process.stdin.flush()  # type: ignore
+                self.process.wait(timeout=5)
+            except Exception:
+                self.process.kill()
+
+    def __start(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["cmd.exe", "/Q", "/K", "prompt $S"] if self.windows else ["/bin/sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            bufsize=1,
+            # Killed along with the commands it started, which hold its stdout open
+            start_new_session=not self.windows,
+        )
+
+    def __expire(self) -> None:
+        self.__expired = True
+        kill_tree(self.process)
+
+    def __frame(self, command: str) -> str:
+        "Wrap the command so its exit code is printed after a sentinel"
+        if self.windows:
+            return f"{command} < NUL\necho {self.sentinel}%errorlevel%\n"
+        # `eval` turns unbalanced quotes into a failed command instead of reading the
+        # sentinel as the rest of the string. `command` keeps the shell from exiting on it
+        quoted = command.replace("'", "'\\''")
+        # Commands can't read from the session stdin, otherwise they would eat the sentinel
+        return f"{{ command eval '{quoted}'\n}} < {os.devnull}\necho {self.sentinel}$?\n"
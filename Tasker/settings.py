@@ -0,0 +1,104 @@
+import json
+import os
+import os.path as Path
+import threading
+from contextlib import contextmanager
+from copy import deepcopy
+from typing import Dict, Iterator, Optional, Tuple
+
+from .types import Settings
+
+try:
+    import fcntl
+
+    def _lock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+except ImportError:
+    import msvcrt
+
+    def _lock(fd: int) -> None:
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    def _unlock(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class SettingsStore:
+    "Cached access to a Tasker `config.json` with atomic and locked writes"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__settings: Optional[Settings] = None
+        self.__stat: Optional[Tuple[int, int]] = None
+        # File locks are per process, threads of the same process share this one
+        self.__thread_lock = threading.RLock()
+
+    def load(self) -> Settings:
+        "Get a copy of the settings, only reading the file again when it changed"
+        stat = self.__file_stat()
+        settings = self.__settings
+        if settings is None or stat != self.__stat:
+            with open(self.path, "r") as f:
+                settings = self.__settings = json.load(f)
+            self.__stat = stat
+        # Parsers change their copy, like the `current_location` of embedded runs
+        return deepcopy(settings)  # type: ignore
+
+    @contextmanager
+    def transaction(self) -> Iterator[Settings]:
+        "Batch mutations into a single write, made while holding the file lock"
+        with self.__locked():
+            self.__settings = None
+            settings = self.load()
+            yield settings
+            self.__write(settings)
+
+    def save(self, settings: Settings) -> None:
+        "Replace the whole configuration"
+        with self.__locked():
+            self.__write(settings)
+
+    def __write(self, settings: Settings) -> None:
+        temp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "w") as f:
+            json.dump(settings, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+        self.__settings = deepcopy(settings)
+        self.__stat = self.__file_stat()
+
+    def __file_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @contextmanager
+    def __locked(self) -> Iterator[None]:
+        with self.__thread_lock:
+            fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT)
+            try:
+                _lock(fd)
+                try:
+                    yield
+                finally:
+                    _unlock(fd)
+            finally:
+                os.close(fd)
+
+
+_stores: Dict[str, SettingsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_settings_store(path: Optional[str] = None) -> SettingsStore:
+    "Get the process wide store of a configuration file, `~/.tasker/config.json` by default"
+    path = path or f"{Path.expanduser('~')}/.tasker/config.json"
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SettingsStore(path)
+        return _stores[path]
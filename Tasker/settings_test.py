@@ -0,0 +1,53 @@
+import json
+import os
+from multiprocessing import Pool
+
+from Tasker.settings import SettingsStore, get_settings_store
+
+
+def _add_alias(args):
+    path, index = args
+    with SettingsStore(path).transaction() as settings:
+        settings["alias"].append({"name": f"alias_{index}", "path": "/tmp"})
+
+
+def _store(tmp_path) -> SettingsStore:
+    path = f"{tmp_path}/config.json"
+    store = SettingsStore(path)
+    store.save(
+        {"current_location": "", "default_location": "", "extensions": [], "alias": []}
+    )
+    return store
+
+
+def test_load_is_cached_until_the_file_changes(tmp_path):
+    store = _store(tmp_path)
+    first = store.load()
+    assert store.load() == first
+    # Changes to a loaded copy never reach the next load
+    first["current_location"] = "/somewhere/else"
+    assert store.load()["current_location"] == ""
+    with open(store.path, "w") as f:
+        json.dump({**first, "current_location": "/changed/location"}, f)
+    assert store.load()["current_location"] == "/changed/location"
+
+
+def test_transaction_batches_mutations_and_leaves_no_temp_files(tmp_path):
+    store = _store(tmp_path)
+    with store.transaction() as settings:
+        settings["alias"].append({"name": "a", "path": "/a"})
+        settings["alias"].append({"name": "b", "path": "/b"})
+    assert [_["name"] for _ in store.load()["alias"]] == ["a", "b"]
+    assert sorted(os.listdir(tmp_path)) == ["config.json", "config.json.lock"]
+
+
+def test_concurrent_processes_never_lose_writes(tmp_path):
+    store = _store(tmp_path)
+    with Pool(4) as pool:
+        pool.map(_add_alias, [(store.path, i) for i in range(40)])
+    assert len(store.load()["alias"]) == 40
+
+
+def test_store_is_shared_per_process(tmp_path):
+    path = f"{tmp_path}/config.json"
+    assert get_settings_store(path) is get_settings_store(path)
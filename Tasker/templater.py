@@ -6,16 +6,17 @@ from time import time
 from typing import List, Literal, Union
 
 import questionary as qt
-from validators import ValidationFailure, url
 
 from .common import check_duplicate_names
+from .settings import get_settings_store
 from .types import *
 
 REFERENCES = []
 
 
 def ask_file_to_run(
-    options: List[str], operation: Literal["execute", "edit"]
+    options: List[str],
+    operation: Literal["execute", "edit", "validate", "watch", "inspect"],
 ) -> Union[str, None]:
     option = qt.select(
         f"Which InstructionSet do you want to {operation}?", choices=options, qmark="📁"
@@ -42,9 +43,7 @@ def _create_path_or_autocomplete(
 
 
 def create_template(logger: Logger) -> InstructionSet:
-    settings: Settings = json.load(
-        open(f"{Path.expanduser('~')}/.tasker/config.json", "r")
-    )
+    settings = get_settings_store().load()
     command_a = "Command Action"
     copy_a = "Copy Action"
     custom_a = "Custom Action"
@@ -298,6 +297,8 @@ def create_echo_task(step: int, logger: Logger) -> Echo:
 
 
 def create_request_task(step: int, logger: Logger) -> Request:
+    from validators import ValidationFailure, url
+
     mark = "®️"
     ans: Request = {
         "name": "",
@@ -463,9 +464,7 @@ def create_sleep_task(step: int, logger: Logger):
 def create_custom_task(step: int, logger: Logger) -> Custom:
     mark = "🛠️"
     ans: Custom = {"name": "", "step": step, "operation": "custom", "extension_name": ""}
-    settings: Settings = json.load(
-        open(f"{Path.expanduser('~')}/.tasker/config.json", "r")
-    )
+    settings = get_settings_store().load()
     ans["name"] = qt.text("What's the name of the Task?", qmark=mark).ask()
     ans["extension_name"] = qt.select(
         "Select an extension:",
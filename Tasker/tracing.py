@@ -0,0 +1,207 @@
+import json
+import os
+import os.path as Path
+import threading
+from contextlib import contextmanager
+from itertools import count
+from time import perf_counter, time
+from typing import Any, Dict, Iterator, List, Optional
+
+from .__version__ import __version__
+from .types import OperationType, Task
+
+
+class Span:
+    "Timed phase of an execution. Times are `perf_counter` seconds"
+
+    def __init__(
+        self,
+        name: str,
+        id: int,
+        parent: Optional[int],
+        thread: int,
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.id = id
+        self.parent = parent
+        self.thread = thread
+        self.attributes = attributes
+        self.start = perf_counter()
+        self.end = self.start
+        self.error: Optional[str] = None
+
+
+class Tracer:
+    "Collect the Spans of executions, exported as a Chrome trace or OTLP JSON"
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        # Converts `perf_counter` values into Unix time
+        self.__epoch = time() - perf_counter()
+        self.__trace = os.urandom(16).hex()
+        self.__ids = count(1)
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        "Time the block, nested in the Span open on this thread"
+        stack: List[Span] = self.__local.__dict__.setdefault("stack", [])
+        span = Span(
+            name,
+            next(self.__ids),
+            stack[-1].id if len(stack) > 0 else None,
+            threading.get_ident(),
+            attributes,
+        )
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = str(e) or type(e).__name__
+            raise
+        finally:
+            span.end = perf_counter()
+            stack.pop()
+            with self.__lock:
+                self.spans.append(span)
+
+    def add(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        parent: Optional[Span] = None,
+        **attributes: Any,
+    ) -> Span:
+        "Record a Span timed elsewhere, like in another thread or process"
+        span = Span(name, next(self.__ids), parent.id if parent else None, 0, attributes)
+        # Each one gets its own track, as they overlap
+        span.thread = span.id
+        span.start, span.end = start, end
+        with self.__lock:
+            self.spans.append(span)
+        return span
+
+    def export(self, path: str) -> None:
+        "Write `*.otlp.json` files as OTLP JSON, anything else as a Chrome trace"
+        data = self.otlp() if path.endswith(".otlp.json") else self.chrome_trace()
+        with open(path, "w") as f:
+            json.dump(data, f, default=str)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        "Trace Event Format, opened by chrome://tracing and Perfetto"
+        pid = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": "tasker",
+                    "ph": "X",
+                    "ts": (span.start + self.__epoch) * 1e6,
+                    "dur": (span.end - span.start) * 1e6,
+                    "pid": pid,
+                    "tid": span.thread,
+                    "args": {
+                        **span.attributes,
+                        **({"error": span.error} if span.error else {}),
+                    },
+                }
+                for span in sorted(self.spans, key=lambda _: _.start)
+            ],
+        }
+
+    def otlp(self) -> Dict[str, Any]:
+        "OTLP/JSON ExportTraceServiceRequest, accepted by OpenTelemetry collectors"
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _attributes({"service.name": "tasker"})},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "Tasker", "version": __version__},
+                            "spans": [self.__otlp_span(_) for _ in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def __otlp_span(self, span: Span) -> Dict[str, Any]:
+        return {
+            "traceId": self.__trace,
+            "spanId": f"{span.id:016x}",
+            "parentSpanId": f"{span.parent:016x}" if span.parent else "",
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(int((span.start + self.__epoch) * 1e9)),
+            "endTimeUnixNano": str(int((span.end + self.__epoch) * 1e9)),
+            "attributes": _attributes(span.attributes),
+            # STATUS_CODE_ERROR or STATUS_CODE_UNSET
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+        }
+
+
+class NullTracer(Tracer):
+    "Tracer used when tracing is off, recording nothing"
+
+    enabled = False
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        yield _NULL_SPAN
+
+    def add(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        parent: Optional[Span] = None,
+        **attributes: Any,
+    ) -> Span:
+        return _NULL_SPAN
+
+
+_NULL_SPAN = Span("", 0, None, 0, {})
+
+
+def _attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": typed})
+    return attributes
+
+
+def task_attributes(
+    task: Task, operation: Optional[OperationType], measure: bool = True
+) -> Dict[str, Any]:
+    """Files, bytes and HTTP calls of an executed Task. Without `measure` the files of
+    Operations that don't report their `affected_bytes` are not read, counting 0 bytes"""
+    files = getattr(operation, "affected_files", None) or []
+    # File Operations measure the files before they are moved or deleted, the files of
+    # other Operations are measured as they are left
+    size = getattr(operation, "affected_bytes", None)
+    if size is None:
+        size = sum(Path.getsize(_) for _ in files if Path.isfile(_)) if measure else 0
+    attributes: Dict[str, Any] = {
+        "step": task["step"],
+        "operation": task["operation"],
+        "files": len(files),
+        "bytes": size,
+    }
+    calls = getattr(operation, "_http_calls", 0)
+    if calls > 0:
+        attributes["http.calls"] = calls
+    return attributes
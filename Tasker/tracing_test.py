@@ -0,0 +1,57 @@
+from Tasker.parser import Parser
+from Tasker.tracing import Tracer, task_attributes
+
+
+def test_spans_of_an_execution(tmp_path):
+    tracer = Tracer()
+    instruction_set = {
+        "name": "traced",
+        "description": "",
+        "tasks": [
+            {"name": "greet", "step": 0, "operation": "echo", "value": "hello"},
+            {"name": "repeat", "step": 1, "operation": "echo", "value": "$0"},
+        ],
+    }
+    Parser.from_dict(
+        instruction_set, {"current_location": str(tmp_path)}, tracer=tracer
+    ).run()
+    spans = {_.name: _ for _ in tracer.spans}
+    assert {"load", "validate", "compile references", "resolve references"} <= set(spans)
+    assert spans["repeat"].parent == spans["execute"].id
+    assert spans["resolve references"].parent == spans["repeat"].id
+    assert spans["repeat"].attributes["operation"] == "echo"
+
+    events = tracer.chrome_trace()["traceEvents"]
+    assert all(_["ph"] == "X" and _["dur"] >= 0 for _ in events)
+    otlp = tracer.otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(otlp) == len(events) and len(otlp[0]["traceId"]) == 32
+
+
+def test_files_and_bytes_of_file_operations(tmp_path):
+    (tmp_path / "origin").mkdir()
+    (tmp_path / "moved").mkdir()
+    (tmp_path / "origin" / "data.bin").write_bytes(b"0" * 5000)
+    tasks = [
+        {"name": "move", "step": 0, "operation": "move", "target": "*"},
+        {"name": "zip", "step": 1, "operation": "zip", "target": "*", "rename": "a"},
+        {"name": "delete", "step": 2, "operation": "delete", "target": "*.bin"},
+    ]
+    tasks[0].update(origin="origin", destination="moved")
+    tasks[1].update(destination="moved", subfolders=False)
+    tasks[2].update(destination="moved", subfolders=True)
+    instruction_set = {"name": "files", "description": "", "tasks": tasks}
+    result = Parser.from_dict(instruction_set, {"current_location": str(tmp_path)}).run()
+    assert result["ok"]
+    # The moved and deleted files are gone, but were measured before
+    assert [(_["files"], _["bytes"]) for _ in result["tasks"]] == [(1, 5000)] * 3
+
+
+def test_affected_files_are_only_read_when_measured(tmp_path):
+    class Written:
+        affected_files = [str(tmp_path / "a.txt")]
+
+    (tmp_path / "a.txt").write_bytes(b"0" * 10)
+    task = {"name": "written", "step": 0, "operation": "custom"}
+    assert task_attributes(task, Written())["bytes"] == 10  # type: ignore
+    unmeasured = task_attributes(task, Written(), measure=False)  # type: ignore
+    assert (unmeasured["files"], unmeasured["bytes"]) == (1, 0)
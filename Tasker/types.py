@@ -1,5 +1,7 @@
 from logging import Logger
-from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple, Union
+
+from .session import ShellSession
 
 try:
     from typing import TypedDict
@@ -9,18 +11,28 @@ except Exception:
 # Structure definitions
 OP_INSTRUCTION = ["name", "description", "tasks"]
 OP_TASK = ["name", "step", "operation"]
+# Keys every Operation accepts
+OP_TASK_OPTIONAL = ["!parallel"]
 
 # Operation Key values
 OP_COPY = ["target", "origin", "destination", "subfolders"]
 OP_MOVE = ["target", "origin", "destination"]
-OP_COMMAND = ["output", "command"]
+OP_COMMAND = [
+    "output",
+    "command",
+    "!matrix",
+    "!max_parallel",
+    "!fail_fast",
+    "!session",
+    "!timeout",
+]
 OP_DELETE = ["target", "destination"]
 OP_ZIP = ["target", "rename", "!deflate", "!destination"]
 OP_INPUT = ["question"]
 OP_ECHO = ["value"]
 OP_REQUEST = ["endpoint", "method", "!body", "!headers"]
 # OP_REGISTRY = ["start_key", "key", "function", "!value", "!rename"]
-OP_CUSTOM = ["extension_name"]
+OP_CUSTOM = ["extension_name", "!isolated", "!timeout", "!memory_limit"]
 
 # Available Operations
 OPERATIONS = [
@@ -130,6 +142,9 @@ class Custom(TypedDict):
     step: int
     operation: Literal["custom"]
     extension_name: str
+    isolated: Optional[bool]
+    timeout: Optional[Union[int, float]]
+    memory_limit: Optional[int]
 
 
 class Command(TypedDict):
@@ -137,7 +152,12 @@ class Command(TypedDict):
     step: int
     operation: Literal["command"]
     output: bool
-    command: str
+    command: Union[str, List[str]]
+    matrix: Optional[Union[str, List[Any]]]
+    max_parallel: Optional[int]
+    fail_fast: Optional[bool]
+    session: Optional[str]
+    timeout: Optional[Union[int, float]]
 
 
 # Structure Definition for task
@@ -163,7 +183,22 @@ class Task(TypedDict):
     function: Literal["get", "set", "create", "backup"]
     extension_name: str
     output: bool
-    command: str
+    command: Union[str, List[str]]
+    matrix: Optional[Union[str, List[Any]]]
+    max_parallel: Optional[int]
+    fail_fast: Optional[bool]
+    session: Optional[str]
+    parallel: Optional[bool]
+    isolated: Optional[bool]
+    timeout: Optional[Union[int, float]]
+    memory_limit: Optional[int]
+
+
+class Schedule(TypedDict):
+    cron: Optional[str]  # minute hour day-of-month month day-of-week
+    every: Optional[Union[int, float]]  # Seconds
+    catch_up: Literal["skip", "once", "all"]
+    jitter: Union[int, float]  # Seconds
 
 
 # Structure Definition for instruction_set
@@ -173,6 +208,7 @@ class InstructionSet(TypedDict):
     tasks: List[
         Union[Task, Copy, Move, Zip, Delete, Input, Echo, Request, Custom, Command]
     ]
+    schedule: Optional[Union[str, int, float, Schedule]]
 
 
 class Extension(TypedDict):
@@ -193,6 +229,75 @@ class Settings(TypedDict):
     alias: List[Alias]
 
 
+class CatalogEntry(TypedDict):
+    file: str
+    name: str
+    description: str
+    tasks: int
+    operations: List[str]
+    extensions: List[str]
+    schedule: Optional[Any]
+    mtime: int
+    size: int
+
+
+class Plan(TypedDict):
+    key: Dict[str, Any]
+    settings: Settings
+    task: InstructionSet
+    templates: Dict[str, Dict[str, Any]]
+
+
+class JobResult(TypedDict):
+    instruction_set: str
+    ok: bool
+    initialization: float  # Seconds
+    execution: float  # Seconds
+    error: Optional[str]
+
+
+class TaskResult(TypedDict):
+    name: str
+    step: int
+    operation: str
+    ok: bool
+    duration: float  # Seconds
+    files: int  # Affected files
+    bytes: int  # Affected size, only of file Operations when not traced nor recorded
+    outputs: Dict[str, Any]
+    error: Optional[str]
+
+
+class ExecutionResult(TypedDict):
+    instruction_set: str
+    ok: bool
+    tasks: List[TaskResult]
+    initialization: float  # Seconds
+    execution: float  # Seconds
+
+
+class TaskStats(TypedDict):
+    step: int
+    name: str
+    runs: int  # Successful runs measured
+    p50: float  # Seconds
+    p95: float
+    max: float
+    last: float
+    files: int  # Of the last run
+    bytes: int
+    baseline: Optional[float]  # Median before the latest runs, once there are enough
+    regression: bool
+
+
+class ScheduleState(TypedDict):
+    schedule: Schedule
+    next_run: float  # Timestamps
+    last_run: Optional[float]
+    last_ok: Optional[bool]
+    last_duration: Optional[float]  # Seconds
+
+
 class ParserType:
 
     system: str
@@ -201,12 +306,17 @@ class ParserType:
     settings: Settings
     execution: Dict[str, Union[float, str]]
     supported_os: List[str]
-    extensions: list
+    extensions: Dict[str, Any]
+    sessions: Dict[str, ShellSession]
+    workers: Any
     default_location: str
-    __executed_tasks: List[Task]
+    outputs: Any
+    changed_files: Optional[List[str]]
+    tracer: Any
+    profiler: Any
     __operation_stack: list
 
-    def execute(self) -> None:
+    def execute(self, steps: Optional[Set[int]] = None) -> None:
         pass
 
     def warn_user(self) -> None:
@@ -221,15 +331,17 @@ class ParserType:
     def __check_destination_path(self, task: Task) -> None:
         pass
 
-    def __analyse_keys(self) -> Tuple[bool, str, str, str]:
-        return (True, "", "", "")
-
     def __optional_parameters(self) -> None:
         pass
 
     def _get_all_file_paths(self, directory: str) -> List[str]:
         return []
 
+    def _changed_files(
+        self, directory: str, recursive: bool = True
+    ) -> Optional[List[str]]:
+        return None
+
     def _get_file_name(self, p: str) -> str:
         return ""
 
@@ -239,6 +351,12 @@ class ParserType:
     def _get_step_reference(self, task: Task, ref: str) -> Union[Task, dict]:
         return Task()
 
+    def _interpolate(self, task: Task) -> None:
+        pass
+
+    def _get_session(self, name: str) -> ShellSession:
+        return ShellSession(name)
+
     def __first_execution_routine(self) -> None:
         pass
 
@@ -282,10 +400,20 @@ class OperationType:
     affected_files: List[str]
     _type: str
     __internal_state: bool
+    # Attributes that can be referenced by other steps. None publishes every attribute
+    _outputs: Optional[Tuple[str, ...]] = None
+    # Executed in a worker process when the Task is `parallel`
+    _cpu_bound: bool = False
 
     def execute(self) -> None:
         pass
 
+    async def aexecute(self) -> None:
+        "Asynchronous execution used by `parallel` Tasks. Runs `execute` in a thread"
+        import asyncio
+
+        await asyncio.get_running_loop().run_in_executor(None, self.execute)
+
     def rollback(self) -> None:
         pass
 
@@ -301,16 +429,3 @@ class OperationType:
 class CustomOperation(TypedDict):
     summon: str
     executable: OperationType
-
-
-DESTINATION_CHECK_MAP: Dict[str, bool] = {
-    "copy": True,
-    "command": False,
-    "custom": False,
-    "delete": True,
-    "echo": False,
-    "input": False,
-    "move": True,
-    "request": False,
-    "zip": True,
-}
@@ -0,0 +1,198 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple, Union, get_type_hints
+
+try:
+    from typing import Literal, get_args, get_origin
+except Exception:
+    from typing_extensions import Literal, get_args, get_origin
+
+from .aliases import AliasIndex
+from .engine import group_index
+from .interpolation import AliasReference, Compiled, compile_task, compile_value
+from .registry import load_operations
+from .types import OP_INSTRUCTION, OP_TASK, OP_TASK_OPTIONAL, InstructionSet, Task
+
+Checker = Callable[[Any], bool]
+# (key, required, checker, expected type description)
+Rule = Tuple[str, bool, Checker, str]
+
+MISSING = object()
+
+
+def _describe(annotation: Any) -> str:
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return " | ".join(str(_) for _ in get_args(annotation))
+    if origin is Union:
+        return " | ".join(_describe(_) for _ in get_args(annotation))
+    if origin is not None:
+        return getattr(origin, "__name__", str(origin))
+    return getattr(annotation, "__name__", str(annotation))
+
+
+def build_checker(annotation: Any) -> Checker:
+    "Create a function checking values against a type annotation"
+    origin = get_origin(annotation)
+    if annotation is Any:
+        return lambda value: True
+    if annotation is type(None):
+        return lambda value: value is None
+    if annotation is bool:
+        return lambda value: isinstance(value, bool)
+    if annotation is int:
+        return lambda value: isinstance(value, int) and not isinstance(value, bool)
+    if annotation is float:
+        return lambda value: isinstance(value, (int, float)) and not isinstance(
+            value, bool
+        )
+    if origin is Literal:
+        allowed = set(get_args(annotation))
+        return lambda value: isinstance(value, str) and value in allowed
+    if origin is Union:
+        checkers = [build_checker(_) for _ in get_args(annotation)]
+        return lambda value: any(check(value) for check in checkers)
+    if origin in (list, List):
+        args = get_args(annotation)
+        item = build_checker(args[0]) if len(args) > 0 else (lambda value: True)
+        return lambda value: isinstance(value, list) and all(item(_) for _ in value)
+    if origin in (dict, Dict):
+        return lambda value: isinstance(value, dict)
+    if isinstance(annotation, type):
+        return lambda value: isinstance(value, annotation)
+    return lambda value: True
+
+
+def _build_rules(keys: List[str], definition: Any) -> List[Rule]:
+    hints = get_type_hints(definition) if definition is not None else {}
+    rules: List[Rule] = []
+    for key in keys:
+        name = key.replace("!", "")
+        annotation = hints.get(name, Any)
+        rules.append(
+            (
+                name,
+                not key.startswith("!"),
+                build_checker(annotation),
+                _describe(annotation),
+            )
+        )
+    return rules
+
+
+@lru_cache(maxsize=None)
+def compile_schemas() -> Dict[str, List[Rule]]:
+    "Build, once per process, the rules of every registered Operation"
+    schemas: Dict[str, List[Rule]] = {}
+    common = _build_rules(OP_TASK_OPTIONAL, Task)
+    for name, spec in load_operations().items():
+        schemas[name] = [
+            *_build_rules([_ for _ in spec.keys if _ not in OP_TASK], spec.definition),
+            *common,
+        ]
+    return schemas
+
+
+def _check(
+    rules: List[Rule], task: Dict[str, Any], where: str, errors: List[str]
+) -> None:
+    for key, required, check, expected in rules:
+        value = task.get(key, task.get(f"!{key}", MISSING))
+        if value is MISSING:
+            if required:
+                errors.append(f'Missing key "{key}" in {where}')
+            continue
+        # References are only known at execution time
+        if not check(value) and compile_value(value) is None:
+            errors.append(
+                f'Invalid value for "{key}" in {where}. Expected {expected}, got {value!r}'
+            )
+
+
+def validate(instruction_set: InstructionSet) -> List[str]:
+    "Check the whole InstructionSet in a single pass, returning every error found"
+    errors: List[str] = []
+    if not isinstance(instruction_set, dict):
+        return ["InstructionSet must be a JSON object"]
+    for key in OP_INSTRUCTION:
+        if key not in instruction_set.keys():
+            errors.append(f'Missing key "{key}" in Definition')
+    if instruction_set.get("schedule") is not None:
+        from .scheduler import parse_schedule
+
+        try:
+            parse_schedule(instruction_set["schedule"])
+        except ValueError as e:
+            errors.append(f'Invalid value for "schedule" in Definition. {e}')
+    tasks = instruction_set.get("tasks", [])
+    if not isinstance(tasks, list):
+        return [*errors, 'Invalid value for "tasks" in Definition. Expected list']
+    schemas = compile_schemas()
+    steps: Dict[int, str] = {}
+    for index, task in enumerate(tasks):
+        if not isinstance(task, dict):
+            errors.append(f"Task #{index} must be a JSON object")
+            continue
+        where = f"\"{task.get('name', f'#{index}')}\" Task"
+        for key in OP_TASK:
+            if key not in task.keys():
+                errors.append(f'Missing key "{key}" in {where}')
+        step = task.get("step")
+        if "step" in task.keys() and (
+            not isinstance(step, int) or isinstance(step, bool)
+        ):
+            errors.append(
+                f'Invalid value for "step" in {where}. Expected int, got {step!r}'
+            )
+        elif step in steps:
+            errors.append(
+                f'Duplicate step {step} in {where}, already used by "{steps[step]}"'
+            )
+        elif step is not None:
+            steps[step] = task.get("name", f"#{index}")
+        operation = task.get("operation")
+        if operation is None:
+            continue
+        if operation not in schemas:
+            errors.append(f'Unknown Operation "{operation}" in {where}')
+            continue
+        _check(schemas[operation], task, where, errors)
+    return errors
+
+
+def reference_errors(
+    task: Dict[str, Any], template: Compiled, groups: Dict[int, int], aliases: AliasIndex
+) -> List[str]:
+    """Check that every reference of a compiled value can be resolved when it runs.
+    `groups` maps every step to the group executing it, as given by `group_index`"""
+    errors: List[str] = []
+    for reference in template.references():
+        if isinstance(reference, AliasReference):
+            if aliases.resolve(reference) is None:
+                errors.append(
+                    f"Unknown alias \"{reference.source}\" in \"{task['name']}\" Task"
+                )
+        elif reference.step not in groups:
+            errors.append(
+                f"Reference \"{reference.source}\" in \"{task['name']}\" Task points to a step that doesn't exist"
+            )
+        elif reference.step >= task["step"]:
+            errors.append(
+                f"Reference \"{reference.source}\" in \"{task['name']}\" Task points to a step that is not executed before it"
+            )
+        elif groups[reference.step] == groups[task["step"]]:
+            errors.append(
+                f"Reference \"{reference.source}\" in \"{task['name']}\" Task points to a step running in parallel with it"
+            )
+    return errors
+
+
+def validate_references(
+    instruction_set: InstructionSet, aliases: AliasIndex
+) -> List[str]:
+    "Check the references and aliases of an InstructionSet that passed `validate`"
+    groups = group_index(instruction_set["tasks"])
+    errors: List[str] = [*aliases.errors]
+    for task in instruction_set["tasks"]:
+        for template in compile_task(task).values():
+            errors.extend(reference_errors(task, template, groups, aliases))
+    return errors
@@ -0,0 +1,69 @@
+from Tasker.validator import validate
+
+
+def test_valid_instruction_set():
+    assert (
+        validate(
+            {
+                "name": "Valid",
+                "description": "",
+                "tasks": [
+                    {"name": "a", "step": 0, "operation": "input", "question": "?"},
+                    {
+                        "name": "b",
+                        "step": 1,
+                        "operation": "zip",
+                        "target": "*",
+                        "rename": "$0.value",
+                        "!deflate": True,
+                    },
+                    {
+                        "name": "c",
+                        "step": 2,
+                        "operation": "custom",
+                        "extension_name": "Sleep",
+                        "amount": 3,
+                    },
+                ],
+            }
+        )
+        == []
+    )
+
+
+def test_every_error_is_reported():
+    errors = validate(
+        {
+            "name": "Invalid",
+            "tasks": [
+                {"name": "a", "step": 0, "operation": "copy", "target": "*"},
+                {
+                    "name": "b",
+                    "step": 0,
+                    "operation": "request",
+                    "endpoint": "x",
+                    "method": "patch",
+                },
+                {"name": "c", "step": "2", "operation": "unknown"},
+                {
+                    "name": "d",
+                    "step": 3,
+                    "operation": "zip",
+                    "target": "*",
+                    "rename": "z",
+                    "!deflate": "yes",
+                },
+            ],
+        }
+    )
+    assert errors == [
+        'Missing key "description" in Definition',
+        'Missing key "origin" in "a" Task',
+        'Missing key "destination" in "a" Task',
+        'Missing key "subfolders" in "a" Task',
+        'Duplicate step 0 in "b" Task, already used by "a"',
+        'Invalid value for "method" in "b" Task. Expected get | post | delete | put, got \'patch\'',
+        'Invalid value for "step" in "c" Task. Expected int, got \'2\'',
+        'Unknown Operation "unknown" in "c" Task',
+        'Invalid value for "deflate" in "d" Task. Expected bool | NoneType, got \'yes\'',
+    ]
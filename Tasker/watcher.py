@@ -0,0 +1,323 @@
+import ctypes
+import ctypes.util
+import os
+import os.path as Path
+import select
+import struct
+import sys
+from logging import Logger
+from os import environ as env
+from time import monotonic, sleep
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from .common import get_all_file_paths
+from .errors import TaskerError
+from .types import Task
+
+# Seconds without new events that close a burst of changes
+DEBOUNCE = 0.5
+# Longest a burst is gathered for, so files that never stop changing still trigger runs
+MAX_BATCH = 10.0
+# Seconds between scans of the polling fallback
+POLL_INTERVAL = 1.0
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# struct inotify_event header: wd, mask, cookie, len
+EVENT = struct.Struct("iIII")
+
+
+def _libc() -> Optional[ctypes.CDLL]:
+    "The C library, when it provides inotify"
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class InotifyBackend:
+    "inotify watches on every folder of the watched trees"
+
+    def __init__(self, folders: List[str], libc: ctypes.CDLL) -> None:
+        self.__libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify is not available")
+        self.__folders: Dict[int, str] = {}
+        try:
+            for folder in folders:
+                self.__add_tree(folder)
+        except OSError:
+            self.close()
+            raise
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        """Files changed until `timeout`, waiting forever when None. Returns None when
+        events were lost and anything may have changed"""
+        changes: Set[str] = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changes
+        data = self.__drain()
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            start = offset + EVENT.size
+            name = os.fsdecode(data[start : start + length].rstrip(b"\0"))
+            offset = start + length
+            folder = self.__folders.get(wd)
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif folder is None:
+                continue
+            elif mask & IN_IGNORED:
+                del self.__folders[wd]
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    path = Path.join(folder, name)
+                    self.__add_tree(path)
+                    # Files written before the new folder was being watched
+                    changes.update(get_all_file_paths(path))
+            else:
+                changes.add(Path.join(folder, name))
+        return None if overflow else changes
+
+    def reset(self) -> None:
+        "Forget the changes waiting to be read"
+        self.__drain()
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+    def __add_tree(self, folder: str) -> None:
+        for root, _, _ in os.walk(folder):
+            wd = self.__libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"Cannot watch {root}")
+            self.__folders[wd] = root
+
+    def __drain(self) -> bytes:
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return data
+            if len(chunk) == 0:
+                return data
+            data += chunk
+
+
+class PollingBackend:
+    "Compare the (mtime, size) of every file of the watched trees"
+
+    def __init__(self, folders: List[str], interval: float = POLL_INTERVAL) -> None:
+        self.folders = folders
+        self.interval = interval
+        self.__files = self.__scan()
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        "Files changed until `timeout`, waiting forever when None"
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            files = self.__scan()
+            changes = {
+                _
+                for _ in files.keys() | self.__files.keys()
+                if files.get(_) != self.__files.get(_)
+            }
+            self.__files = files
+            if len(changes) > 0 or (deadline is not None and monotonic() >= deadline):
+                return changes
+            wait = self.interval
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - monotonic()))
+            sleep(wait)
+
+    def reset(self) -> None:
+        self.__files = self.__scan()
+
+    def close(self) -> None:
+        pass
+
+    def __scan(self) -> Dict[str, Tuple[int, int]]:
+        files: Dict[str, Tuple[int, int]] = {}
+        for folder in self.folders:
+            _scan(folder, files)
+        return files
+
+
+def _scan(folder: str, files: Dict[str, Tuple[int, int]]) -> None:
+    try:
+        entries = os.scandir(folder)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    _scan(entry.path, files)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                # Removed while scanning
+                pass
+
+
+Backend = Union[InotifyBackend, PollingBackend]
+
+
+def get_backend(folders: List[str], logger: Logger) -> Backend:
+    "Watch with inotify where available, polling otherwise"
+    libc = _libc()
+    if libc is not None:
+        try:
+            return InotifyBackend(folders, libc)
+        except OSError as e:
+            logger.warning(f"{e}, polling for changes instead")
+    return PollingBackend(folders)
+
+
+def _inside(path: str, folder: str) -> bool:
+    return path == folder or path.startswith(f"{folder}{os.sep}")
+
+
+def watched_paths(tasks: List[Task]) -> Dict[int, List[str]]:
+    "Existing `origin` and `destination` folders of every Task, by step"
+    paths: Dict[int, List[str]] = {}
+    for task in tasks:
+        folders = [
+            Path.abspath(task[key])  # type: ignore
+            for key in ["origin", "destination"]
+            if isinstance(task.get(key), str) and Path.isdir(task[key])  # type: ignore
+        ]
+        if len(folders) > 0:
+            paths[task["step"]] = folders
+    return paths
+
+
+def watched_roots(paths: Dict[int, List[str]]) -> List[str]:
+    "Folders to watch, leaving out the ones inside another watched folder"
+    roots: List[str] = []
+    for folder in sorted(set(_ for folders in paths.values() for _ in folders)):
+        # Parents sort before their folders, not always right before: "/a-b" < "/a/c"
+        if not any(_inside(folder, root) for root in roots):
+            roots.append(folder)
+    return roots
+
+
+def affected_steps(paths: Dict[int, List[str]], changes: Set[str]) -> Set[int]:
+    "Steps with a changed file inside one of their folders"
+    return {
+        step
+        for step, folders in paths.items()
+        if any(_inside(change, folder) for change in changes for folder in folders)
+    }
+
+
+class Watcher:
+    """Execute an InstructionSet, then execute again the Tasks whose files change.
+    Changes made while it runs, its own included, are ignored"""
+
+    def __init__(
+        self, instruction_set: str, logger: Logger, debounce: Optional[float] = None
+    ) -> None:
+        self.instruction_set = instruction_set
+        self.logger = logger
+        self.debounce = debounce if debounce is not None else DEBOUNCE
+        self.paths: Dict[int, List[str]] = {}
+        self.__outputs: Any = None
+
+    def run(self) -> None:
+        "Watch until interrupted"
+        self.execute()
+        roots = watched_roots(self.paths)
+        if len(roots) == 0:
+            self.logger.error(
+                f"{self.instruction_set} has no origin or destination folder to watch"
+            )
+            return
+        backend = get_backend(roots, self.logger)
+        self.logger.info(
+            f"Watching {len(roots)} folder(s) with {type(backend).__name__.replace('Backend', '').lower()}"
+        )
+        try:
+            while True:
+                changes = self.wait(backend)
+                if changes is None:
+                    self.logger.warning("Too many changes to track, executing everything")
+                    self.execute()
+                elif len(affected_steps(self.paths, changes)) > 0:
+                    self.execute(changes)
+                else:
+                    continue
+                backend.reset()
+                if watched_roots(self.paths) != roots:
+                    roots = watched_roots(self.paths)
+                    backend.close()
+                    backend = get_backend(roots, self.logger)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            backend.close()
+
+    def wait(self, backend: Backend) -> Optional[Set[str]]:
+        "Block until files change, then gather the burst until it goes quiet"
+        changes = backend.read(None)
+        deadline = monotonic() + MAX_BATCH
+        while changes is not None and monotonic() < deadline:
+            more = backend.read(min(self.debounce, deadline - monotonic()))
+            if more is None:
+                return None
+            if len(more) == 0:
+                break
+            changes |= more
+        return changes
+
+    def execute(self, changes: Optional[Set[str]] = None) -> None:
+        "Execute every Task, or only the ones affected by `changes` and their dependents"
+        from .parser import Parser
+
+        try:
+            parser = Parser(self.instruction_set, self.logger)
+            # Answered on the first run
+            env["-No-Warning"] = "1"
+            steps = None
+            if changes is not None and self.__outputs is not None:
+                steps = affected_steps(self.paths, changes)
+                steps |= parser.dependents(steps)
+                parser.outputs = self.__outputs
+                parser.changed_files = sorted(changes)
+                names = [_["name"] for _ in parser.task["tasks"] if _["step"] in steps]
+                self.logger.info(
+                    f"{len(changes)} file(s) changed, executing {', '.join(names)}"
+                )
+            parser.execute(steps)
+        except (SystemExit, TaskerError):
+            return
+        except Exception as e:
+            self.logger.error(f"Execution failed: {e}")
+            return
+        self.__outputs = parser.outputs
+        executed = [
+            _ for _ in parser.task["tasks"] if steps is None or _["step"] in steps
+        ]
+        if steps is None:
+            self.paths = {}
+        # Tasks that didn't run still have their references unresolved
+        self.paths.update(watched_paths(executed))
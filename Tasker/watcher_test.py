@@ -0,0 +1,47 @@
+import logging
+import os
+
+import pytest
+
+from Tasker.watcher import (
+    InotifyBackend,
+    PollingBackend,
+    Watcher,
+    _libc,
+    affected_steps,
+    watched_roots,
+)
+
+
+def test_affected_steps():
+    paths = {0: ["/data/src", "/data/out"], 1: ["/data/out/zip"], 2: ["/logs"]}
+    assert watched_roots(paths) == ["/data/out", "/data/src", "/logs"]
+    assert affected_steps(paths, {"/data/out/zip/a.txt"}) == {0, 1}
+    assert affected_steps(paths, {"/data/srcs/a.txt"}) == set()
+    assert watched_roots({0: ["/a", "/a-b"], 1: ["/a/c"]}) == ["/a", "/a-b"]
+
+
+def test_polling_backend(tmp_path):
+    backend = PollingBackend([str(tmp_path)], interval=0.01)
+    file = f"{tmp_path}/a.txt"
+    with open(file, "w") as f:
+        f.write("a")
+    assert backend.read(1) == {file}
+    os.remove(file)
+    assert backend.read(1) == {file}
+    assert backend.read(0.05) == set()
+
+
+@pytest.mark.skipif(_libc() is None, reason="inotify is not available")
+def test_inotify_burst(tmp_path):
+    backend = InotifyBackend([str(tmp_path)], _libc())
+    watcher = Watcher("watch", logging.getLogger(__name__), debounce=0.2)
+    os.mkdir(f"{tmp_path}/new")
+    for name in ["a.txt", "new/b.txt"]:
+        with open(f"{tmp_path}/{name}", "w") as f:
+            f.write(name)
+    try:
+        # The whole burst comes in a single batch
+        assert watcher.wait(backend) == {f"{tmp_path}/a.txt", f"{tmp_path}/new/b.txt"}
+    finally:
+        backend.close()
@@ -0,0 +1,87 @@
+"""Synthetic file trees and InstructionSets used by the benchmarks"""
+import os
+from typing import Dict, List, Tuple
+
+# Incompressible block the files are made of, so Zip deflate does real work
+BLOCK = os.urandom(1 << 20)
+
+# Name, files, size of each file in bytes and nesting depth
+Tree = Tuple[str, int, int, int]
+
+
+def trees(quick: bool = False) -> List[Tree]:
+    if quick:
+        return [
+            ("small", 1_000, 1 << 10, 0),
+            ("huge", 2, 8 << 20, 0),
+            ("deep", 200, 4 << 10, 50),
+        ]
+    return [
+        ("small", 10_000, 1 << 10, 0),
+        ("huge", 4, 64 << 20, 0),
+        ("deep", 2_000, 4 << 10, 200),
+    ]
+
+
+def make_tree(root: str, files: int, size: int, depth: int) -> int:
+    """Write `files` files of `size` bytes, spread over `depth` nested folders when it
+    isn't 0, and return the bytes written. File names are unique across folders"""
+    folder = root
+    os.makedirs(root, exist_ok=True)
+    for i in range(files):
+        if depth > 0 and i % max(1, files // depth) == 0 and i > 0:
+            folder = f"{folder}/{i}"
+            os.mkdir(folder)
+        with open(f"{folder}/file{i}.txt", "wb") as f:
+            left = size
+            while left > 0:
+                f.write(BLOCK[: min(left, len(BLOCK))])
+                left -= len(BLOCK)
+    return files * size
+
+
+def file_task(
+    operation: str, origin: str, destination: str = "", subfolders: bool = False
+) -> Dict:
+    "InstructionSet with a single Copy, Move, Delete or Zip of every file"
+    task: Dict = {"name": operation, "step": 0, "operation": operation, "target": "*"}
+    if operation in ["copy", "move"]:
+        task.update(origin=origin, destination=destination)
+    else:
+        # Delete and Zip work on their `destination`, Zip writes the archive there
+        task["destination"] = origin
+    if operation in ["copy", "delete", "zip"]:
+        task["subfolders"] = subfolders
+    if operation == "zip":
+        task["rename"] = "archive"
+    return {"name": operation, "description": "Benchmark", "tasks": [task]}
+
+
+def reference_chain(size: int) -> Dict:
+    "Echo Tasks with three references each, to the first and the previous Task"
+    tasks = [{"name": "task 0", "step": 0, "operation": "echo", "value": "seed"}]
+    for step in range(1, size):
+        tasks.append(
+            {
+                "name": f"task {step}",
+                "step": step,
+                "operation": "echo",
+                "value": f"${{0.value}}:${{{step - 1}.name}}:${{{step - 1}.step}}",
+            }
+        )
+    return {"name": "Reference chain", "description": "Benchmark", "tasks": tasks}
+
+
+def requests(endpoint: str, size: int, parallel: bool) -> Dict:
+    tasks = [
+        {
+            "name": f"request {step}",
+            "step": step,
+            "operation": "request",
+            "endpoint": endpoint,
+            "method": "get",
+            "parallel": parallel,
+        }
+        for step in range(size)
+    ]
+    return {"name": "Requests", "description": "Benchmark", "tasks": tasks}
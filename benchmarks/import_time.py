@@ -0,0 +1,56 @@
+"""Measure Tasker import and startup time with `python -X importtime`
+
+Usage: python -m benchmarks.import_time [runs]
+"""
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+from typing import Dict, List
+
+MODULE = "Tasker.__main__"
+LIST = "import sys; from Tasker.__main__ import main; sys.argv = ['', 'list']; main()"
+
+
+def import_times() -> Dict[str, int]:
+    "Cumulative import time, in microseconds, of every module imported by the CLI"
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+    times: Dict[str, int] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def wall_time(code: str) -> float:
+    start = perf_counter()
+    subprocess.run([sys.executable, "-c", code], stdout=subprocess.DEVNULL, check=True)
+    return perf_counter() - start
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    samples: List[Dict[str, int]] = [import_times() for _ in range(runs)]
+    total = median(_[MODULE] for _ in samples)
+    print(f"import {MODULE}: {total / 1000:.1f}ms (median of {runs})")
+    print("Slowest imports:")
+    last = samples[-1]
+    for name in sorted(last, key=last.get, reverse=True)[1:11]:
+        print(f"   {last[name] / 1000:>7.1f}ms {name}")
+    baseline = median(wall_time("pass") for _ in range(runs))
+    listing = median(wall_time(LIST) for _ in range(runs))
+    print(f"interpreter startup: {baseline * 1000:.1f}ms")
+    print(
+        f"tasker list: {listing * 1000:.1f}ms ({(listing - baseline) * 1000:.1f}ms in Tasker)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Benchmark the file Operations, Parser initialization, reference resolution and
+Requests, writing the results as JSON so versions can be compared
+
+Usage: python -m benchmarks.suite [--quick] [--repeat N] [--only copy,parser...]
+                                  [--output results.json] [--compare base.json]
+       python -m benchmarks.suite --compare base.json new.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fixtures import file_task, make_tree, reference_chain, requests, trees
+from Tasker.__version__ import __version__
+from Tasker.parser import Parser
+
+BENCHMARKS = ["copy", "move", "delete", "zip", "parser", "references", "request"]
+# Changes smaller than this are reported as noise by `--compare`
+NOISE = 0.05
+
+logger = logging.getLogger("benchmarks")
+logger.setLevel(logging.WARNING)
+
+
+def measure(
+    run: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None
+) -> List[float]:
+    "Seconds taken by `run` on every repetition, `setup` is not timed"
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        run()
+        samples.append(perf_counter() - start)
+    return samples
+
+
+def summary(samples: List[float], **extra: Any) -> Dict[str, Any]:
+    return {
+        "seconds": median(samples),
+        "min": min(samples),
+        "runs": len(samples),
+        **extra,
+    }
+
+
+def execute(instruction_set: Dict, location: str) -> None:
+    result = Parser.from_dict(
+        instruction_set, {"current_location": location}, logger
+    ).run()
+    if not result["ok"]:
+        raise RuntimeError(f"{instruction_set['name']} failed: {result['tasks']}")
+
+
+def file_operations(
+    operations: List[str], root: str, quick: bool, repeat: int
+) -> Dict[str, Any]:
+    "Throughput of Copy, Move, Delete and Zip over each synthetic tree"
+    results = {}
+    for name, files, size, depth in trees(quick):
+        source = f"{root}/{name}"
+        total = make_tree(source, files, size, depth)
+        subfolders = depth > 0
+
+        def fresh(folder: str) -> Callable[[], None]:
+            def _setup() -> None:
+                shutil.rmtree(f"{root}/{folder}", ignore_errors=True)
+                os.mkdir(f"{root}/{folder}")
+
+            return _setup
+
+        def copied(folder: str) -> Callable[[], None]:
+            def _setup() -> None:
+                shutil.rmtree(f"{root}/{folder}", ignore_errors=True)
+                shutil.copytree(source, f"{root}/{folder}")
+
+            return _setup
+
+        cases = {
+            "copy": (
+                file_task("copy", name, "copy", subfolders),
+                fresh("copy"),
+                files,
+            ),
+            "move": (
+                file_task("move", "moving", "moved"),
+                lambda: (copied("moving")(), fresh("moved")()),
+                files,
+            ),
+            # Without subfolders, Delete looks for the files in the working directory
+            "delete": (
+                file_task("delete", "deleting", subfolders=True),
+                copied("deleting"),
+                files,
+            ),
+            "zip": (
+                file_task("zip", "zipping", subfolders=subfolders),
+                copied("zipping"),
+                files,
+            ),
+        }
+        for operation in operations:
+            instruction_set, setup, handled = cases[operation]
+            samples = measure(
+                lambda: execute(json.loads(json.dumps(instruction_set)), root),
+                repeat,
+                setup,
+            )
+            handled_bytes = total * handled // files
+            results[f"{operation}/{name}"] = summary(
+                samples,
+                files=handled,
+                bytes=handled_bytes,
+                files_per_second=handled / median(samples),
+                mib_per_second=handled_bytes / (1 << 20) / median(samples),
+            )
+            print_result(f"{operation}/{name}", results[f"{operation}/{name}"])
+        for folder in [name, "copy", "moving", "moved", "deleting", "zipping"]:
+            shutil.rmtree(f"{root}/{folder}", ignore_errors=True)
+    return results
+
+
+def parser_init(root: str, quick: bool, repeat: int) -> Dict[str, Any]:
+    "Time to validate and compile InstructionSets of every size"
+    results = {}
+    for size in [10, 1_000, 10_000] if quick else [10, 1_000, 10_000, 100_000]:
+        instruction_set = reference_chain(size)
+        samples = measure(
+            lambda: Parser.from_dict(
+                json.loads(json.dumps(instruction_set)),
+                {"current_location": root},
+                logger,
+            ),
+            repeat if size < 100_000 else 1,
+        )
+        results[f"parser/{size}"] = summary(samples, tasks=size)
+        print_result(f"parser/{size}", results[f"parser/{size}"])
+    return results
+
+
+def references(root: str, quick: bool, repeat: int) -> Dict[str, Any]:
+    "Executions of Tasks made of references, and `_get_step_reference` lookups"
+    size = 1_000 if quick else 10_000
+    parser = Parser.from_dict(reference_chain(size), {"current_location": root}, logger)
+    samples = measure(parser.run, repeat)
+    results = {
+        f"references/execute/{size}": summary(
+            samples, tasks=size, tasks_per_second=size / median(samples)
+        )
+    }
+    lookups = 100_000
+    task = parser.task["tasks"][-1]
+    steps = [f"${random.randrange(size)}" for _ in range(lookups)]
+    samples = measure(
+        lambda: [parser._get_step_reference(task, _) for _ in steps], repeat
+    )
+    results["references/lookup"] = summary(
+        samples, lookups=lookups, nanoseconds=median(samples) / lookups * 1e9
+    )
+    for key, value in results.items():
+        print_result(key, value)
+    return results
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keeps connections alive, like real APIs
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written apart, Nagle would delay the body of every response
+    disable_nagle_algorithm = True
+    body = json.dumps({"ok": True}).encode()
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def request(root: str, quick: bool, repeat: int) -> Dict[str, Any]:
+    "Request Tasks against a local HTTP server, one after the other and in parallel"
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/"
+    size = 100 if quick else 1_000
+    results = {}
+    try:
+        for mode in ["sequential", "parallel"]:
+            instruction_set = requests(endpoint, size, mode == "parallel")
+            samples = measure(
+                lambda: execute(json.loads(json.dumps(instruction_set)), root), repeat
+            )
+            results[f"request/{mode}"] = summary(
+                samples, requests=size, requests_per_second=size / median(samples)
+            )
+            print_result(f"request/{mode}", results[f"request/{mode}"])
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def print_result(name: str, result: Dict[str, Any]) -> None:
+    rates = [
+        f"{value:,.1f} {key.replace('_', ' ')}"
+        for key, value in result.items()
+        if key.endswith("_per_second") or key == "nanoseconds"
+    ]
+    print(f"{name:<28} {result['seconds'] * 1000:>10.1f}ms  {', '.join(rates)}")
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            universal_newlines=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": __version__,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def run(only: List[str], quick: bool, repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="tasker-bench-") as root:
+        operations = [_ for _ in ["copy", "move", "delete", "zip"] if _ in only]
+        if len(operations) > 0:
+            results.update(file_operations(operations, root, quick, repeat))
+        if "parser" in only:
+            results.update(parser_init(root, quick, repeat))
+        if "references" in only:
+            results.update(references(root, quick, repeat))
+        if "request" in only:
+            results.update(request(root, quick, repeat))
+    return {**environment(), "quick": quick, "results": results}
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> None:
+    "Print the change in time of every benchmark found in both runs"
+    print(f"{base['version']} ({base['commit']}) -> {new['version']} ({new['commit']})")
+    for name, result in new["results"].items():
+        if name not in base["results"]:
+            continue
+        before = base["results"][name]["seconds"]
+        change = (result["seconds"] - before) / before if before > 0 else 0.0
+        verdict = "" if abs(change) < NOISE else "faster" if change < 0 else "SLOWER"
+        print(
+            f"{name:<28} {before * 1000:>10.1f}ms -> {result['seconds'] * 1000:>10.1f}ms {change:>+8.1%} {verdict}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--quick", action="store_true", help="Smaller trees and sets")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each benchmark")
+    parser.add_argument("--only", type=str, help=f"Comma separated, of {BENCHMARKS}")
+    parser.add_argument("--output", type=str, help="Results file")
+    parser.add_argument("--compare", type=str, nargs="+", metavar="RESULTS")
+    args = parser.parse_args()
+    if args.compare is not None and len(args.compare) == 2:
+        base, new = [json.load(open(_)) for _ in args.compare]
+        compare(base, new)
+        return
+    only = args.only.split(",") if args.only else BENCHMARKS
+    unknown = set(only) - set(BENCHMARKS)
+    if len(unknown) > 0:
+        sys.exit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = run(only, args.quick, args.repeat)
+    output = args.output or (
+        f"benchmarks/results/{__version__}-{results['date'][:19].replace(':', '')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    if args.compare is not None:
+        compare(json.load(open(args.compare[0])), results)
+
+
+if __name__ == "__main__":
+    main()
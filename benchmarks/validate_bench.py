@@ -0,0 +1,67 @@
+"""Time the InstructionSet validation of generated sets with up to 100k Tasks
+
+Usage: python -m benchmarks.validate_bench [sizes...]
+"""
+import sys
+from time import perf_counter
+
+from Tasker.aliases import AliasIndex
+from Tasker.validator import validate, validate_references
+
+
+def generate(size: int) -> dict:
+    tasks = []
+    for step in range(size):
+        if step % 3 == 0:
+            tasks.append(
+                {
+                    "name": f"copy {step}",
+                    "step": step,
+                    "operation": "copy",
+                    "target": "*.txt",
+                    "origin": "&data/in",
+                    "destination": f"out/{step}",
+                    "subfolders": False,
+                }
+            )
+        elif step % 3 == 1:
+            tasks.append(
+                {
+                    "name": f"echo {step}",
+                    "step": step,
+                    "operation": "echo",
+                    "value": f"${step - 1}.destination",
+                }
+            )
+        else:
+            tasks.append(
+                {
+                    "name": f"zip {step}",
+                    "step": step,
+                    "operation": "zip",
+                    "target": "*",
+                    "rename": f"${{{step - 1}.value}}-archive",
+                    "!deflate": True,
+                }
+            )
+    return {"name": "Benchmark", "description": "Generated", "tasks": tasks}
+
+
+def main() -> None:
+    sizes = [int(_) for _ in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    aliases = AliasIndex([{"name": "data", "path": "/srv/data"}])
+    for size in sizes:
+        instruction_set = generate(size)
+        start = perf_counter()
+        errors = validate(instruction_set)
+        schema = perf_counter() - start
+        start = perf_counter()
+        errors += validate_references(instruction_set, aliases)
+        references = perf_counter() - start
+        print(
+            f"{size:>7} tasks: schema {schema:.3f}s, references {references:.3f}s, {len(errors)} errors"
+        )
+
+
+if __name__ == "__main__":
+    main()